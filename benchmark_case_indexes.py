@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Show query plans for the hot case lookups before and after the indexes added
+by migration 06_case_lookup_indexes.
+
+Everything runs inside a single transaction that is rolled back at the end:
+synthetic cases are seeded, the migration's indexes are dropped to capture the
+"before" plans, then created to capture the "after" plans. The database is left
+unchanged, but the dropped indexes are locked for the duration of the run, so
+point this at a development or staging database.
+
+Usage:
+    python benchmark_case_indexes.py [--cases 2000]
+"""
+import argparse
+import asyncio
+import importlib
+import re
+
+from server.database.database import get_connection
+
+migration = importlib.import_module("server.database.migrations.06_case_lookup_indexes")
+
+SEED_QUERIES = [
+    """
+    INSERT INTO cases (name, status)
+    SELECT 'benchmark case ' || g, 'active' FROM generate_series(1, $1) g
+    """,
+    """
+    INSERT INTO case_persons (case_id, first_name, last_name, id_number, gender, birth_date)
+    SELECT c.id, 'Bench', 'Person', lpad(p::text, 9, '0'), 'male', DATE '1980-01-01'
+    FROM cases c CROSS JOIN generate_series(1, 3) p
+    WHERE c.name LIKE 'benchmark case %'
+    """,
+    """
+    INSERT INTO case_companies (case_id, name, company_type_id, company_id_num)
+    SELECT c.id, 'Bench Ltd', gen_random_uuid(), '514000000'
+    FROM cases c WHERE c.name LIKE 'benchmark case %'
+    """,
+    """
+    INSERT INTO case_documents (case_id, status, file_path)
+    SELECT c.id, 'pending', '/benchmark/' || c.id || '/' || d
+    FROM cases c CROSS JOIN generate_series(1, 5) d
+    WHERE c.name LIKE 'benchmark case %'
+    """,
+    """
+    INSERT INTO person_bank_accounts (person_id, account_type_id, bank_name, account_number)
+    SELECT p.id, gen_random_uuid(), 'Bench Bank', '123456' FROM case_persons p WHERE p.first_name = 'Bench'
+    """,
+    """
+    INSERT INTO person_credit_cards (person_id, issuer, card_type_id, last_four)
+    SELECT p.id, 'Bench Card', gen_random_uuid(), 1234 FROM case_persons p WHERE p.first_name = 'Bench'
+    """,
+    """
+    INSERT INTO person_loans (person_id, loan_type_id, lender)
+    SELECT p.id, gen_random_uuid(), 'Bench Lender' FROM case_persons p WHERE p.first_name = 'Bench'
+    """,
+    """
+    INSERT INTO person_assets (person_id, asset_type_id, label)
+    SELECT p.id, gen_random_uuid(), 'Bench Asset' FROM case_persons p WHERE p.first_name = 'Bench'
+    """,
+    """
+    INSERT INTO person_income_sources (person_id, label, income_source_type_id)
+    SELECT p.id, 'Bench Income', gen_random_uuid() FROM case_persons p WHERE p.first_name = 'Bench'
+    """,
+    """
+    INSERT INTO person_employment_history (person_id, employer_name, position, employment_type_id)
+    SELECT p.id, 'Bench Employer', 'Engineer', gen_random_uuid() FROM case_persons p WHERE p.first_name = 'Bench'
+    """,
+    """
+    INSERT INTO documents (name, document_type_id, has_multiple_periods)
+    SELECT 'benchmark document ' || g, gen_random_uuid(), false FROM generate_series(1, $1) g
+    """,
+    """
+    INSERT INTO processing_states (case_id, document_id, step_name, state)
+    SELECT c.id, d.id, s.step_name, CASE WHEN random() < 0.05 THEN 'pending' ELSE 'completed' END
+    FROM (SELECT id, row_number() OVER () rn FROM cases WHERE name LIKE 'benchmark case %') c
+    JOIN (SELECT id, row_number() OVER () rn FROM documents WHERE name LIKE 'benchmark document %') d
+      ON c.rn = d.rn
+    CROSS JOIN (VALUES ('detect_document_type'), ('extract_text'), ('parse_fields')) s(step_name)
+    """,
+]
+
+# (label, query); $case_id / $person_id are replaced with seeded ids
+LOOKUP_QUERIES = [
+    ("case_persons by case_id", "SELECT * FROM case_persons WHERE case_id = $case_id"),
+    # Already served by the unique (case_id, document_id) constraint; kept as a reference
+    ("case_documents by case_id", "SELECT * FROM case_documents WHERE case_id = $case_id"),
+    ("case_companies by case_id", "SELECT * FROM case_companies WHERE case_id = $case_id"),
+    ("person_bank_accounts by person_id", "SELECT * FROM person_bank_accounts WHERE person_id = $person_id"),
+    ("person_credit_cards by person_id", "SELECT * FROM person_credit_cards WHERE person_id = $person_id"),
+    ("person_loans by person_id", "SELECT * FROM person_loans WHERE person_id = $person_id"),
+    ("person_assets by person_id", "SELECT * FROM person_assets WHERE person_id = $person_id"),
+    ("person_income_sources by person_id", "SELECT * FROM person_income_sources WHERE person_id = $person_id"),
+    ("person_employment_history by person_id",
+     "SELECT * FROM person_employment_history WHERE person_id = $person_id"),
+    ("processing_states by state, step_name",
+     "SELECT * FROM processing_states WHERE state = 'pending' AND step_name = 'extract_text'"),
+]
+
+FILE_NAME_QUERY = (
+    "document_processing_results by file_name",
+    "SELECT * FROM document_processing_results WHERE file_name = 'benchmark_1.pdf' "
+    "ORDER BY processed_at DESC LIMIT 1",
+)
+
+ANALYZED_TABLES = [
+    "cases", "case_persons", "case_companies", "case_documents", "documents", "processing_states",
+    "person_bank_accounts", "person_credit_cards", "person_loans", "person_assets",
+    "person_income_sources", "person_employment_history",
+]
+
+
+async def explain_all(conn, queries) -> dict:
+    plans = {}
+    for label, query in queries:
+        rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {query}")
+        plans[label] = "\n".join(row[0] for row in rows)
+    return plans
+
+
+def execution_ms(plan: str) -> float:
+    match = re.search(r"Execution Time: ([\d.]+) ms", plan)
+    return float(match.group(1)) if match else float("nan")
+
+
+async def run_benchmark(case_count: int):
+    conn = await get_connection()
+    try:
+        tx = conn.transaction()
+        await tx.start()
+        try:
+            print(f"Seeding {case_count} synthetic cases...")
+            for query in SEED_QUERIES:
+                if "$1" in query:
+                    await conn.execute(query, case_count)
+                else:
+                    await conn.execute(query)
+
+            sample = await conn.fetchrow("""
+                SELECT c.id AS case_id, p.id AS person_id
+                FROM cases c JOIN case_persons p ON p.case_id = c.id
+                WHERE c.name LIKE 'benchmark case %'
+                LIMIT 1
+            """)
+            queries = [
+                (label, query.replace("$case_id", f"'{sample['case_id']}'::uuid")
+                             .replace("$person_id", f"'{sample['person_id']}'::uuid"))
+                for label, query in LOOKUP_QUERIES
+            ]
+            tables = list(ANALYZED_TABLES)
+            has_results_table = await conn.fetchval("SELECT to_regclass('document_processing_results') IS NOT NULL")
+            if has_results_table:
+                await conn.execute("""
+                    INSERT INTO document_processing_results
+                        (file_name, category_id, category_name, confidence, reasons, page_count)
+                    SELECT 'benchmark_' || g || '.pdf', 0, 'benchmark', 1.0, '', 1
+                    FROM generate_series(1, $1 * 5) g
+                """, case_count)
+                queries.append(FILE_NAME_QUERY)
+                tables.append("document_processing_results")
+
+            indexes = [index for index in migration.INDEXES
+                       if has_results_table or index[1] != "document_processing_results"]
+
+            for name, _, _ in indexes:
+                await conn.execute(f"DROP INDEX IF EXISTS {name}")
+            await conn.execute(f"ANALYZE {', '.join(tables)}")
+            before = await explain_all(conn, queries)
+
+            for name, table, columns in indexes:
+                await conn.execute(f"CREATE INDEX {name} ON {table}({columns})")
+            await conn.execute(f"ANALYZE {', '.join(tables)}")
+            after = await explain_all(conn, queries)
+        finally:
+            await tx.rollback()
+    finally:
+        await conn.close()
+
+    for label, _ in queries:
+        print(f"\n=== {label} ===")
+        print("--- before ---")
+        print(before[label])
+        print("--- after ---")
+        print(after[label])
+
+    print("\nSummary (execution time, ms)")
+    print(f"{'query':<45}{'before':>12}{'after':>12}")
+    for label, _ in queries:
+        print(f"{label:<45}{execution_ms(before[label]):>12.3f}{execution_ms(after[label]):>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=2000, help="number of synthetic cases to seed")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.cases))
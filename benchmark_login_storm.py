@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Measure login throughput and the latency of an unrelated endpoint while a
+storm of logins is running, with bcrypt run off the event loop (default) or
+inline in the handlers (--inline, the previous behaviour).
+
+The auth router and a trivial /ping endpoint are served in-process through an
+ASGI transport, so both share one event loop exactly like a uvicorn worker.
+A throwaway user is created for the run and deleted afterwards.
+
+Usage:
+    python benchmark_login_storm.py [--logins 200] [--concurrency 20] [--inline]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+
+from server.database.database import close_pool, init_pool
+from server.database.users_database import UserCreate, create_user, delete_user
+from server.features.users.passwords import PASSWORD_HASHING, get_password_hashing_stats, shutdown_password_hashing
+from server.routers.auth_router import router as auth_router
+
+PASSWORD = "Benchmark1!"
+
+app = FastAPI()
+app.include_router(auth_router)
+
+
+@app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    PASSWORD_HASHING["offload"] = not args.inline
+    await init_pool()
+    email = f"login-storm-{uuid.uuid4().hex[:8]}@example.com"
+    user = await create_user(UserCreate(email=email, password=PASSWORD, first_name="Login", last_name="Storm"))
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            pending = iter(range(args.logins))
+            login_latencies: List[float] = []
+            ping_latencies: List[float] = []
+            storm_over = asyncio.Event()
+
+            async def login_worker() -> None:
+                for _ in pending:
+                    started = time.perf_counter()
+                    response = await client.post("/api/v1/auth/token", data={"username": email, "password": PASSWORD})
+                    response.raise_for_status()
+                    login_latencies.append(time.perf_counter() - started)
+
+            async def pinger() -> None:
+                # Latency counts from when each ping was due, so time spent
+                # waiting for a blocked event loop is not hidden
+                due = time.perf_counter()
+                while not storm_over.is_set():
+                    (await client.get("/ping")).raise_for_status()
+                    ping_latencies.append(time.perf_counter() - due)
+                    due = max(due + args.ping_interval, time.perf_counter())
+                    await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+            ping_task = asyncio.create_task(pinger())
+            started = time.perf_counter()
+            await asyncio.gather(*(login_worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+            storm_over.set()
+            await ping_task
+    finally:
+        await delete_user(user.id)
+        shutdown_password_hashing()
+        await close_pool()
+
+    mode = "inline" if args.inline else f"executor ({PASSWORD_HASHING['max_workers']} threads)"
+    print(f"bcrypt mode:        {mode}")
+    print(f"logins:             {len(login_latencies)} in {elapsed:.2f}s ({len(login_latencies) / elapsed:.1f}/s)")
+    print(f"login latency:      p50 {percentile(login_latencies, 50) * 1000:.0f}ms, "
+          f"p99 {percentile(login_latencies, 99) * 1000:.0f}ms")
+    print(f"/ping during storm: {len(ping_latencies)} requests, "
+          f"p50 {statistics.median(ping_latencies) * 1000:.1f}ms, "
+          f"p99 {percentile(ping_latencies, 99) * 1000:.1f}ms, "
+          f"max {max(ping_latencies) * 1000:.1f}ms")
+    if not args.inline:
+        stats = get_password_hashing_stats()
+        print(f"hashing queue:      max depth {stats['max_waiting']}, avg wait {stats['avg_wait_ms']}ms, "
+              f"avg run {stats['avg_run_ms']}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Login storm benchmark")
+    parser.add_argument("--logins", type=int, default=200, help="Total logins to perform")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent login clients")
+    parser.add_argument("--ping-interval", type=float, default=0.01, help="Seconds between /ping requests")
+    parser.add_argument("--inline", action="store_true", help="Run bcrypt on the event loop (old behaviour)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
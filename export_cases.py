@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Export complete cases as newline-delimited JSON, one formatted case per line.
+
+Produces the same records as GET /api/v1/cases/export: cases are read through
+a server-side cursor and formatted in batches, so memory use stays bounded
+however many cases are exported.
+
+Usage:
+    python export_cases.py [--status active] [--last-active-from 2025-01-01]
+                           [--last-active-to 2025-02-01] [--batch-size 100]
+                           [--output cases.ndjson]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+
+from server.database.case_formatter_database import EXPORT_BATCH_SIZE, iter_formatted_cases
+from server.database.database import close_pool
+
+
+async def export_cases(args: argparse.Namespace) -> int:
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    count = 0
+    try:
+        async for formatted_case in iter_formatted_cases(
+                status=args.status,
+                last_active_from=args.last_active_from,
+                last_active_to=args.last_active_to,
+                batch_size=args.batch_size
+        ):
+            output.write(json.dumps(jsonable_encoder(formatted_case), ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        await close_pool()
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export complete cases as NDJSON")
+    parser.add_argument("--status", help="Only cases with this status")
+    parser.add_argument("--last-active-from", type=datetime.fromisoformat,
+                        help="Only cases active at or after this ISO date/time")
+    parser.add_argument("--last-active-to", type=datetime.fromisoformat,
+                        help="Only cases active before this ISO date/time")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE,
+                        help="Cases formatted per batch")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    count = asyncio.run(export_cases(args))
+    print(f"Exported {count} case(s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
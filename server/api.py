@@ -11,8 +11,14 @@ from starlette.responses import HTMLResponse
 from server.routers.person_assets_router import router as person_assets_router
 from server.routers.unique_docs_router import router as unique_docs_router
 from server.database.users_database import UserCreate, create_user, update_user_role, UserRole
-from server.database.database import create_schema_if_not_exists, drop_all_tables
+from server.database.database import create_schema_if_not_exists, drop_all_tables, init_pool, close_pool, get_pool_stats
 from server.database.d_migrations import run_migrations
+from server.database.case_overview_cache import get_overview_cache_stats
+from server.database.notifications import start_notification_listener, stop_notification_listener
+from server.database.auth_database import TokenBlacklist
+from server.database.maintenance import get_maintenance_stats, start_maintenance_scheduler, stop_maintenance_scheduler
+from server.features.users.passwords import get_password_hashing_stats, shutdown_password_hashing
+from server.features.uploads.previews import shutdown_preview_workers
 from server.database.documents_database import list_tables
 from server.routers.documents_router import router as documents_router
 from server.routers.users_router import router as users_router
@@ -31,11 +37,16 @@ from server.routers.lior_dropdown_options_router import router as dropdown_optio
 from server.routers.case_wizard_router import router as case_wizard_router
 from server.routers.bulk_documents_router import router as bulk_documents_router
 from server.routers.case_overview_router import router as case_overview_router
+from server.routers.uploads_router import router as uploads_router
 
 from server.features.docs_processing.docs_processing_router import router as docs_processing_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await init_pool()
+    await start_notification_listener()
+    await TokenBlacklist.load()
+    start_maintenance_scheduler()
     tables = await list_tables()
     for table in tables:
         print(table)
@@ -55,6 +66,11 @@ async def lifespan(app: FastAPI):
         print(e)
         pass
     yield
+    await stop_maintenance_scheduler()
+    await stop_notification_listener()
+    shutdown_password_hashing()
+    shutdown_preview_workers()
+    await close_pool()
 
 
 app = FastAPI(title="Document Management API", lifespan=lifespan)
@@ -75,6 +91,38 @@ async def read_documents():
     return HTMLResponse(content="<h1>Hello</h1>")
 
 
+@app.get("/health/db")
+async def database_health():
+    """
+    Connection pool counts and connections held past the leak threshold.
+    """
+    return get_pool_stats()
+
+
+@app.get("/health/cache")
+async def cache_health():
+    """
+    Size and hit/miss counters of this worker's case overview cache.
+    """
+    return get_overview_cache_stats()
+
+
+@app.get("/health/passwords")
+async def password_hashing_health():
+    """
+    Concurrency cap, queue depth and timings of the password hashing pool.
+    """
+    return get_password_hashing_stats()
+
+
+@app.get("/health/maintenance")
+async def maintenance_health():
+    """
+    Run counts, last outcome and timings of the background maintenance jobs.
+    """
+    return get_maintenance_stats()
+
+
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(documents_router)
@@ -95,6 +143,7 @@ app.include_router(unique_docs_router)
 app.include_router(case_wizard_router)
 app.include_router(bulk_documents_router)
 app.include_router(case_overview_router)
+app.include_router(uploads_router)
 
 
 async def create_schema_and_admin():
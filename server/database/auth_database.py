@@ -1,8 +1,12 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import asyncio
+import time
 import uuid
 import logging
 
 from server.database.database import get_connection
+from server.database.notifications import is_listening, register_notification_handler
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,34 +16,141 @@ class DatabaseError(Exception):
     pass
 
 
+TOKEN_REVOKED_CHANNEL = "token_revoked"
+
+# Seconds between sweeps of expired entries from the in-memory revoked set
+REVOKED_TOKENS_PRUNE_INTERVAL = 60.0
+
+
+class _RevokedTokens:
+    """
+    Unexpired revoked refresh token ids with their expiry (epoch seconds).
+
+    Revocations are never undone, so the set only needs additions: the rows
+    loaded from token_blacklist plus every token_revoked notification.
+    Expired entries are dropped periodically, which keeps the set bounded by
+    the number of live revoked tokens.
+    """
+
+    def __init__(self):
+        self._expires: Dict[uuid.UUID, float] = {}
+        self._next_prune = 0.0
+        # Whether the set holds every revocation; lost with the listener
+        self.complete = False
+        # Bumped whenever notifications may have been missed
+        self.epoch = 0
+
+    def add(self, jti: uuid.UUID, expires_at: float) -> None:
+        self._expires[jti] = max(expires_at, self._expires.get(jti, 0.0))
+
+    def __contains__(self, jti: uuid.UUID) -> bool:
+        now = time.time()
+        if now >= self._next_prune:
+            self._expires = {key: exp for key, exp in self._expires.items() if exp > now}
+            self._next_prune = now + REVOKED_TOKENS_PRUNE_INTERVAL
+        return jti in self._expires
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+_revoked_tokens = _RevokedTokens()
+
+
+def _on_token_revoked(payload: str) -> None:
+    if not payload:
+        # Listener connection lost: revocations may have been missed
+        _revoked_tokens.complete = False
+        _revoked_tokens.epoch += 1
+        return
+    jti, expires_at = payload.split(",")
+    _revoked_tokens.add(uuid.UUID(jti), float(expires_at))
+
+
+register_notification_handler(TOKEN_REVOKED_CHANNEL, _on_token_revoked)
+
+# The reload of the revoked set in flight, so concurrent checks start only one
+_revoked_tokens_reload: Optional[asyncio.Task] = None
+
+
+def _on_revoked_tokens_reloaded(task: asyncio.Task) -> None:
+    # load() has logged the failure; the next check starts another reload
+    if not task.cancelled():
+        task.exception()
+
+
+def _reload_revoked_tokens() -> None:
+    """Start reloading the revoked set unless a reload is already running"""
+    global _revoked_tokens_reload
+    if _revoked_tokens_reload is None or _revoked_tokens_reload.done():
+        _revoked_tokens_reload = asyncio.create_task(TokenBlacklist.load())
+        _revoked_tokens_reload.add_done_callback(_on_revoked_tokens_reloaded)
+
+
+def _epoch_seconds(value: datetime) -> float:
+    # Naive datetimes are stored as UTC in timestamptz columns
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+
 class TokenBlacklist:
     @classmethod
-    async def add_to_blacklist(cls, jti: uuid.UUID, user_id: uuid.UUID, expires_at: datetime):
-        conn = await  get_connection()
-        try:
-            async with conn.transaction():
-                await conn.execute(
-                    """
-                    INSERT INTO token_blacklist (jti, user_id, expires_at)
-                    VALUES ($1, $2, $3)
-                    """,
-                    jti, user_id, expires_at
+    async def load(cls) -> int:
+        """
+        Load the unexpired revoked tokens into this worker's revoked set.
+        Called from the application lifespan once notifications are being
+        received, and again after the listener reconnects.
+        """
+        epoch = _revoked_tokens.epoch
+        # Isolated: a reload task inherits the unit of work of the request
+        # that started it, whose connection it must not share
+        async with get_connection(isolated=True) as conn:
+            try:
+                rows = await conn.fetch(
+                    "SELECT jti, expires_at FROM token_blacklist WHERE expires_at > NOW()"
                 )
-        except Exception as e:
-            logger.error(f"Database error: {str(e)}")
-            raise DatabaseError(f"Database operation failed: {str(e)}")
+            except Exception as e:
+                logger.error(f"Database error: {str(e)}")
+                raise DatabaseError(f"Database operation failed: {str(e)}")
+        for row in rows:
+            _revoked_tokens.add(row["jti"], row["expires_at"].timestamp())
+        # Anything revoked since the listener started arrived as a notification
+        if is_listening() and epoch == _revoked_tokens.epoch:
+            _revoked_tokens.complete = True
+        return len(rows)
 
     @classmethod
-    async def is_blacklisted(cls, jti: uuid.UUID) -> bool:
-        conn = await get_connection()
-        async with conn.transaction():
+    async def add_to_blacklist(cls, jti: uuid.UUID, user_id: uuid.UUID, expires_at: datetime):
+        async with get_connection() as conn:
             try:
                 async with conn.transaction():
-                    result = await conn.fetchval(
-                        "SELECT EXISTS(SELECT 1 FROM token_blacklist WHERE jti = $1)",
-                        jti
+                    await conn.execute(
+                        """
+                        INSERT INTO token_blacklist (jti, user_id, expires_at)
+                        VALUES ($1, $2, $3)
+                        """,
+                        jti, user_id, expires_at
                     )
-                    return bool(result)
+                # Visible in this worker at once; others hear of it from the trigger
+                _revoked_tokens.add(jti, _epoch_seconds(expires_at))
+            except Exception as e:
+                logger.error(f"Database error: {str(e)}")
+                raise DatabaseError(f"Database operation failed: {str(e)}")
+
+    @classmethod
+    async def is_blacklisted(cls, jti: uuid.UUID) -> bool:
+        if is_listening():
+            if _revoked_tokens.complete:
+                return jti in _revoked_tokens
+            # Until the reload finishes, checks query the database
+            _reload_revoked_tokens()
+
+        async with get_connection() as conn:
+            try:
+                result = await conn.fetchval(
+                    "SELECT EXISTS(SELECT 1 FROM token_blacklist WHERE jti = $1)",
+                    jti
+                )
+                return bool(result)
             except Exception as e:
                 logger.error(f"Database error: {str(e)}")
                 raise DatabaseError(f"Database operation failed: {str(e)}")
@@ -70,8 +181,7 @@ class TokenBlacklist:
 class LoginAttempts:
     @classmethod
     async def record_attempt(cls, email: str, max_attempts: int = 5, lockout_minutes: int = 15) -> bool:
-        conn = await get_connection()
-        async with conn.transaction():
+        async with get_connection() as conn:
             try:
                 async with conn.transaction():
                     result = await conn.fetchrow("""
@@ -101,8 +211,7 @@ class LoginAttempts:
 
     @classmethod
     async def is_locked(cls, email: str) -> bool:
-        conn = await  get_connection()
-        async with conn.transaction():
+        async with get_connection() as conn:
             try:
                 async with conn.transaction():
                     locked = await conn.fetchval("""
@@ -117,8 +226,7 @@ class LoginAttempts:
 
     @classmethod
     async def reset_attempts(self, email: str):
-        conn = await get_connection()
-        async with conn.transaction():
+        async with get_connection() as conn:
             try:
                 async with conn.transaction():
                     await conn.execute("""
@@ -131,8 +239,7 @@ class LoginAttempts:
 
     @classmethod
     async def cleanup_stale(cls, older_than_days: int = 30, batch_size: int = 1000) -> int:
-        conn = await get_connection()
-        async with conn.transaction():
+        async with get_connection() as conn:
             try:
                 async with conn.transaction():
                     result = await conn.execute("""
@@ -6,17 +6,14 @@ import uuid
 import os
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import asyncpg
 from pydantic import BaseModel, Field
 
-from server.database.database import get_connection
+from server.database.database import get_connection, unit_of_work
+from server.database.unique_docs_database import get_doc_type_registry, get_unique_doc_type
 from server.database.case_documents_database import (
-    CaseDocumentCreate,
     CaseDocumentInDB,
-    CaseDocumentWithTypeInfo,
-    CaseDocumentUpdate,
-    create_case_document,
-    update_case_document,
-    get_case_document
+    CaseDocumentWithTypeInfo
 )
 
 
@@ -74,70 +71,75 @@ class BulkClassificationResult(BaseModel):
 # Bulk Upload Database Operations
 # -----------------------------------------------------------------------------
 
+BULK_INSERT_QUERY = """
+INSERT INTO case_documents (id, case_id, status, file_path)
+SELECT new_doc.id, $1, 'pending', new_doc.file_path
+FROM unnest($2::uuid[], $3::text[]) AS new_doc(id, file_path)
+RETURNING id, status, uploaded_at
+"""
+
+
 async def create_bulk_documents(
     case_id: uuid.UUID,
-    file_paths: List[str]
+    file_paths: List[str],
+    filenames: Optional[List[str]] = None
 ) -> BulkUploadResult:
     """
     Create multiple unidentified documents for a case in a single operation.
 
+    All rows are inserted by one statement in one transaction. If that
+    statement fails, the rows are retried one by one (each in its own
+    savepoint) so that the failing files are reported and the rest are kept.
+
     Args:
         case_id: UUID of the case
         file_paths: List of file paths where the uploaded documents are stored
+        filenames: Names the files were uploaded under, by default the file path names
 
     Returns:
         BulkUploadResult: Result of the operation
     """
-    conn = await get_connection()
-    uploaded_documents = []
+    filenames = filenames or [os.path.basename(file_path) for file_path in file_paths]
+    # Ids are generated here so returned rows can be matched to their files
+    # (several files may share a stored path)
+    doc_ids = [uuid.uuid4() for _ in file_paths]
     errors = []
 
-    try:
-        # For each file, create an unidentified document in the case
-        for file_path in file_paths:
-            try:
-                # Extract filename from path
-                filename = os.path.basename(file_path)
-
-                # Create a case document record with minimal information
-                doc_data = CaseDocumentCreate(
-                    case_id=case_id,
-                    document_id=None,  # This will be created or linked later during classification
-                    doc_type_id=None,  # Unidentified initially
-                    status="pending",
-                    target_object_type=None,  # Unlinked initially
-                    target_object_id=None,  # Unlinked initially
-                    file_path=file_path
-                )
-
-                doc = await create_case_document(doc_data)
-
-                # Create the BulkUploadedDocument record
-                uploaded_doc = BulkUploadedDocument(
-                    id=doc.id,
-                    case_id=case_id,
-                    filename=filename,
-                    file_path=file_path,
-                    status=doc.status,
-                    processing_status="unidentified"
-                )
-
-                uploaded_documents.append(uploaded_doc)
-
-            except Exception as e:
-                errors.append(f"Error processing file {file_path}: {str(e)}")
-                # Continue with other files
-
-        return BulkUploadResult(
+    async with unit_of_work() as conn:
+        try:
+            async with conn.transaction():
+                rows = await conn.fetch(BULK_INSERT_QUERY, case_id, doc_ids, file_paths)
+        except asyncpg.PostgresError:
+            rows = []
+            for doc_id, file_path, filename in zip(doc_ids, file_paths, filenames):
+                try:
+                    async with conn.transaction():
+                        rows.extend(await conn.fetch(BULK_INSERT_QUERY, case_id, [doc_id], [file_path]))
+                except asyncpg.PostgresError as e:
+                    errors.append(f"Error processing file {filename}: {str(e)}")
+
+    rows_by_id = {row["id"]: row for row in rows}
+    uploaded_documents = [
+        BulkUploadedDocument(
+            id=doc_id,
             case_id=case_id,
-            uploaded_count=len(uploaded_documents),
-            documents=uploaded_documents,
-            success=len(errors) == 0,
-            errors=errors
+            filename=filename,
+            file_path=file_path,
+            status=rows_by_id[doc_id]["status"],
+            processing_status="unidentified",
+            uploaded_at=rows_by_id[doc_id]["uploaded_at"]
         )
+        for doc_id, file_path, filename in zip(doc_ids, file_paths, filenames)
+        if doc_id in rows_by_id
+    ]
 
-    finally:
-        await conn.close()
+    return BulkUploadResult(
+        case_id=case_id,
+        uploaded_count=len(uploaded_documents),
+        documents=uploaded_documents,
+        success=len(errors) == 0,
+        errors=errors
+    )
 
 
 async def get_unidentified_documents(case_id: uuid.UUID) -> List[CaseDocumentInDB]:
@@ -200,6 +202,23 @@ async def get_unlinked_documents(case_id: uuid.UUID) -> List[CaseDocumentInDB]:
         await conn.close()
 
 
+CLASSIFY_QUERY = """
+UPDATE case_documents cd
+SET doc_type_id = c.doc_type_id,
+    status = c.status,
+    target_object_type = COALESCE(c.target_object_type, cd.target_object_type),
+    target_object_id = COALESCE(c.target_object_id, cd.target_object_id),
+    processing_status = CASE WHEN c.target_object_id IS NULL THEN 'identified' ELSE 'processed' END
+FROM unnest($2::uuid[], $3::uuid[], $4::text[], $5::text[], $6::uuid[])
+     AS c(document_id, doc_type_id, status, target_object_type, target_object_id)
+WHERE cd.id = c.document_id AND cd.case_id = $1
+RETURNING cd.id, cd.case_id, cd.document_id, cd.doc_type_id, cd.status,
+          cd.target_object_type, cd.target_object_id, cd.processing_status,
+          cd.uploaded_at, cd.reviewed_at, cd.file_path, cd.created_at, cd.updated_at,
+          cd.is_current_version, cd.version_number, cd.replace_version_id
+"""
+
+
 async def classify_bulk_documents(
     case_id: uuid.UUID,
     classifications: List[BulkDocumentClassification]
@@ -207,6 +226,11 @@ async def classify_bulk_documents(
     """
     Classify multiple documents in a case in a single operation.
 
+    Every document is updated by one statement; document types are resolved
+    from the doc type registry. Documents not in the case, and classifications
+    to unknown document types, are reported as errors. If a document appears
+    more than once, its last classification applies.
+
     Args:
         case_id: UUID of the case
         classifications: List of document classifications
@@ -214,51 +238,61 @@ async def classify_bulk_documents(
     Returns:
         BulkClassificationResult: Result of the operation
     """
-    classified_documents = []
     errors = []
 
     try:
-        # For each classification, update the corresponding document
+        registry = await get_doc_type_registry()
+        doc_types = {}
+        for doc_type_id in {classification.doc_type_id for classification in classifications}:
+            # Falls back to the database for types created since the registry loaded
+            doc_type = registry.by_id.get(doc_type_id) or await get_unique_doc_type(doc_type_id)
+            if doc_type:
+                doc_types[doc_type_id] = doc_type
+
+        latest = {}
         for classification in classifications:
-            try:
-                # Create update data
-                update_data = CaseDocumentUpdate(
-                    doc_type_id=classification.doc_type_id,
-                    status=classification.status,
-                    target_object_type=classification.target_object_type,
-                    target_object_id=classification.target_object_id,
-                    processing_status="identified" if not classification.target_object_id else "processed"
+            if classification.doc_type_id not in doc_types:
+                errors.append(
+                    f"Error classifying document {classification.document_id}: "
+                    f"document type {classification.doc_type_id} not found"
                 )
-
-                # Update the document
-                updated_doc = await update_case_document(classification.document_id, update_data)
-
-                if updated_doc:
-                    # Get full document info with type details
-                    from server.database.unique_docs_database import get_unique_doc_type
-
-                    # Convert to CaseDocumentWithTypeInfo
-                    doc_with_type = CaseDocumentWithTypeInfo(**updated_doc.model_dump())
-
-                    # Get the document type details if available
-                    if updated_doc.doc_type_id:
-                        doc_type = await get_unique_doc_type(updated_doc.doc_type_id)
-                        doc_with_type.document_type = doc_type
-
-                    # Add simple target object info
-                    if updated_doc.target_object_type and updated_doc.target_object_id:
-                        doc_with_type.target_object = {
-                            "id": str(updated_doc.target_object_id),
-                            "type": updated_doc.target_object_type
-                        }
-
-                    classified_documents.append(doc_with_type)
-                else:
-                    errors.append(f"Document with ID {classification.document_id} not found or not updated")
-
-            except Exception as e:
-                errors.append(f"Error classifying document {classification.document_id}: {str(e)}")
-                # Continue with other documents
+                continue
+            latest.pop(classification.document_id, None)
+            latest[classification.document_id] = classification
+        batch = list(latest.values())
+
+        rows = []
+        if batch:
+            async with get_connection() as conn:
+                rows = await conn.fetch(
+                    CLASSIFY_QUERY,
+                    case_id,
+                    [c.document_id for c in batch],
+                    [c.doc_type_id for c in batch],
+                    [c.status for c in batch],
+                    [c.target_object_type for c in batch],
+                    [c.target_object_id for c in batch]
+                )
+        rows_by_id = {row["id"]: row for row in rows}
+
+        classified_documents = []
+        for classification in batch:
+            row = rows_by_id.get(classification.document_id)
+            if row is None:
+                errors.append(f"Document with ID {classification.document_id} not found or not updated")
+                continue
+
+            doc_with_type = CaseDocumentWithTypeInfo(**dict(row))
+            doc_with_type.document_type = doc_types[row["doc_type_id"]]
+
+            # Add simple target object info
+            if row["target_object_type"] and row["target_object_id"]:
+                doc_with_type.target_object = {
+                    "id": str(row["target_object_id"]),
+                    "type": row["target_object_type"]
+                }
+
+            classified_documents.append(doc_with_type)
 
         return BulkClassificationResult(
             classified_count=len(classified_documents),
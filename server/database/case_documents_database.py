@@ -6,7 +6,7 @@ from uuid import UUID
 from datetime import datetime
 from pydantic import BaseModel, Field, computed_field
 
-from server.database.database import get_connection
+from server.database.database import get_connection, unit_of_work
 from server.database.unique_docs_database import UniqueDocTypeInDB, get_unique_doc_type, DocumentType
 
 
@@ -199,8 +199,9 @@ async def update_case_document(doc_id: UUID, doc_update: CaseDocumentUpdate) ->
     If the document is of type "updatable" and file_path is being updated,
     the previous version is stored in version history.
     """
-    conn = await get_connection()
-    try:
+    # Archive and update in one transaction so a failure cannot leave a
+    # history row without the matching version bump
+    async with unit_of_work() as conn:
         # Get the existing document to check if it's an updatable type
         existing_doc = await get_case_document(doc_id)
         if not existing_doc:
@@ -227,9 +228,6 @@ async def update_case_document(doc_id: UUID, doc_update: CaseDocumentUpdate) ->
             # Increment version number for the update
             new_version = existing_doc.version_number + 1
 
-            # Add version number to the update fields
-            doc_update.version_number = new_version
-
         # Build update query dynamically based on provided fields
         fields_to_update = []
         params = []
@@ -298,8 +296,6 @@ async def update_case_document(doc_id: UUID, doc_update: CaseDocumentUpdate) ->
 
         # If no fields to update, just return the current state
         return existing_doc
-    finally:
-        await conn.close()
 
 
 async def delete_case_document(doc_id: UUID) -> bool:
@@ -1,48 +1,168 @@
 """
 Utility for formatting case data to match the sample JSON structure
+
+Related data is fetched by batch loaders: each child table is queried once for
+all persons (or entities) of the case with `= ANY($1)` and grouped in memory.
+Dropdown labels are looked up in the dropdown options index rather than joined. Formatting a case, or a batch of cases
+for export, costs a fixed number of queries on a single connection regardless
+of how many persons it has.
 """
 import uuid
-from typing import Dict, List, Any, Optional
+from collections import defaultdict
 from datetime import datetime
+from typing import AsyncIterator, Dict, List, Any, Optional, Sequence
+
+from server.database.database import get_connection, unit_of_work
+from server.database.case_overview_cache import CaseSnapshot, cached_case_snapshot, get_case_version
+from server.database.lior_dropdown_options_database import DropdownOptionsIndex, get_dropdown_options_index
+
+# Version of the formatted structure; bump it when the structure changes so
+# cached snapshots and clients' ETags from the old structure stop matching
+FORMATTED_CASE_FORMAT_VERSION = 1
+
+# case_documents.target_object_type of each formatted entity kind
+ENTITY_TARGET_OBJECTS = {
+    "bank_account": "bank_account",
+    "credit_card": "credit_card",
+    "loan": "loan",
+    "asset": "asset",
+    "income_source": "income",
+    "company": "company",
+}
+
+
+# Case rows; filters are appended
+CASES_QUERY = """
+SELECT
+    c.id, c.status, c.created_at, c.updated_at,
+    c.loan_type_id
+FROM
+    cases c
+"""
 
-from server.database.database import get_connection
-from server.database.cases_database import get_case, CaseInDB
-from server.database.documents_database import DocumentInDB
+EXPORT_BATCH_SIZE = 100
 
 
 async def get_formatted_case(case_id: uuid.UUID) -> Dict[str, Any]:
     """
     Get a case with all related data formatted to match the sample JSON structure
     """
-    # Get the base case data
-    case_data = await get_case(case_id)
-    if not case_data:
-        return {}
+    # One connection for the case and every batch loader below
+    async with unit_of_work() as conn:
+        case_data = await conn.fetchrow(CASES_QUERY + "WHERE c.id = $1", case_id)
+        if not case_data:
+            return {}
+        return (await format_cases([case_data]))[0]
 
-    # Build the case structure
-    result = {
-        "case": {
-            "id": str(case_data.id),
-            "application_status": case_data.status,
-            "created_date": case_data.created_at.strftime("%Y-%m-%d"),
-            "last_updated": case_data.updated_at.strftime("%Y-%m-%d"),
-        }
-    }
 
-    # Get desired product (loan type and goal)
-    loan_type = await get_loan_type(case_data.loan_type_id) if case_data.loan_type_id else None
+async def get_formatted_case_snapshot(case_id: uuid.UUID) -> Optional[CaseSnapshot]:
+    """
+    Get the formatted case serialized to JSON.
+    Served from the snapshot cache while the case's version is unchanged;
+    returns None if the case does not exist.
+    """
+    return await cached_case_snapshot(f"formatted:{FORMATTED_CASE_FORMAT_VERSION}", case_id, get_formatted_case)
+
+
+async def get_formatted_case_etag(case_id: uuid.UUID) -> Optional[str]:
+    """
+    Get the strong ETag of the formatted case from its versions alone, without
+    reading any entity table; None if the case has no statistics row.
+
+    Every write that can change the formatted case moves one of the versions,
+    so equal ETags mean byte-identical snapshots.
+    """
+    version = await get_case_version(case_id)
+    if version is None:
+        return None
+    case_version, catalog_version = version
+    return f'"{case_id}:{case_version}:{catalog_version}:{FORMATTED_CASE_FORMAT_VERSION}"'
+
 
-    # Add desired product if loan type exists
-    if loan_type:
-        result["case"]["desired_product"] = {
-            "loan_type": loan_type["value"],
+async def iter_formatted_cases(
+        status: Optional[str] = None,
+        last_active_from: Optional[datetime] = None,
+        last_active_to: Optional[datetime] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield formatted cases matching the filters, oldest first.
+
+    Cases are read through a server-side cursor and formatted batch_size at a
+    time, so memory stays bounded by one batch however many cases match.
+
+    Args:
+        status: Only cases with this status
+        last_active_from: Only cases active at or after this time
+        last_active_to: Only cases active before this time
+        batch_size: Cases formatted per round of batch loaders
+    """
+    conditions = []
+    args: List[Any] = []
+    for condition, value in (("c.status = ${}", status),
+                             ("c.last_active >= ${}", last_active_from),
+                             ("c.last_active < ${}", last_active_to)):
+        if value is not None:
+            args.append(value)
+            conditions.append(condition.format(len(args)))
+
+    query = CASES_QUERY
+    if conditions:
+        query += "WHERE " + " AND ".join(conditions) + "\n"
+    query += "ORDER BY c.created_at, c.id"
+
+    # The cursor needs its own connection and transaction for its lifetime.
+    # Each batch is formatted in a separate unit of work that is entered and
+    # left between two yields, so the ambient connection never spans a yield.
+    async with get_connection() as cursor_conn:
+        async with cursor_conn.transaction(readonly=True):
+            cursor = await cursor_conn.cursor(query, *args)
+            while True:
+                case_rows = await cursor.fetch(batch_size)
+                if not case_rows:
+                    break
+                async with unit_of_work():
+                    formatted = await format_cases(case_rows)
+                for formatted_case in formatted:
+                    yield formatted_case
+
+
+async def format_cases(case_rows: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    Format case rows (as selected by CASES_QUERY), loading related data for
+    the whole batch at once.
+    """
+    case_ids = [case_data["id"] for case_data in case_rows]
+
+    # Documents linked to the cases' entities, shared by persons and companies
+    entity_documents = await load_entity_documents(case_ids)
+    # Dropdown labels are resolved in memory instead of joined in every query
+    options = await get_dropdown_options_index()
+    persons_by_case = await load_case_persons_with_details(case_ids, entity_documents, options)
+    companies_by_case = await load_case_companies_with_details(case_ids, entity_documents, options)
+
+    result = []
+    for case_data in case_rows:
+        # Build the case structure
+        case_json = {
+            "id": str(case_data["id"]),
+            "application_status": case_data["status"],
+            "created_date": case_data["created_at"].strftime("%Y-%m-%d"),
+            "last_updated": case_data["updated_at"].strftime("%Y-%m-%d"),
         }
 
-    # Get persons in case with all related data
-    result["case"]["persons_in_case"] = await get_case_persons_with_details(case_id)
+        # Add desired product if loan type exists
+        loan_type = options.value_of("loan_types", case_data["loan_type_id"])
+        if loan_type:
+            case_json["desired_product"] = {
+                "loan_type": loan_type,
+            }
+
+        # Persons and companies in case with all related data
+        case_json["persons_in_case"] = persons_by_case.get(case_data["id"], [])
+        case_json["companies_in_case"] = companies_by_case.get(case_data["id"], [])
 
-    # Get companies in case with all related data
-    result["case"]["companies_in_case"] = await get_case_companies_with_details(case_id)
+        result.append({"case": case_json})
 
     return result
 
@@ -51,550 +171,448 @@ async def get_case_persons_with_details(case_id: uuid.UUID) -> List[Dict[str, An
     """
     Get all persons in a case with their related details
     """
-    conn = await get_connection()
-    try:
-        # Get all persons in the case
-        persons_query = """
-        SELECT 
-            p.id, p.first_name, p.last_name, p.id_number, p.gender, 
-            p.birth_date, p.phone, p.email, p.status,
-            role.value as role_value,
-            ms.value as marital_status_value
-        FROM 
-            case_persons p
-        LEFT JOIN 
-            lior_dropdown_options role ON p.role_id = role.id AND role.category = 'person_roles'
-        LEFT JOIN 
-            lior_dropdown_options ms ON p.marital_status_id = ms.id AND ms.category = 'person_marital_statuses'
-        WHERE 
-            p.case_id = $1
-        """
-
-        persons = await conn.fetch(persons_query, case_id)
-
-        result = []
-        for person in persons:
-            person_data = dict(person)
-            person_id = person_data["id"]
-
-            # Create person JSON
-            person_json = {
-                "id": str(person_id),
-                "role": person_data["role_value"],
-                "personal_info": {
-                    "first_name": person_data["first_name"],
-                    "last_name": person_data["last_name"],
-                    "id_number": person_data["id_number"],
-                    "date_of_birth": person_data["birth_date"].strftime("%Y-%m-%d") if person_data[
-                        "birth_date"] else None,
-                    "gender": person_data["gender"],
-                    "marital_status": person_data["marital_status_value"],
-                    "phone": person_data["phone"],
-                    "email": person_data["email"]
-                }
-            }
-
-            # Add documents
-            person_json["documents"] = await get_person_documents(person_id)
-
-            # Add employment history
-            person_json["employment_history"] = await get_person_employment_history(person_id)
+    async with unit_of_work():
+        entity_documents = await load_entity_documents([case_id])
+        options = await get_dropdown_options_index()
+        persons_by_case = await load_case_persons_with_details([case_id], entity_documents, options)
+    return persons_by_case.get(case_id, [])
 
-            # Add income sources
-            person_json["income_sources"] = await get_person_income_sources(person_id)
 
-            # Add bank accounts
-            person_json["bank_accounts"] = await get_person_bank_accounts(person_id)
+async def get_case_companies_with_details(case_id: uuid.UUID) -> List[Dict[str, Any]]:
+    """
+    Get all companies in a case with their related details
+    """
+    async with unit_of_work():
+        entity_documents = await load_entity_documents([case_id])
+        options = await get_dropdown_options_index()
+        companies_by_case = await load_case_companies_with_details([case_id], entity_documents, options)
+    return companies_by_case.get(case_id, [])
+
+
+async def load_case_persons_with_details(
+        case_ids: Sequence[uuid.UUID],
+        entity_documents: Dict[tuple, List[Dict[str, Any]]],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """
+    Get all persons of the given cases with their related details, by case
+    """
+    # Get all persons in the cases
+    persons_query = """
+    SELECT
+        p.case_id, p.id, p.first_name, p.last_name, p.id_number, p.gender,
+        p.birth_date, p.phone, p.email, p.status,
+        p.role_id, p.marital_status_id
+    FROM
+        case_persons p
+    WHERE
+        p.case_id = ANY($1)
+    ORDER BY
+        p.created_at, p.id
+    """
 
-            # Add credit cards
-            person_json["credit_cards"] = await get_person_credit_cards(person_id)
+    persons = [person for rows in (await _fetch_grouped(persons_query, case_ids, "case_id")).values()
+               for person in rows]
+    if not persons:
+        return {}
 
-            # Add loans
-            person_json["loans"] = await get_person_loans(person_id)
+    # Each child table once for all persons
+    person_ids = [person["id"] for person in persons]
+    documents = await load_person_documents(person_ids, options)
+    employment_history = await load_person_employment_history(person_ids, options)
+    income_sources = await load_person_income_sources(person_ids, entity_documents, options)
+    bank_accounts = await load_person_bank_accounts(person_ids, entity_documents, options)
+    credit_cards = await load_person_credit_cards(person_ids, entity_documents, options)
+    loans = await load_person_loans(person_ids, entity_documents, options)
+    assets = await load_person_assets(person_ids, entity_documents, options)
+    relationships = await load_person_relationships(person_ids, options)
+
+    result: Dict[uuid.UUID, List[Dict[str, Any]]] = defaultdict(list)
+    for person in persons:
+        person_data = dict(person)
+        person_id = person_data["id"]
+
+        # Create person JSON
+        result[person_data["case_id"]].append({
+            "id": str(person_id),
+            "role": options.value_of("person_roles", person_data["role_id"]),
+            "personal_info": {
+                "first_name": person_data["first_name"],
+                "last_name": person_data["last_name"],
+                "id_number": person_data["id_number"],
+                "date_of_birth": person_data["birth_date"].strftime("%Y-%m-%d") if person_data[
+                    "birth_date"] else None,
+                "gender": person_data["gender"],
+                "marital_status": options.value_of("person_marital_statuses", person_data["marital_status_id"]),
+                "phone": person_data["phone"],
+                "email": person_data["email"]
+            },
+            "documents": documents.get(person_id, []),
+            "employment_history": employment_history.get(person_id, []),
+            "income_sources": income_sources.get(person_id, []),
+            "bank_accounts": bank_accounts.get(person_id, []),
+            "credit_cards": credit_cards.get(person_id, []),
+            "loans": loans.get(person_id, []),
+            "assets": assets.get(person_id, []),
+            "related_persons": relationships.get(person_id, []),
+        })
 
-            # Add assets
-            person_json["assets"] = await get_person_assets(person_id)
+    return result
 
-            # Add related persons
-            person_json["related_persons"] = await get_person_relationships(person_id)
 
-            result.append(person_json)
+async def load_case_companies_with_details(
+        case_ids: Sequence[uuid.UUID],
+        entity_documents: Dict[tuple, List[Dict[str, Any]]],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """
+    Get all companies of the given cases with their related details, by case
+    """
+    # Get all companies in the cases
+    companies_query = """
+    SELECT
+        c.case_id, c.id, c.name,
+        c.company_type_id, c.role_id
+    FROM
+        case_companies c
+    WHERE
+        c.case_id = ANY($1)
+    ORDER BY
+        c.created_at, c.id
+    """
 
-        return result
-    finally:
-        await conn.close()
-
-
-async def get_person_bank_accounts(person_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get bank accounts for a person"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            pba.id, pba.bank_name, pba.account_number,
-            acc_type.value as account_type_value
-        FROM 
-            person_bank_accounts pba
-        LEFT JOIN 
-            lior_dropdown_options acc_type ON pba.account_type_id = acc_type.id AND acc_type.category = 'bank_account_types'
-        WHERE 
-            pba.person_id = $1
-        """
-
-        accounts = await conn.fetch(query, person_id)
-
-        result = []
-        for account in accounts:
-            account_data = dict(account)
-            account_id = account_data["id"]
-
-            # Get documents for this bank account
-            account_documents = await get_entity_documents('bank_account', account_id)
-
-            account_json = {
-                "id": str(account_id),
-                "account_type": account_data["account_type_value"],
-                "bank_name": account_data["bank_name"],
-                "account_number": f"****{account_data['account_number'][-4:]}",
-                "documents": account_documents
+    grouped = await _fetch_grouped(companies_query, case_ids, "case_id")
+    return {
+        case_id: [
+            {
+                "id": str(company["id"]),
+                "name": company["name"],
+                "type": options.value_of("company_types", company["company_type_id"]),
+                "role": options.value_of("person_roles", company["role_id"]),
+                "documents": _documents_of(entity_documents, "company", company["id"])
             }
+            for company in companies
+        ]
+        for case_id, companies in grouped.items()
+    }
 
-            result.append(account_json)
 
-        return result
-    finally:
-        await conn.close()
-
-
-async def get_person_credit_cards(person_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get credit cards for a person"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            pcc.id, pcc.issuer, pcc.last_four,
-            card_type.value as card_type_value
-        FROM 
-            person_credit_cards pcc
-        LEFT JOIN 
-            lior_dropdown_options card_type ON pcc.card_type_id = card_type.id AND card_type.category = 'credit_card_types'
-        WHERE 
-            pcc.person_id = $1
-        """
-
-        cards = await conn.fetch(query, person_id)
-
-        result = []
-        for card in cards:
-            card_data = dict(card)
-            card_id = card_data["id"]
-
-            # Get documents for this credit card
-            card_documents = await get_entity_documents('credit_card', card_id)
-
-            card_json = {
-                "id": str(card_id),
-                "issuer": card_data["issuer"],
-                "card_type": card_data["card_type_value"],
-                "last_four": card_data["last_four"],
-                "documents": card_documents
-            }
+# ----------------------------
+# Batch loaders
+# ----------------------------
+async def _fetch_grouped(query: str, keys: Sequence[uuid.UUID], key_column: str = "person_id") -> Dict[uuid.UUID, List[Any]]:
+    """Run a `= ANY($1)` query once for all keys and group the rows by key_column"""
+    grouped: Dict[uuid.UUID, List[Any]] = defaultdict(list)
+    if not keys:
+        return grouped
+    async with get_connection() as conn:
+        for row in await conn.fetch(query, list(keys)):
+            grouped[row[key_column]].append(row)
+    return grouped
 
-            result.append(card_json)
 
-        return result
-    finally:
-        await conn.close()
-
-
-async def get_person_loans(person_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get loans for a person"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            pl.id, pl.lender,
-            loan_type.value as loan_type_value
-        FROM 
-            person_loans pl
-        LEFT JOIN 
-            lior_dropdown_options loan_type ON pl.loan_type_id = loan_type.id AND loan_type.category = 'loan_types'
-        WHERE 
-            pl.person_id = $1
-        """
-
-        loans = await conn.fetch(query, person_id)
-
-        result = []
-        for loan in loans:
-            loan_data = dict(loan)
-            loan_id = loan_data["id"]
-
-            # Get documents for this loan
-            loan_documents = await get_entity_documents('loan', loan_id)
-
-            loan_json = {
-                "id": str(loan_id),
-                "type": loan_data["loan_type_value"],
-                "lender": loan_data["lender"],
-                "documents": loan_documents
-            }
+def _documents_of(entity_documents: Dict[tuple, List[Dict[str, Any]]], entity_type: str,
+                  entity_id: uuid.UUID) -> List[Dict[str, Any]]:
+    return entity_documents.get((ENTITY_TARGET_OBJECTS[entity_type], entity_id), [])
 
-            result.append(loan_json)
 
-        return result
-    finally:
-        await conn.close()
-
-
-async def get_person_assets(person_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get assets for a person"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            pa.id, pa.description,
-            asset_type.value as asset_type_value
-        FROM 
-            person_assets pa
-        LEFT JOIN 
-            lior_dropdown_options asset_type ON pa.asset_type_id = asset_type.id AND asset_type.category = 'asset_types'
-        WHERE 
-            pa.person_id = $1
-        """
-
-        assets = await conn.fetch(query, person_id)
-
-        result = []
-        for asset in assets:
-            asset_data = dict(asset)
-            asset_id = asset_data["id"]
-
-            # Get documents for this asset
-            asset_documents = await get_entity_documents('asset', asset_id)
-
-            asset_json = {
-                "id": str(asset_id),
-                "type": asset_data["asset_type_value"],
-                "description": asset_data["description"],
-                "documents": asset_documents
-            }
+async def load_entity_documents(case_ids: Sequence[uuid.UUID]) -> Dict[tuple, List[Dict[str, Any]]]:
+    """
+    Get the cases' documents linked to an entity, keyed by (target_object_type, target_object_id)
+    """
+    query = """
+    SELECT
+        cd.id, cd.document_id, cd.target_object_type, cd.target_object_id,
+        d.name, doc_type.display_name as doc_type
+    FROM
+        case_documents cd
+    LEFT JOIN
+        documents d ON cd.document_id = d.id
+    LEFT JOIN
+        unique_doc_types doc_type ON cd.doc_type_id = doc_type.id
+    WHERE
+        cd.case_id = ANY($1) AND cd.target_object_type = ANY($2) AND cd.target_object_id IS NOT NULL
+    ORDER BY
+        cd.uploaded_at, cd.id
+    """
 
-            result.append(asset_json)
+    result: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+    async with get_connection() as conn:
+        documents = await conn.fetch(query, list(case_ids), list(set(ENTITY_TARGET_OBJECTS.values())))
 
-        return result
-    finally:
-        await conn.close()
-
-
-async def get_person_relationships(person_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get relationships for a person"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            cpr.from_person_id, cpr.to_person_id,
-            rel_type.value as relationship_type_value,
-            cp.first_name, cp.last_name
-        FROM 
-            case_person_relations cpr
-        LEFT JOIN 
-            lior_dropdown_options rel_type ON cpr.relationship_type_id = rel_type.id AND rel_type.category = 'related_person_relationships_types'
-        JOIN
-            case_persons cp ON (
-                CASE 
-                    WHEN cpr.from_person_id = $1 THEN cpr.to_person_id = cp.id
-                    ELSE cpr.from_person_id = cp.id
-                END
-            )
-        WHERE 
-            cpr.from_person_id = $1 OR cpr.to_person_id = $1
-        """
-
-        relationships = await conn.fetch(query, person_id)
-
-        result = []
-        for rel in relationships:
-            rel_data = dict(rel)
-
-            # Determine which person is the related one
-            related_person_id = rel_data["to_person_id"] if rel_data["from_person_id"] == person_id else rel_data[
-                "from_person_id"]
-
-            # Get documents for this relationship
-            rel_documents = await get_relationship_documents(rel_data["from_person_id"], rel_data["to_person_id"])
-
-            rel_json = {
-                "person_id": str(related_person_id),
-                "relationship": rel_data["relationship_type_value"],
-                "documents": rel_documents
-            }
+    for doc in documents:
+        result[(doc["target_object_type"], doc["target_object_id"])].append({
+            "name": doc["name"] or doc["doc_type"],
+            "of_type": doc["doc_type"],
+            "url": f"/documents/{doc['document_id'] or doc['id']}.pdf"
+        })
+    return result
 
-            result.append(rel_json)
 
-        return result
-    finally:
-        await conn.close()
-
-
-async def get_entity_documents(entity_type: str, entity_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get documents associated with a specific entity"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            d.id, d.name, doc_type.value as doc_type
-        FROM 
-            document_entity_relations der
-        JOIN 
-            documents d ON der.document_id = d.id
-        LEFT JOIN 
-            lior_dropdown_options doc_type ON d.document_type_id = doc_type.id AND doc_type.category = 'document_types'
-        WHERE 
-            der.entity_type = $1 AND der.entity_id = $2
-        """
-
-        documents = await conn.fetch(query, entity_type, entity_id)
-
-        return [
+async def load_person_documents(
+        person_ids: Sequence[uuid.UUID],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """Get all documents for each person"""
+    query = """
+    SELECT
+        cpd.person_id, d.id, d.name, d.document_type_id
+    FROM
+        case_person_documents cpd
+    JOIN
+        documents d ON cpd.document_id = d.id
+    WHERE
+        cpd.person_id = ANY($1)
+    ORDER BY
+        cpd.created_at, cpd.document_id
+    """
+
+    grouped = await _fetch_grouped(query, person_ids)
+    return {
+        person_id: [
             {
                 "name": doc["name"],
-                "of_type": doc["doc_type"],
+                "of_type": options.value_of("document_types", doc["document_type_id"]),
                 "url": f"/documents/{doc['id']}.pdf"
             }
             for doc in documents
         ]
-    finally:
-        await conn.close()
-
-
-async def get_relationship_documents(from_person_id: uuid.UUID, to_person_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get documents associated with a relationship between two persons"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            d.id, d.name, doc_type.value as doc_type
-        FROM 
-            document_entity_relations der
-        JOIN 
-            documents d ON der.document_id = d.id
-        LEFT JOIN 
-            lior_dropdown_options doc_type ON d.document_type_id = doc_type.id AND doc_type.category = 'document_types'
-        WHERE 
-            der.entity_type = 'relationship' AND 
-            der.entity_id = $1
-        """
-
-        # Create a composite ID for the relationship (could be implemented differently based on your schema)
-        relationship_id = str(from_person_id) + "_" + str(to_person_id)
-
-        documents = await conn.fetch(query, relationship_id)
-
-        return [
+        for person_id, documents in grouped.items()
+    }
+
+
+async def load_person_employment_history(
+        person_ids: Sequence[uuid.UUID],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """Get employment history for each person"""
+    query = """
+    SELECT
+        peh.person_id, peh.id, peh.employer_name, peh.position, peh.current_employer,
+        peh.employment_type_id
+    FROM
+        person_employment_history peh
+    WHERE
+        peh.person_id = ANY($1)
+    ORDER BY
+        peh.created_at, peh.id
+    """
+
+    grouped = await _fetch_grouped(query, person_ids)
+    return {
+        person_id: [
             {
-                "name": doc["name"],
-                "of_type": doc["doc_type"],
-                "url": f"/documents/{doc['id']}.pdf"
+                "employer_name": emp["employer_name"],
+                "position": emp["position"],
+                "employment_type": options.value_of("employment_types", emp["employment_type_id"]),
+                "current_employer": emp["current_employer"]
             }
-            for doc in documents
+            for emp in employments
         ]
-    finally:
-        await conn.close()
-
+        for person_id, employments in grouped.items()
+    }
 
-async def get_loan_type(loan_type_id: uuid.UUID) -> Optional[Dict[str, Any]]:
-    """Get a loan type by ID"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT id, name, value
-        FROM lior_dropdown_options
-        WHERE id = $1 AND category = 'loan_types'
-        """
 
-        row = await conn.fetchrow(query, loan_type_id)
+async def load_person_income_sources(
+        person_ids: Sequence[uuid.UUID],
+        entity_documents: Dict[tuple, List[Dict[str, Any]]],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """Get income sources for each person"""
+    query = """
+    SELECT
+        pis.person_id, pis.id, pis.label,
+        pis.income_source_type_id
+    FROM
+        person_income_sources pis
+    WHERE
+        pis.person_id = ANY($1)
+    ORDER BY
+        pis.created_at, pis.id
+    """
 
-        if row:
-            return dict(row)
-        return None
-    finally:
-        await conn.close()
+    grouped = await _fetch_grouped(query, person_ids)
+    return {
+        person_id: [
+            {
+                "label": income["label"],
+                "type": options.value_of("income_sources_types", income["income_source_type_id"]),
+                "documents": _documents_of(entity_documents, "income_source", income["id"])
+            }
+            for income in incomes
+        ]
+        for person_id, incomes in grouped.items()
+    }
 
 
-async def get_case_companies_with_details(case_id: uuid.UUID) -> List[Dict[str, Any]]:
+async def load_person_bank_accounts(
+        person_ids: Sequence[uuid.UUID],
+        entity_documents: Dict[tuple, List[Dict[str, Any]]],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """Get bank accounts for each person"""
+    query = """
+    SELECT
+        pba.person_id, pba.id, pba.bank_name, pba.account_number,
+        pba.account_type_id
+    FROM
+        person_bank_accounts pba
+    WHERE
+        pba.person_id = ANY($1)
+    ORDER BY
+        pba.created_at, pba.id
     """
-    Get all companies in a case with their related details
-    """
-    conn = await get_connection()
-    try:
-        # Get all companies in the case
-        companies_query = """
-        SELECT 
-            c.id, c.name,
-            comp_type.value as company_type_value,
-            role.value as role_value
-        FROM 
-            case_companies c
-        LEFT JOIN 
-            lior_dropdown_options comp_type ON c.company_type_id = comp_type.id AND comp_type.category = 'company_types'
-        LEFT JOIN 
-            lior_dropdown_options role ON c.role_id = role.id AND role.category = 'person_roles'
-        WHERE 
-            c.case_id = $1
-        """
-
-        companies = await conn.fetch(companies_query, case_id)
-
-        result = []
-        for company in companies:
-            company_data = dict(company)
-            company_id = company_data["id"]
-
-            # Create company JSON
-            company_json = {
-                "id": str(company_id),
-                "name": company_data["name"],
-                "type": company_data["company_type_value"],
-                "role": company_data["role_value"],
-                "documents": await get_company_documents(company_id)
+
+    grouped = await _fetch_grouped(query, person_ids)
+    return {
+        person_id: [
+            {
+                "id": str(account["id"]),
+                "account_type": options.value_of("bank_account_types", account["account_type_id"]),
+                "bank_name": account["bank_name"],
+                "account_number": f"****{account['account_number'][-4:]}",
+                "documents": _documents_of(entity_documents, "bank_account", account["id"])
             }
+            for account in accounts
+        ]
+        for person_id, accounts in grouped.items()
+    }
 
-            result.append(company_json)
 
-        return result
-    finally:
-        await conn.close()
-
-
-# Helper functions for getting related data
-async def get_person_documents(person_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get all documents for a person"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            d.id, d.name, doc_type.value as doc_type
-        FROM 
-            case_person_documents cpd
-        JOIN 
-            documents d ON cpd.document_id = d.id
-        LEFT JOIN 
-            lior_dropdown_options doc_type ON d.document_type_id = doc_type.id AND doc_type.category = 'document_types'
-        WHERE 
-            cpd.person_id = $1
-        """
-
-        documents = await conn.fetch(query, person_id)
-
-        return [
+async def load_person_credit_cards(
+        person_ids: Sequence[uuid.UUID],
+        entity_documents: Dict[tuple, List[Dict[str, Any]]],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """Get credit cards for each person"""
+    query = """
+    SELECT
+        pcc.person_id, pcc.id, pcc.issuer, pcc.last_four,
+        pcc.card_type_id
+    FROM
+        person_credit_cards pcc
+    WHERE
+        pcc.person_id = ANY($1)
+    ORDER BY
+        pcc.created_at, pcc.id
+    """
+
+    grouped = await _fetch_grouped(query, person_ids)
+    return {
+        person_id: [
             {
-                "name": doc["name"],
-                "of_type": doc["doc_type"],
-                "url": f"/documents/{doc['id']}.pdf"
+                "id": str(card["id"]),
+                "issuer": card["issuer"],
+                "card_type": options.value_of("credit_card_types", card["card_type_id"]),
+                "last_four": card["last_four"],
+                "documents": _documents_of(entity_documents, "credit_card", card["id"])
             }
-            for doc in documents
+            for card in cards
         ]
-    finally:
-        await conn.close()
-
-
-async def get_company_documents(company_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get all documents for a company"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            d.id, d.name, doc_type.value as doc_type
-        FROM 
-            document_entity_relations der
-        JOIN 
-            documents d ON der.document_id = d.id
-        LEFT JOIN 
-            lior_dropdown_options doc_type ON d.document_type_id = doc_type.id AND doc_type.category = 'document_types'
-        WHERE 
-            der.entity_type = 'company' AND der.entity_id = $1
-        """
-
-        documents = await conn.fetch(query, company_id)
-
-        return [
+        for person_id, cards in grouped.items()
+    }
+
+
+async def load_person_loans(
+        person_ids: Sequence[uuid.UUID],
+        entity_documents: Dict[tuple, List[Dict[str, Any]]],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """Get loans for each person"""
+    query = """
+    SELECT
+        pl.person_id, pl.id, pl.lender,
+        pl.loan_type_id
+    FROM
+        person_loans pl
+    WHERE
+        pl.person_id = ANY($1)
+    ORDER BY
+        pl.created_at, pl.id
+    """
+
+    grouped = await _fetch_grouped(query, person_ids)
+    return {
+        person_id: [
             {
-                "name": doc["name"],
-                "of_type": doc["doc_type"],
-                "url": f"/documents/{doc['id']}.pdf"
+                "id": str(loan["id"]),
+                "type": options.value_of("loan_types", loan["loan_type_id"]),
+                "lender": loan["lender"],
+                "documents": _documents_of(entity_documents, "loan", loan["id"])
             }
-            for doc in documents
+            for loan in loans
         ]
-    finally:
-        await conn.close()
-
-
-async def get_person_employment_history(person_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get employment history for a person"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            peh.id, peh.employer_name, peh.position, peh.current_employer,
-            emp_type.value as employment_type_value
-        FROM 
-            person_employment_history peh
-        LEFT JOIN 
-            lior_dropdown_options emp_type ON peh.employment_type_id = emp_type.id AND emp_type.category = 'employment_types'
-        WHERE 
-            peh.person_id = $1
-        """
-
-        employments = await conn.fetch(query, person_id)
-
-        return [
+        for person_id, loans in grouped.items()
+    }
+
+
+async def load_person_assets(
+        person_ids: Sequence[uuid.UUID],
+        entity_documents: Dict[tuple, List[Dict[str, Any]]],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """Get assets for each person"""
+    query = """
+    SELECT
+        pa.person_id, pa.id, pa.label,
+        pa.asset_type_id
+    FROM
+        person_assets pa
+    WHERE
+        pa.person_id = ANY($1)
+    ORDER BY
+        pa.created_at, pa.id
+    """
+
+    grouped = await _fetch_grouped(query, person_ids)
+    return {
+        person_id: [
             {
-                "employer_name": emp["employer_name"],
-                "position": emp["position"],
-                "employment_type": emp["employment_type_value"],
-                "current_employer": emp["current_employer"]
+                "id": str(asset["id"]),
+                "type": options.value_of("asset_types", asset["asset_type_id"]),
+                "description": asset["label"],
+                "documents": _documents_of(entity_documents, "asset", asset["id"])
             }
-            for emp in employments
+            for asset in assets
         ]
-    finally:
-        await conn.close()
-
-
-async def get_person_income_sources(person_id: uuid.UUID) -> List[Dict[str, Any]]:
-    """Get income sources for a person"""
-    conn = await get_connection()
-    try:
-        query = """
-        SELECT 
-            pis.id, pis.label,
-            income_type.value as income_source_type_value
-        FROM 
-            person_income_sources pis
-        LEFT JOIN 
-            lior_dropdown_options income_type ON pis.income_source_type_id = income_type.id AND income_type.category = 'income_sources_types'
-        WHERE 
-            pis.person_id = $1
-        """
-
-        incomes = await conn.fetch(query, person_id)
-
-        result = []
-        for income in incomes:
-            income_data = dict(income)
-            income_id = income_data["id"]
-
-            # Get documents for this income source
-            income_documents = await get_entity_documents('income_source', income_id)
-
-            income_json = {
-                "label": income_data["label"],
-                "type": income_data["income_source_type_value"],
-                "documents": income_documents
-            }
+        for person_id, assets in grouped.items()
+    }
 
-            result.append(income_json)
 
+async def load_person_relationships(
+        person_ids: Sequence[uuid.UUID],
+        options: DropdownOptionsIndex
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """Get relationships for each person, listed under both persons of the relation"""
+    query = """
+    SELECT
+        cpr.from_person_id, cpr.to_person_id,
+        cpr.relationship_type_id
+    FROM
+        case_person_relations cpr
+    WHERE
+        cpr.from_person_id = ANY($1) OR cpr.to_person_id = ANY($1)
+    ORDER BY
+        cpr.from_person_id, cpr.to_person_id
+    """
+
+    result: Dict[uuid.UUID, List[Dict[str, Any]]] = defaultdict(list)
+    if not person_ids:
         return result
-    finally:
-        await conn.close()
\ No newline at end of file
+    async with get_connection() as conn:
+        relationships = await conn.fetch(query, list(person_ids))
+
+    wanted = set(person_ids)
+    for rel in relationships:
+        # Relationship documents have no linkage in case_documents
+        for person_id, related_person_id in ((rel["from_person_id"], rel["to_person_id"]),
+                                             (rel["to_person_id"], rel["from_person_id"])):
+            if person_id in wanted:
+                result[person_id].append({
+                    "person_id": str(related_person_id),
+                    "relationship": options.value_of("related_person_relationships_types", rel["relationship_type_id"]),
+                    "documents": []
+                })
+            if rel["from_person_id"] == rel["to_person_id"]:
+                break
+    return result
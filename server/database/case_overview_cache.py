@@ -0,0 +1,257 @@
+"""
+Version-keyed cache for case overviews and serialized case snapshots.
+
+Every write that can change a case's overview bumps case_stats.version (see
+CASE_VERSION_QUERIES in database_schema.py); changes to data shared by all
+cases (document types, requirements, dropdown options) bump the single
+catalog_version row instead. Entries are stored together with the pair of
+versions they were computed at and are only served while both are still
+current, so no write path has to invalidate the cache explicitly.
+
+Each worker keeps a bounded in-process LRU. With "shared_backend" enabled,
+entries are also written to the unlogged case_overview_cache table, so a value
+computed by one uvicorn worker is reused by the others; the version check and
+the shared lookup are a single query.
+"""
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple, Type, TypeVar
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from server.database.database import get_connection
+
+logger = logging.getLogger(__name__)
+
+CASE_OVERVIEW_CACHE = {
+    "max_entries": 1024,
+    "shared_backend": False,
+}
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+ValueT = TypeVar("ValueT")
+
+# (case_stats.version, catalog_version.version) a value was computed at
+CaseVersion = Tuple[int, int]
+
+# Current versions of a case, with the shared entry at those versions if asked for
+CASE_VERSION_QUERY = """
+SELECT s.version, cv.version AS catalog_version
+FROM case_stats s
+CROSS JOIN catalog_version cv
+WHERE s.case_id = $1
+"""
+SHARED_CASE_VERSION_QUERY = """
+SELECT s.version, cv.version AS catalog_version, oc.payload
+FROM case_stats s
+CROSS JOIN catalog_version cv
+LEFT JOIN case_overview_cache oc
+  ON oc.case_id = s.case_id AND oc.kind = $2
+  AND oc.version = s.version AND oc.catalog_version = cv.version
+WHERE s.case_id = $1
+"""
+
+
+class VersionedLRUCache:
+    """
+    Size-bounded LRU whose entries carry the version they were computed at.
+
+    A lookup with a different version is a miss and drops the stale entry.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, uuid.UUID], Tuple[CaseVersion, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, uuid.UUID], version: CaseVersion) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Tuple[str, uuid.UUID], version: CaseVersion, value: Any) -> None:
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_local_cache = VersionedLRUCache(CASE_OVERVIEW_CACHE["max_entries"])
+
+
+def get_overview_cache_stats() -> Dict[str, Any]:
+    """
+    Get hit/miss counters and size of this worker's overview cache.
+    """
+    return {**_local_cache.stats(), "shared_backend": CASE_OVERVIEW_CACHE["shared_backend"]}
+
+
+def clear_overview_cache() -> None:
+    """
+    Drop every entry of this worker's overview cache.
+    """
+    _local_cache.clear()
+
+
+class CaseSnapshot(NamedTuple):
+    """Serialized JSON body of a case representation"""
+    body: bytes
+
+
+async def get_case_version(case_id: uuid.UUID) -> Optional[CaseVersion]:
+    """
+    Get the versions cached values of a case are keyed by, reading only its
+    case_stats row; None if the case has no statistics row (or does not exist).
+    Lets callers validate a client's copy without loading the case.
+    """
+    async with get_connection() as conn:
+        row = await conn.fetchrow(CASE_VERSION_QUERY, case_id)
+    return (row["version"], row["catalog_version"]) if row else None
+
+
+async def cached_overview(
+    kind: str,
+    case_id: uuid.UUID,
+    model: Type[ModelT],
+    load: Callable[[uuid.UUID], Awaitable[Optional[ModelT]]],
+) -> Optional[ModelT]:
+    """
+    Return the overview of the given kind for a case, computing it with load
+    only when no entry exists for the case's current version.
+
+    The returned model may be shared with other callers and must not be mutated.
+
+    Args:
+        kind: Name of the overview variant, part of the cache key
+        case_id: UUID of the case
+        model: Pydantic model of the overview, used to rebuild shared entries
+        load: Coroutine function computing the overview
+
+    Returns:
+        The overview, or None if load returns None
+    """
+    return await _cached_case_value(
+        kind, case_id, load,
+        encode=lambda value: value.model_dump_json(),
+        decode=model.model_validate_json,
+    )
+
+
+async def cached_case_snapshot(
+    kind: str,
+    case_id: uuid.UUID,
+    load: Callable[[uuid.UUID], Awaitable[Optional[Any]]],
+) -> Optional[CaseSnapshot]:
+    """
+    Return a serialized JSON snapshot of a case representation, computing it
+    with load only when no snapshot exists for the case's current version.
+
+    The body is encoded like FastAPI's default JSONResponse, so serving it
+    directly is byte-identical to returning the loaded value.
+
+    Args:
+        kind: Name of the representation, part of the cache key
+        case_id: UUID of the case
+        load: Coroutine function returning the JSON-serializable value
+
+    Returns:
+        CaseSnapshot, or None if load returns a falsy value
+    """
+    async def load_snapshot(snapshot_case_id: uuid.UUID) -> Optional[CaseSnapshot]:
+        value = await load(snapshot_case_id)
+        if not value:
+            return None
+        body = json.dumps(
+            jsonable_encoder(value), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+        return CaseSnapshot(body=body)
+
+    return await _cached_case_value(
+        kind, case_id, load_snapshot,
+        encode=lambda snapshot: snapshot.body.decode("utf-8"),
+        decode=lambda payload: CaseSnapshot(body=payload.encode("utf-8")),
+    )
+
+
+async def _cached_case_value(
+    kind: str,
+    case_id: uuid.UUID,
+    load: Callable[[uuid.UUID], Awaitable[Optional[ValueT]]],
+    encode: Callable[[ValueT], str],
+    decode: Callable[[str], ValueT],
+) -> Optional[ValueT]:
+    """
+    Version-checked lookup shared by the cached representations.
+    encode/decode convert values to and from the shared backend's payload.
+    """
+    shared = CASE_OVERVIEW_CACHE["shared_backend"]
+
+    # Read the version before loading: a value computed afterwards is at
+    # least as new as the version it is stored under
+    async with get_connection() as conn:
+        if shared:
+            row = await conn.fetchrow(SHARED_CASE_VERSION_QUERY, case_id, kind)
+        else:
+            row = await conn.fetchrow(CASE_VERSION_QUERY, case_id)
+
+    if row is None:
+        # Unknown case or no statistics row yet: nothing to key the entry by
+        return await load(case_id)
+
+    version = (row["version"], row["catalog_version"])
+    key = (kind, case_id)
+    value = _local_cache.get(key, version)
+    if value is not None:
+        return value
+
+    if shared and row["payload"] is not None:
+        value = decode(row["payload"])
+        _local_cache.set(key, version, value)
+        return value
+
+    value = await load(case_id)
+    if value is None:
+        return None
+    _local_cache.set(key, version, value)
+
+    if shared:
+        try:
+            # Own (sub)transaction, so a failure cannot abort an ambient unit of work
+            async with get_connection() as conn, conn.transaction():
+                await conn.execute("""
+                    INSERT INTO case_overview_cache (case_id, kind, version, catalog_version, payload)
+                    VALUES ($1, $2, $3, $4, $5)
+                    ON CONFLICT (case_id, kind) DO UPDATE SET
+                        version = EXCLUDED.version,
+                        catalog_version = EXCLUDED.catalog_version,
+                        payload = EXCLUDED.payload,
+                        updated_at = NOW()
+                    WHERE case_overview_cache.version <= EXCLUDED.version
+                      AND case_overview_cache.catalog_version <= EXCLUDED.catalog_version
+                """, case_id, kind, *version, encode(value))
+        except Exception as e:
+            # The shared copy is an optimisation; the caller still gets the value
+            logger.warning(f"Failed to store {kind} value of case {case_id} in shared cache: {str(e)}")
+
+    return value
@@ -0,0 +1,140 @@
+"""
+Database operations for the per-case statistics table.
+
+case_stats is maintained by triggers (see CASE_STATS_QUERIES in
+database_schema.py), so reading a case's counts is a single primary key lookup.
+reconcile_case_stats recomputes the counters from the source tables to detect
+and repair drift.
+"""
+import logging
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from server.database.database import get_connection
+
+logger = logging.getLogger(__name__)
+
+STATS_COLUMNS = [
+    "persons_count",
+    "companies_count",
+    "bank_accounts_count",
+    "credit_cards_count",
+    "loans_count",
+    "assets_count",
+    "income_sources_count",
+    "documents_total",
+    "documents_unidentified",
+    "documents_identified",
+    "documents_processed",
+    "documents_pending",
+    "documents_needing_attention",
+]
+
+
+class CaseStats(BaseModel):
+    """Incrementally maintained counts for one case"""
+    case_id: uuid.UUID
+    persons_count: int = 0
+    companies_count: int = 0
+    bank_accounts_count: int = 0
+    credit_cards_count: int = 0
+    loans_count: int = 0
+    assets_count: int = 0
+    income_sources_count: int = 0
+    documents_total: int = 0
+    documents_unidentified: int = 0
+    documents_identified: int = 0
+    documents_processed: int = 0
+    documents_pending: int = 0
+    documents_needing_attention: int = 0
+    updated_at: Optional[datetime] = None
+
+
+async def get_case_stats(case_id: uuid.UUID) -> Optional[CaseStats]:
+    """
+    Get the stored statistics of a case.
+
+    Args:
+        case_id: UUID of the case
+
+    Returns:
+        CaseStats, or None if the case has no statistics row
+    """
+    async with get_connection() as conn:
+        row = await conn.fetchrow("SELECT * FROM case_stats WHERE case_id = $1", case_id)
+        return CaseStats(**dict(row)) if row else None
+
+
+async def list_case_stats() -> List[CaseStats]:
+    """
+    Get the stored statistics of all cases, newest case first.
+
+    Returns:
+        List of CaseStats
+    """
+    async with get_connection() as conn:
+        rows = await conn.fetch("""
+            SELECT s.*
+            FROM case_stats s
+            JOIN cases c ON c.id = s.case_id
+            ORDER BY c.created_at DESC
+        """)
+        return [CaseStats(**dict(row)) for row in rows]
+
+
+async def reconcile_case_stats(repair: bool = True) -> List[uuid.UUID]:
+    """
+    Compare the stored statistics with counts recomputed from the source tables.
+
+    Cases whose row is missing or differs are logged and, if repair is set,
+    overwritten with the recomputed counts.
+
+    Args:
+        repair: Whether to fix drifted rows
+
+    Returns:
+        IDs of the cases whose statistics had drifted
+    """
+    columns = ", ".join(STATS_COLUMNS)
+    expected_columns = ", ".join(f"e.{column}" for column in STATS_COLUMNS)
+    stored_columns = ", ".join(f"s.{column}" for column in STATS_COLUMNS)
+
+    async with get_connection() as conn:
+        async with conn.transaction():
+            drifted = await conn.fetch(f"""
+                SELECT e.case_id
+                FROM case_stats_expected e
+                LEFT JOIN case_stats s ON s.case_id = e.case_id
+                WHERE s.case_id IS NULL
+                   OR ({expected_columns}) IS DISTINCT FROM ({stored_columns})
+            """)
+            case_ids = [row["case_id"] for row in drifted]
+
+            if case_ids and repair:
+                await conn.execute(f"""
+                    INSERT INTO case_stats (case_id, {columns})
+                    SELECT case_id, {columns}
+                    FROM case_stats_expected
+                    WHERE case_id = ANY($1::uuid[])
+                    ON CONFLICT (case_id) DO UPDATE SET
+                        {", ".join(f"{column} = EXCLUDED.{column}" for column in STATS_COLUMNS)},
+                        updated_at = NOW()
+                """, case_ids)
+
+    if case_ids:
+        logger.warning(
+            f"case_stats drift in {len(case_ids)} case(s)"
+            f"{' (repaired)' if repair else ''}: {', '.join(str(case_id) for case_id in case_ids)}"
+        )
+    return case_ids
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    logging.basicConfig(level=logging.INFO)
+    drifted_cases = asyncio.run(reconcile_case_stats())
+    print(f"Reconciled case_stats: {len(drifted_cases)} case(s) repaired")
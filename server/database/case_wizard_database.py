@@ -7,7 +7,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel, Field
 
-from server.database.database import get_connection
+from server.database.database import unit_of_work
 from server.database.cases_database import (
     CaseInCreate, 
     CaseInDB, 
@@ -116,7 +116,7 @@ class CaseDeclarationSurvey(BaseModel):
 
 class WizardResult(BaseModel):
     """Result of the new case wizard process"""
-    case: CaseInDB
+    case: Optional[CaseInDB] = None
     created_entities: Dict[str, List[Dict[str, Any]]]
     success: bool
     errors: Optional[List[str]] = Field(default_factory=list)
@@ -137,7 +137,6 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
     Returns:
         WizardResult: Results of the wizard process including the created case and all related entities
     """
-    conn = await get_connection()
     created_entities = {
         "persons": [],
         "companies": [],
@@ -151,8 +150,13 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
     errors = []
     
     try:
-        # Start a transaction to ensure all entities are created or none are
-        async with conn.transaction():
+        # Start a unit of work so every helper below shares one connection and
+        # transaction, ensuring all entities are created or none are.
+        # Optional entities (relationships, companies, accounts, ...) are each
+        # created in a nested conn.transaction(), i.e. a savepoint: one that
+        # fails is rolled back alone and reported in errors, instead of
+        # aborting the transaction for everything after it.
+        async with unit_of_work() as conn:
             # 1. Create the case
             case_data = CaseInCreate(
                 name=survey.case_name,
@@ -216,7 +220,8 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
                                 relationship_type_id=person_declaration.relationship_to_primary
                             )
                             
-                            relation = await create_person_relation(relation_data)
+                            async with conn.transaction():
+                                relation = await create_person_relation(relation_data)
                             created_entities["relationships"].append({
                                 "from_person_id": str(primary_person_id),
                                 "to_person_id": str(person_ids[i]),
@@ -242,7 +247,8 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
                         company_id_num=company_declaration.company_id_num
                     )
                     
-                    company = await create_company(company_data)
+                    async with conn.transaction():
+                        company = await create_company(company_data)
                     created_entities["companies"].append({
                         "id": str(company.id),
                         "name": company.name,
@@ -269,7 +275,8 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
                         account_number=bank_account_declaration.account_number
                     )
                     
-                    account = await create_bank_account(account_data)
+                    async with conn.transaction():
+                        account = await create_bank_account(account_data)
                     created_entities["bank_accounts"].append({
                         "id": str(account.id),
                         "bank_name": account.bank_name,
@@ -296,7 +303,8 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
                         last_four=credit_card_declaration.last_four
                     )
                     
-                    credit_card = await create_credit_card(credit_card_data)
+                    async with conn.transaction():
+                        credit_card = await create_credit_card(credit_card_data)
                     created_entities["credit_cards"].append({
                         "id": str(credit_card.id),
                         "issuer": credit_card.issuer,
@@ -322,7 +330,8 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
                         lender=loan_declaration.lender
                     )
                     
-                    loan = await create_person_loan(loan_data)
+                    async with conn.transaction():
+                        loan = await create_person_loan(loan_data)
                     created_entities["loans"].append({
                         "id": str(loan.id),
                         "lender": loan.lender,
@@ -347,7 +356,8 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
                         label=asset_declaration.label  # Using label as primary identification field as per PRD
                     )
                     
-                    asset = await create_person_asset(asset_data)
+                    async with conn.transaction():
+                        asset = await create_person_asset(asset_data)
                     created_entities["assets"].append({
                         "id": str(asset.id),
                         "label": asset.label,  # Changed from description to label to match PRD
@@ -372,39 +382,41 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
                         label=income_declaration.label
                     )
                     
-                    income = await create_income_source(income_data)
+                    async with conn.transaction():
+                        income = await create_income_source(income_data)
+
+                        # If this is a work income, create employment history entry
+                        # We need to check if this is a work-type income source
+                        query = """
+                        SELECT name, value
+                        FROM lior_dropdown_options
+                        WHERE id = $1
+                        """
+                        income_type = await conn.fetchrow(query, income_declaration.income_source_type_id)
+                    
+                        if income_type and income_type["value"].lower() == "work":
+                            from server.database.employment_history_database import (
+                                EmploymentHistoryInCreate,
+                                create_employment_history
+                            )
+                        
+                            # Create employment history entry
+                            employment_data = EmploymentHistoryInCreate(
+                                person_id=person_ids[income_declaration.owner_person_index],
+                                employer_name=income_declaration.label,
+                                position="",  # Default empty position
+                                employment_type_id=income_declaration.income_source_type_id,  # Using same ID
+                                current_employer=True
+                            )
+                        
+                            await create_employment_history(employment_data)
+
                     created_entities["income_sources"].append({
                         "id": str(income.id),
                         "label": income.label,
                         "owner_person_id": str(person_ids[income_declaration.owner_person_index])
                     })
                     
-                    # If this is a work income, create employment history entry
-                    # We need to check if this is a work-type income source
-                    query = """
-                    SELECT name, value
-                    FROM lior_dropdown_options
-                    WHERE id = $1
-                    """
-                    income_type = await conn.fetchrow(query, income_declaration.income_source_type_id)
-                    
-                    if income_type and income_type["value"].lower() == "work":
-                        from server.database.employment_history_database import (
-                            EmploymentHistoryInCreate,
-                            create_employment_history
-                        )
-                        
-                        # Create employment history entry
-                        employment_data = EmploymentHistoryInCreate(
-                            person_id=person_ids[income_declaration.owner_person_index],
-                            employer_name=income_declaration.label,
-                            position="",  # Default empty position
-                            employment_type_id=income_declaration.income_source_type_id,  # Using same ID
-                            current_employer=True
-                        )
-                        
-                        await create_employment_history(employment_data)
-                    
                 except Exception as e:
                     errors.append(f"Error creating income source {income_declaration.label}: {str(e)}")
                     # Continue even if an income source creation fails
@@ -428,5 +440,3 @@ async def create_case_with_wizard(survey: CaseDeclarationSurvey) -> WizardResult
             success=False,
             errors=[f"Critical error in wizard process: {str(e)}"]
         )
-    finally:
-        await conn.close()
@@ -10,6 +10,7 @@ import json
 from pathlib import Path
 
 from server.database.database import drop_all_tables, get_connection
+from server.database.migrations import apply_migrations
 from server.database.lior_dropdown_options_database import DropdownOptionCreate, create_dropdown_option
 from server.database.unique_docs_database import (
     UniqueDocTypeCreate,
@@ -730,6 +731,17 @@ async def run_migrations():
         "fin_org_types"
     ]
 
+    # Apply numbered schema migrations
+    try:
+        conn = await get_connection()
+        try:
+            await apply_migrations(conn)
+        finally:
+            await conn.close()
+        logger.info("Successfully applied schema migrations")
+    except Exception as e:
+        logger.error(f"Error applying schema migrations: {str(e)}")
+
     # Seed dropdown options
     try:
         await seed_dropdown_options()
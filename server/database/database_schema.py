@@ -1,3 +1,615 @@
+# Per-case entity and document counters, kept current by triggers so the
+# overview and list endpoints read one row instead of counting joined tables.
+# case_stats_expected computes the same counters from scratch; it is used to
+# backfill the table and by reconcile_case_stats to detect drift.
+CASE_STATS_QUERIES = [
+    """CREATE TABLE IF NOT EXISTS case_stats (
+        -- No foreign key: the counter triggers fire during a case's cascaded
+        -- delete, after the case row is gone. case_stats_track_case removes the row.
+        case_id UUID PRIMARY KEY,
+        persons_count INT NOT NULL DEFAULT 0,
+        companies_count INT NOT NULL DEFAULT 0,
+        bank_accounts_count INT NOT NULL DEFAULT 0,
+        credit_cards_count INT NOT NULL DEFAULT 0,
+        loans_count INT NOT NULL DEFAULT 0,
+        assets_count INT NOT NULL DEFAULT 0,
+        income_sources_count INT NOT NULL DEFAULT 0,
+        documents_total INT NOT NULL DEFAULT 0,
+        documents_unidentified INT NOT NULL DEFAULT 0,
+        documents_identified INT NOT NULL DEFAULT 0,
+        documents_processed INT NOT NULL DEFAULT 0,
+        documents_pending INT NOT NULL DEFAULT 0,
+        documents_needing_attention INT NOT NULL DEFAULT 0,
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+    );""",
+
+    """CREATE OR REPLACE VIEW case_stats_expected AS
+    SELECT
+        c.id AS case_id,
+        (SELECT COUNT(*) FROM case_persons p WHERE p.case_id = c.id)::INT AS persons_count,
+        (SELECT COUNT(*) FROM case_companies co WHERE co.case_id = c.id)::INT AS companies_count,
+        (SELECT COUNT(*) FROM person_bank_accounts x JOIN case_persons p ON x.person_id = p.id
+         WHERE p.case_id = c.id)::INT AS bank_accounts_count,
+        (SELECT COUNT(*) FROM person_credit_cards x JOIN case_persons p ON x.person_id = p.id
+         WHERE p.case_id = c.id)::INT AS credit_cards_count,
+        (SELECT COUNT(*) FROM person_loans x JOIN case_persons p ON x.person_id = p.id
+         WHERE p.case_id = c.id)::INT AS loans_count,
+        (SELECT COUNT(*) FROM person_assets x JOIN case_persons p ON x.person_id = p.id
+         WHERE p.case_id = c.id)::INT AS assets_count,
+        (SELECT COUNT(*) FROM person_income_sources x JOIN case_persons p ON x.person_id = p.id
+         WHERE p.case_id = c.id)::INT AS income_sources_count,
+        COALESCE(d.documents_total, 0) AS documents_total,
+        COALESCE(d.documents_unidentified, 0) AS documents_unidentified,
+        COALESCE(d.documents_identified, 0) AS documents_identified,
+        COALESCE(d.documents_processed, 0) AS documents_processed,
+        COALESCE(d.documents_pending, 0) AS documents_pending,
+        COALESCE(d.documents_needing_attention, 0) AS documents_needing_attention
+    FROM cases c
+    LEFT JOIN (
+        SELECT
+            case_id,
+            COUNT(*)::INT AS documents_total,
+            (COUNT(*) FILTER (WHERE doc_type_id IS NULL))::INT AS documents_unidentified,
+            (COUNT(*) FILTER (WHERE doc_type_id IS NOT NULL
+                AND (target_object_id IS NULL OR target_object_type IS NULL)))::INT AS documents_identified,
+            (COUNT(*) FILTER (WHERE doc_type_id IS NOT NULL
+                AND target_object_id IS NOT NULL AND target_object_type IS NOT NULL))::INT AS documents_processed,
+            (COUNT(*) FILTER (WHERE status = 'pending'))::INT AS documents_pending,
+            (COUNT(*) FILTER (WHERE doc_type_id IS NULL
+                OR target_object_id IS NULL OR target_object_type IS NULL))::INT AS documents_needing_attention
+        FROM case_documents
+        GROUP BY case_id
+    ) d ON d.case_id = c.id;""",
+
+    # Every case gets its counters row on creation and loses it on deletion
+    """CREATE OR REPLACE FUNCTION case_stats_track_case() RETURNS TRIGGER AS $$
+    BEGIN
+      IF TG_OP = 'INSERT' THEN
+        INSERT INTO case_stats (case_id) VALUES (NEW.id) ON CONFLICT (case_id) DO NOTHING;
+      ELSE
+        DELETE FROM case_stats WHERE case_id = OLD.id;
+      END IF;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+
+    # Resolves the case owning a row: through case_persons for columns
+    # referencing a person (person_id, from_person_id, ...), otherwise the
+    # column holds the case id itself. Returns NULL once the person is gone,
+    # so the cascaded deletes of a person's entities are not counted twice.
+    """CREATE OR REPLACE FUNCTION case_stats_owner_case(owner_column TEXT, owner_id UUID) RETURNS UUID AS $$
+    DECLARE
+      owner_case UUID;
+    BEGIN
+      IF owner_id IS NULL OR owner_column NOT LIKE '%person\_id' THEN
+        RETURN owner_id;
+      END IF;
+      SELECT case_id INTO owner_case FROM case_persons WHERE id = owner_id;
+      RETURN owner_case;
+    END;
+    $$ LANGUAGE plpgsql;""",
+
+    # Row trigger for entity tables. TG_ARGV[0] is the case_stats column to
+    # maintain, TG_ARGV[1] the owning column (case_id or person_id).
+    """CREATE OR REPLACE FUNCTION case_stats_count_entity() RETURNS TRIGGER AS $$
+    DECLARE
+      counter TEXT := TG_ARGV[0];
+      owner_column TEXT := TG_ARGV[1];
+      old_case UUID;
+      new_case UUID;
+    BEGIN
+      IF TG_OP <> 'INSERT' THEN
+        old_case := case_stats_owner_case(owner_column, (to_jsonb(OLD) ->> owner_column)::UUID);
+      END IF;
+      IF TG_OP <> 'DELETE' THEN
+        new_case := case_stats_owner_case(owner_column, (to_jsonb(NEW) ->> owner_column)::UUID);
+      END IF;
+      IF old_case IS NOT DISTINCT FROM new_case THEN
+        RETURN NULL;
+      END IF;
+      IF old_case IS NOT NULL THEN
+        EXECUTE format('UPDATE case_stats SET %I = %I - 1, updated_at = NOW() WHERE case_id = $1', counter, counter)
+        USING old_case;
+      END IF;
+      IF new_case IS NOT NULL THEN
+        EXECUTE format('UPDATE case_stats SET %I = %I + 1, updated_at = NOW() WHERE case_id = $1', counter, counter)
+        USING new_case;
+      END IF;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+
+    # Moves the counters of a person's own entities when the person is deleted
+    # or moved to another case. Runs BEFORE the change, while the entities are
+    # still reachable through the person.
+    """CREATE OR REPLACE FUNCTION case_stats_move_person_entities() RETURNS TRIGGER AS $$
+    DECLARE
+      n_bank_accounts INT;
+      n_credit_cards INT;
+      n_loans INT;
+      n_assets INT;
+      n_income_sources INT;
+      new_case UUID;
+    BEGIN
+      IF TG_OP = 'UPDATE' THEN
+        IF OLD.case_id IS NOT DISTINCT FROM NEW.case_id THEN
+          RETURN NEW;
+        END IF;
+        new_case := NEW.case_id;
+      END IF;
+
+      SELECT COUNT(*) INTO n_bank_accounts FROM person_bank_accounts WHERE person_id = OLD.id;
+      SELECT COUNT(*) INTO n_credit_cards FROM person_credit_cards WHERE person_id = OLD.id;
+      SELECT COUNT(*) INTO n_loans FROM person_loans WHERE person_id = OLD.id;
+      SELECT COUNT(*) INTO n_assets FROM person_assets WHERE person_id = OLD.id;
+      SELECT COUNT(*) INTO n_income_sources FROM person_income_sources WHERE person_id = OLD.id;
+
+      UPDATE case_stats SET
+        bank_accounts_count = bank_accounts_count - n_bank_accounts,
+        credit_cards_count = credit_cards_count - n_credit_cards,
+        loans_count = loans_count - n_loans,
+        assets_count = assets_count - n_assets,
+        income_sources_count = income_sources_count - n_income_sources,
+        updated_at = NOW()
+      WHERE case_id = OLD.case_id;
+
+      IF new_case IS NOT NULL THEN
+        UPDATE case_stats SET
+          bank_accounts_count = bank_accounts_count + n_bank_accounts,
+          credit_cards_count = credit_cards_count + n_credit_cards,
+          loans_count = loans_count + n_loans,
+          assets_count = assets_count + n_assets,
+          income_sources_count = income_sources_count + n_income_sources,
+          updated_at = NOW()
+        WHERE case_id = new_case;
+        RETURN NEW;
+      END IF;
+      RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql;""",
+
+    # Adds (delta = 1) or removes (delta = -1) one case_documents row from the
+    # document counters of its case. Buckets match case_stats_expected.
+    """CREATE OR REPLACE FUNCTION case_stats_apply_document(doc case_documents, delta INT) RETURNS VOID AS $$
+      UPDATE case_stats SET
+        documents_total = documents_total + delta,
+        documents_unidentified = documents_unidentified
+          + CASE WHEN doc.doc_type_id IS NULL THEN delta ELSE 0 END,
+        documents_identified = documents_identified
+          + CASE WHEN doc.doc_type_id IS NOT NULL
+                  AND (doc.target_object_id IS NULL OR doc.target_object_type IS NULL) THEN delta ELSE 0 END,
+        documents_processed = documents_processed
+          + CASE WHEN doc.doc_type_id IS NOT NULL
+                  AND doc.target_object_id IS NOT NULL AND doc.target_object_type IS NOT NULL THEN delta ELSE 0 END,
+        documents_pending = documents_pending
+          + CASE WHEN doc.status = 'pending' THEN delta ELSE 0 END,
+        documents_needing_attention = documents_needing_attention
+          + CASE WHEN doc.doc_type_id IS NULL
+                  OR doc.target_object_id IS NULL OR doc.target_object_type IS NULL THEN delta ELSE 0 END,
+        updated_at = NOW()
+      WHERE case_id = doc.case_id;
+    $$ LANGUAGE sql;""",
+
+    """CREATE OR REPLACE FUNCTION case_stats_count_document() RETURNS TRIGGER AS $$
+    BEGIN
+      IF TG_OP = 'UPDATE'
+         AND (OLD.case_id, OLD.status, OLD.doc_type_id, OLD.target_object_type, OLD.target_object_id)
+             IS NOT DISTINCT FROM
+             (NEW.case_id, NEW.status, NEW.doc_type_id, NEW.target_object_type, NEW.target_object_id) THEN
+        RETURN NULL;
+      END IF;
+      IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM case_stats_apply_document(OLD, -1);
+      END IF;
+      IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM case_stats_apply_document(NEW, 1);
+      END IF;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_cases') THEN
+        CREATE TRIGGER case_stats_cases
+        AFTER INSERT OR DELETE ON cases
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_track_case();
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_case_persons') THEN
+        CREATE TRIGGER case_stats_case_persons
+        AFTER INSERT OR DELETE OR UPDATE OF case_id ON case_persons
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_count_entity('persons_count', 'case_id');
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_case_persons_entities') THEN
+        CREATE TRIGGER case_stats_case_persons_entities
+        BEFORE DELETE OR UPDATE OF case_id ON case_persons
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_move_person_entities();
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_case_companies') THEN
+        CREATE TRIGGER case_stats_case_companies
+        AFTER INSERT OR DELETE OR UPDATE OF case_id ON case_companies
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_count_entity('companies_count', 'case_id');
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_person_bank_accounts') THEN
+        CREATE TRIGGER case_stats_person_bank_accounts
+        AFTER INSERT OR DELETE OR UPDATE OF person_id ON person_bank_accounts
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_count_entity('bank_accounts_count', 'person_id');
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_person_credit_cards') THEN
+        CREATE TRIGGER case_stats_person_credit_cards
+        AFTER INSERT OR DELETE OR UPDATE OF person_id ON person_credit_cards
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_count_entity('credit_cards_count', 'person_id');
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_person_loans') THEN
+        CREATE TRIGGER case_stats_person_loans
+        AFTER INSERT OR DELETE OR UPDATE OF person_id ON person_loans
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_count_entity('loans_count', 'person_id');
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_person_assets') THEN
+        CREATE TRIGGER case_stats_person_assets
+        AFTER INSERT OR DELETE OR UPDATE OF person_id ON person_assets
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_count_entity('assets_count', 'person_id');
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_person_income_sources') THEN
+        CREATE TRIGGER case_stats_person_income_sources
+        AFTER INSERT OR DELETE OR UPDATE OF person_id ON person_income_sources
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_count_entity('income_sources_count', 'person_id');
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_stats_case_documents') THEN
+        CREATE TRIGGER case_stats_case_documents
+        AFTER INSERT OR DELETE OR UPDATE ON case_documents
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_count_document();
+      END IF;
+    END$$;""",
+
+    # Backfill cases created before the counters existed
+    """INSERT INTO case_stats (
+        case_id, persons_count, companies_count, bank_accounts_count, credit_cards_count,
+        loans_count, assets_count, income_sources_count, documents_total, documents_unidentified,
+        documents_identified, documents_processed, documents_pending, documents_needing_attention
+    )
+    SELECT
+        case_id, persons_count, companies_count, bank_accounts_count, credit_cards_count,
+        loans_count, assets_count, income_sources_count, documents_total, documents_unidentified,
+        documents_identified, documents_processed, documents_pending, documents_needing_attention
+    FROM case_stats_expected
+    ON CONFLICT (case_id) DO NOTHING;""",
+]
+
+# case_stats.version is bumped by every write that can change a case's
+# overview; cached overviews are keyed by it together with catalog_version
+# (see CATALOG_VERSION_QUERIES), which covers the data shared by every case.
+# case_overview_cache is the optional cache shared between workers.
+CASE_VERSION_QUERIES = [
+    "ALTER TABLE case_stats ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;",
+
+    # Each TG_ARGV is a column holding an owning case (id for cases) or person
+    """CREATE OR REPLACE FUNCTION case_stats_bump_version() RETURNS TRIGGER AS $$
+    DECLARE
+      owner_column TEXT;
+      owner_cases UUID[] := '{}';
+    BEGIN
+      FOREACH owner_column IN ARRAY TG_ARGV LOOP
+        IF TG_OP <> 'INSERT' THEN
+          owner_cases := owner_cases || case_stats_owner_case(owner_column, (to_jsonb(OLD) ->> owner_column)::UUID);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+          owner_cases := owner_cases || case_stats_owner_case(owner_column, (to_jsonb(NEW) ->> owner_column)::UUID);
+        END IF;
+      END LOOP;
+      UPDATE case_stats SET version = version + 1 WHERE case_id = ANY(owner_cases);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_version_cases') THEN
+        CREATE TRIGGER case_version_cases
+        AFTER UPDATE ON cases
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_bump_version('id');
+      END IF;
+    END$$;""",
+    """DO $$
+    DECLARE
+      versioned RECORD;
+    BEGIN
+      FOR versioned IN
+        SELECT * FROM (VALUES
+          ('case_persons', 'case_id'),
+          ('case_companies', 'case_id'),
+          ('case_documents', 'case_id'),
+          ('person_bank_accounts', 'person_id'),
+          ('person_credit_cards', 'person_id'),
+          ('person_loans', 'person_id'),
+          ('person_assets', 'person_id'),
+          ('person_income_sources', 'person_id')
+        ) AS t(table_name, owner_column)
+      LOOP
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_version_' || versioned.table_name) THEN
+          EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I '
+            'FOR EACH ROW EXECUTE PROCEDURE case_stats_bump_version(%L)',
+            'case_version_' || versioned.table_name, versioned.table_name, versioned.owner_column
+          );
+        END IF;
+      END LOOP;
+    END$$;""",
+    # Unlogged: it only holds recomputable data, so skip the WAL
+    """CREATE UNLOGGED TABLE IF NOT EXISTS case_overview_cache (
+        case_id UUID NOT NULL REFERENCES cases(id) ON DELETE CASCADE,
+        kind VARCHAR(30) NOT NULL,
+        version BIGINT NOT NULL,
+        catalog_version BIGINT NOT NULL DEFAULT 0,
+        -- Serialized model; TEXT keeps the JSON byte-identical to a fresh response
+        payload TEXT NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+        PRIMARY KEY (case_id, kind)
+    );""",
+]
+
+# doc_types_version.version is bumped by any change to unique_doc_types or
+# required_for, so processes caching document type data can check with one
+# lookup whether their copy is still current.
+DOC_TYPES_VERSION_QUERIES = [
+    """CREATE TABLE IF NOT EXISTS doc_types_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL DEFAULT 0
+    );""",
+    "INSERT INTO doc_types_version (id, version) VALUES (TRUE, 0) ON CONFLICT (id) DO NOTHING;",
+
+    """CREATE OR REPLACE FUNCTION bump_doc_types_version() RETURNS TRIGGER AS $$
+    BEGIN
+      UPDATE doc_types_version SET version = version + 1;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'doc_types_version_unique_doc_types') THEN
+        CREATE TRIGGER doc_types_version_unique_doc_types
+        AFTER INSERT OR UPDATE OR DELETE ON unique_doc_types
+        FOR EACH STATEMENT
+        EXECUTE PROCEDURE bump_doc_types_version();
+      END IF;
+    END$$;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'doc_types_version_required_for') THEN
+        CREATE TRIGGER doc_types_version_required_for
+        AFTER INSERT OR UPDATE OR DELETE ON required_for
+        FOR EACH STATEMENT
+        EXECUTE PROCEDURE bump_doc_types_version();
+      END IF;
+    END$$;""",
+]
+
+# Extra version triggers for the formatted case export, which also reads
+# employment history, person documents, relations and documents. The dropdown
+# labels it reads are covered by catalog_version.
+FORMATTED_CASE_VERSION_QUERIES = [
+    """DO $$
+    DECLARE
+      versioned RECORD;
+    BEGIN
+      FOR versioned IN
+        SELECT * FROM (VALUES
+          ('person_employment_history', 'person_id'),
+          ('case_person_documents', 'case_id')
+        ) AS t(table_name, owner_column)
+      LOOP
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_version_' || versioned.table_name) THEN
+          EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I '
+            'FOR EACH ROW EXECUTE PROCEDURE case_stats_bump_version(%L)',
+            'case_version_' || versioned.table_name, versioned.table_name, versioned.owner_column
+          );
+        END IF;
+      END LOOP;
+    END$$;""",
+
+    # A relation belongs to the cases of both its persons. Replaces the
+    # trigger that only followed from_person_id.
+    """DO $$ BEGIN
+      IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger WHERE tgname = 'case_version_case_person_relations' AND tgnargs = 2
+      ) THEN
+        DROP TRIGGER IF EXISTS case_version_case_person_relations ON case_person_relations;
+        CREATE TRIGGER case_version_case_person_relations
+        AFTER INSERT OR UPDATE OR DELETE ON case_person_relations
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_bump_version('from_person_id', 'to_person_id');
+      END IF;
+    END$$;""",
+
+    # A renamed document changes every case that links it
+    """CREATE OR REPLACE FUNCTION case_stats_bump_document_versions() RETURNS TRIGGER AS $$
+    BEGIN
+      UPDATE case_stats SET version = version + 1
+      WHERE case_id IN (
+        SELECT case_id FROM case_person_documents WHERE document_id = NEW.id
+        UNION
+        SELECT case_id FROM case_documents WHERE document_id = NEW.id
+      );
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'case_version_documents') THEN
+        CREATE TRIGGER case_version_documents
+        AFTER UPDATE ON documents
+        FOR EACH ROW
+        EXECUTE PROCEDURE case_stats_bump_document_versions();
+      END IF;
+    END$$;""",
+]
+
+# catalog_version.version is bumped by any change to the data every case
+# depends on: document types, their requirements and dropdown options. Case
+# caches combine it with case_stats.version in their key, so a catalog edit
+# invalidates them with a single row update instead of touching every case.
+CATALOG_VERSION_QUERIES = [
+    """CREATE TABLE IF NOT EXISTS catalog_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL DEFAULT 0
+    );""",
+    "INSERT INTO catalog_version (id, version) VALUES (TRUE, 0) ON CONFLICT (id) DO NOTHING;",
+    "ALTER TABLE case_overview_cache ADD COLUMN IF NOT EXISTS catalog_version BIGINT NOT NULL DEFAULT 0;",
+
+    """CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS TRIGGER AS $$
+    BEGIN
+      UPDATE catalog_version SET version = version + 1;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+
+    """DO $$
+    DECLARE
+      catalog_table TEXT;
+    BEGIN
+      FOREACH catalog_table IN ARRAY ARRAY['unique_doc_types', 'required_for', 'lior_dropdown_options'] LOOP
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'catalog_version_' || catalog_table) THEN
+          EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I '
+            'FOR EACH STATEMENT EXECUTE PROCEDURE bump_catalog_version()',
+            'catalog_version_' || catalog_table, catalog_table
+          );
+        END IF;
+      END LOOP;
+    END$$;""",
+]
+
+# Notify listening API workers of every new doc_types_version, so their
+# document type registries are dropped (see unique_docs_database.py)
+DOC_TYPES_NOTIFY_QUERIES = [
+    """CREATE OR REPLACE FUNCTION notify_doc_types_changed() RETURNS TRIGGER AS $$
+    BEGIN
+      PERFORM pg_notify('doc_types_changed', NEW.version::text);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'notify_doc_types_version') THEN
+        CREATE TRIGGER notify_doc_types_version
+        AFTER UPDATE ON doc_types_version
+        FOR EACH ROW
+        EXECUTE PROCEDURE notify_doc_types_changed();
+      END IF;
+    END$$;""",
+]
+
+# Notify listening API workers when dropdown options change, so their
+# in-process option caches are dropped (see lior_dropdown_options_database.py)
+DROPDOWN_OPTIONS_NOTIFY_QUERIES = [
+    """CREATE OR REPLACE FUNCTION notify_dropdown_options_changed() RETURNS TRIGGER AS $$
+    BEGIN
+      PERFORM pg_notify('lior_dropdown_options_changed', TG_OP);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'notify_lior_dropdown_options') THEN
+        CREATE TRIGGER notify_lior_dropdown_options
+        AFTER INSERT OR UPDATE OR DELETE ON lior_dropdown_options
+        FOR EACH STATEMENT
+        EXECUTE PROCEDURE notify_dropdown_options_changed();
+      END IF;
+    END$$;""",
+]
+
+# Notify listening API workers when a user row changes, so their cached
+# copy of that user is evicted (see the user cache in users_database.py).
+# Login bookkeeping (last login, failed attempts, lockouts) is written on
+# every login attempt and by the lockout cleanup, and authorization never
+# reads it from the cache, so updates touching only those columns are silent.
+USERS_NOTIFY_QUERIES = [
+    """CREATE OR REPLACE FUNCTION notify_user_changed() RETURNS TRIGGER AS $$
+    DECLARE
+      login_columns TEXT[] := ARRAY[
+        'last_login', 'last_failed_login', 'failed_login_attempts', 'lockout_until', 'updated_at'
+      ];
+    BEGIN
+      IF TG_OP = 'UPDATE' AND to_jsonb(OLD) - login_columns = to_jsonb(NEW) - login_columns THEN
+        RETURN NULL;
+      END IF;
+      PERFORM pg_notify('users_changed', OLD.id::text);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'notify_users') THEN
+        CREATE TRIGGER notify_users
+        AFTER UPDATE OR DELETE ON users
+        FOR EACH ROW
+        EXECUTE PROCEDURE notify_user_changed();
+      END IF;
+    END$$;""",
+]
+
+# Notify listening API workers of every revoked refresh token, with
+# "<jti>,<expiry epoch>" as payload (see TokenBlacklist in auth_database.py)
+TOKEN_BLACKLIST_NOTIFY_QUERIES = [
+    """CREATE OR REPLACE FUNCTION notify_token_revoked() RETURNS TRIGGER AS $$
+    BEGIN
+      PERFORM pg_notify('token_revoked', NEW.jti::text || ',' || extract(epoch FROM NEW.expires_at)::text);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;""",
+    """DO $$ BEGIN
+      IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'notify_token_blacklist') THEN
+        CREATE TRIGGER notify_token_blacklist
+        AFTER INSERT ON token_blacklist
+        FOR EACH ROW
+        EXECUTE PROCEDURE notify_token_revoked();
+      END IF;
+    END$$;""",
+]
+
+# Resumable uploads in progress; the received bytes are kept on disk
+UPLOAD_SESSIONS_QUERIES = [
+    """CREATE TABLE IF NOT EXISTS upload_sessions (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        case_id UUID NOT NULL REFERENCES cases(id) ON DELETE CASCADE,
+        document_id UUID REFERENCES documents(id) ON DELETE CASCADE,
+        filename TEXT NOT NULL,
+        total_size BIGINT NOT NULL CHECK (total_size > 0),
+        sha256 CHAR(64),
+        received_size BIGINT NOT NULL DEFAULT 0,
+        created_by UUID,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+    );""",
+    """CREATE INDEX IF NOT EXISTS idx_upload_sessions_expires_at ON upload_sessions(expires_at);""",
+]
+
 CREATE_SCHEMA_QUERIES = [
     # ### 1. Functions (Removed Enum Types)
     # Define utility functions used across the schema.
@@ -199,9 +811,14 @@ CREATE_SCHEMA_QUERIES = [
         created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
         UNIQUE(case_document_id, version_number)
     );""",
+
+    *UPLOAD_SESSIONS_QUERIES,
     
     """CREATE INDEX IF NOT EXISTS idx_case_documents_doc_type_id ON case_documents(doc_type_id);""",
     """CREATE INDEX IF NOT EXISTS idx_case_documents_target_object ON case_documents(target_object_type, target_object_id);""",
+    # Reference lookups of the content-addressed document store
+    """CREATE INDEX IF NOT EXISTS idx_case_documents_file_path ON case_documents(file_path);""",
+    """CREATE INDEX IF NOT EXISTS idx_document_version_history_file_path ON document_version_history(file_path);""",
     
     """DO $$ BEGIN
       IF NOT EXISTS (
@@ -383,6 +1000,15 @@ CREATE_SCHEMA_QUERIES = [
     """CREATE INDEX IF NOT EXISTS idx_case_persons_id_number ON case_persons(id_number);""",
     """CREATE INDEX IF NOT EXISTS idx_case_persons_role_id ON case_persons(role_id);""",
     """CREATE INDEX IF NOT EXISTS idx_case_companies_role_id ON case_companies(role_id);""",
+    """CREATE INDEX IF NOT EXISTS idx_case_persons_case_id ON case_persons(case_id);""",
+    """CREATE INDEX IF NOT EXISTS idx_case_companies_case_id ON case_companies(case_id);""",
+    """CREATE INDEX IF NOT EXISTS idx_person_bank_accounts_person_id ON person_bank_accounts(person_id);""",
+    """CREATE INDEX IF NOT EXISTS idx_person_credit_cards_person_id ON person_credit_cards(person_id);""",
+    """CREATE INDEX IF NOT EXISTS idx_person_loans_person_id ON person_loans(person_id);""",
+    """CREATE INDEX IF NOT EXISTS idx_person_assets_person_id ON person_assets(person_id);""",
+    """CREATE INDEX IF NOT EXISTS idx_person_income_sources_person_id ON person_income_sources(person_id);""",
+    """CREATE INDEX IF NOT EXISTS idx_person_employment_history_person_id ON person_employment_history(person_id);""",
+    """CREATE INDEX IF NOT EXISTS idx_processing_states_state_step_name ON processing_states(state, step_name);""",
     """CREATE INDEX IF NOT EXISTS idx_documents_document_type_id ON documents(document_type_id);""",
     """CREATE INDEX IF NOT EXISTS idx_documents_category_id ON documents(category_id);""",
     # Removed indices for document_entity_relations as the table has been removed
@@ -645,6 +1271,18 @@ CREATE_SCHEMA_QUERIES = [
       END IF;
     END$$;""",
 
+    # ### 11b. Case Statistics
+    # Per-case counters maintained by the triggers in CASE_STATS_QUERIES
+    *CASE_STATS_QUERIES,
+    *CASE_VERSION_QUERIES,
+    *DOC_TYPES_VERSION_QUERIES,
+    *DOC_TYPES_NOTIFY_QUERIES,
+    *FORMATTED_CASE_VERSION_QUERIES,
+    *CATALOG_VERSION_QUERIES,
+    *DROPDOWN_OPTIONS_NOTIFY_QUERIES,
+    *USERS_NOTIFY_QUERIES,
+    *TOKEN_BLACKLIST_NOTIFY_QUERIES,
+
     # ### 12. Additional Functions
     # Updated to use lior_dropdown_options
     """CREATE OR REPLACE FUNCTION get_category_id_by_value(category_value TEXT) 
@@ -681,7 +1319,16 @@ BEGIN
     DROP TABLE IF EXISTS case_person_documents CASCADE;
     DROP TABLE IF EXISTS case_companies CASCADE;
     DROP TABLE IF EXISTS case_desired_products CASCADE; -- Not in PRD
+    DROP TABLE IF EXISTS upload_sessions CASCADE;
+    DROP TABLE IF EXISTS document_version_history CASCADE;
+    DROP TABLE IF EXISTS case_documents CASCADE;
     DROP TABLE IF EXISTS case_persons CASCADE;
+    DROP TABLE IF EXISTS required_for CASCADE;
+    DROP TABLE IF EXISTS unique_doc_types CASCADE;
+    DROP TABLE IF EXISTS doc_types_version CASCADE;
+    DROP TABLE IF EXISTS catalog_version CASCADE;
+    DROP TABLE IF EXISTS case_overview_cache CASCADE;
+    DROP TABLE IF EXISTS case_stats CASCADE;
     DROP TABLE IF EXISTS cases CASCADE;
     DROP TABLE IF EXISTS cases_monday_relation CASCADE;
     DROP TABLE IF EXISTS fin_org_contacts CASCADE; 
@@ -1,12 +1,22 @@
 """
 Database operations for dropdown options management
+
+While the API process is listening for notifications, every option is kept
+in an in-process index by category and by id, so reads are dictionary
+lookups. A statement trigger on lior_dropdown_options NOTIFYs every worker on
+each write (including writes made outside this module), which drops the
+index; the next read reloads it. Without a listener (scripts, migrations)
+reads go to the database.
 """
 import uuid
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from pydantic import BaseModel
 from datetime import datetime
 
 from server.database.database import get_connection
+from server.database.notifications import is_listening, register_notification_handler
+
+DROPDOWN_OPTIONS_CHANNEL = "lior_dropdown_options_changed"
 
 
 class DropdownOptionBase(BaseModel):
@@ -30,6 +40,83 @@ class DropdownOptionUpdate(BaseModel):
     value: Optional[str] = None
 
 
+class DropdownOptionsIndex(BaseModel):
+    """All dropdown options, by category (ordered by name) and by id"""
+    by_category: Dict[str, List[DropdownOptionInDB]]
+    by_id: Dict[uuid.UUID, DropdownOptionInDB]
+
+    def value_of(self, category: str, option_id: Optional[uuid.UUID]) -> Optional[str]:
+        """Value of an option, if option_id belongs to category"""
+        option = self.by_id.get(option_id) if option_id is not None else None
+        return option.value if option is not None and option.category == category else None
+
+
+_options_index: Optional[DropdownOptionsIndex] = None
+# Bumped by every invalidation, so a load that raced one is not kept
+_options_generation = 0
+
+
+def invalidate_dropdown_options_cache(payload: str = "") -> None:
+    """
+    Drop this worker's dropdown options index.
+    Called for every NOTIFY on DROPDOWN_OPTIONS_CHANNEL.
+    """
+    global _options_index, _options_generation
+    _options_index = None
+    _options_generation += 1
+
+
+register_notification_handler(DROPDOWN_OPTIONS_CHANNEL, invalidate_dropdown_options_cache)
+
+
+async def load_dropdown_options_index() -> DropdownOptionsIndex:
+    """
+    Read every dropdown option into an index.
+    """
+    query = """
+    SELECT id, category, name, value, created_at, updated_at
+    FROM lior_dropdown_options
+    ORDER BY category, name
+    """
+
+    # Only committed options, the same state notifications describe
+    async with get_connection(isolated=True) as conn:
+        rows = await conn.fetch(query)
+
+    by_category: Dict[str, List[DropdownOptionInDB]] = {}
+    by_id: Dict[uuid.UUID, DropdownOptionInDB] = {}
+    for row in rows:
+        option = DropdownOptionInDB.model_validate(dict(row))
+        by_category.setdefault(option.category, []).append(option)
+        by_id[option.id] = option
+    return DropdownOptionsIndex(by_category=by_category, by_id=by_id)
+
+
+async def get_dropdown_options_index() -> DropdownOptionsIndex:
+    """
+    Get the dropdown options index, from this worker's cache while the
+    notification listener keeps it current.
+
+    The index and its option models are shared and must not be mutated.
+    """
+    global _options_index
+    if _options_index is not None and is_listening():
+        return _options_index
+
+    generation = _options_generation
+    index = await load_dropdown_options_index()
+    if is_listening() and generation == _options_generation:
+        _options_index = index
+    return index
+
+
+async def _cached_dropdown_options_index() -> Optional[DropdownOptionsIndex]:
+    """The index when it can be served from cache, None when reads should query"""
+    if not is_listening():
+        return None
+    return await get_dropdown_options_index()
+
+
 async def create_dropdown_option(payload: DropdownOptionCreate) -> DropdownOptionInDB:
     """
     Create a new dropdown option
@@ -53,6 +140,8 @@ async def create_dropdown_option(payload: DropdownOptionCreate) -> DropdownOptio
     conn = await get_connection()
     try:
         row = await conn.fetchrow(query, *values)
+        # Other workers are notified by the trigger; do not wait for our own copy
+        invalidate_dropdown_options_cache()
         return DropdownOptionInDB.model_validate(dict(row))
     finally:
         await conn.close()
@@ -62,6 +151,10 @@ async def get_dropdown_option_by_id(option_id: uuid.UUID) -> Optional[DropdownOp
     """
     Get a specific dropdown option by ID
     """
+    index = await _cached_dropdown_options_index()
+    if index is not None:
+        return index.by_id.get(option_id)
+
     query = """
     SELECT id, category, name, value, created_at, updated_at
     FROM lior_dropdown_options
@@ -82,6 +175,10 @@ async def get_dropdown_option_by_value(category: str, value: str) -> Optional[Dr
     """
     Get a specific dropdown option by category and value
     """
+    index = await _cached_dropdown_options_index()
+    if index is not None:
+        return next((option for option in index.by_category.get(category, []) if option.value == value), None)
+
     query = """
     SELECT id, category, name, value, created_at, updated_at
     FROM lior_dropdown_options
@@ -102,6 +199,10 @@ async def get_dropdown_options_by_category(category: str) -> List[DropdownOption
     """
     Get all dropdown options for a specific category
     """
+    index = await _cached_dropdown_options_index()
+    if index is not None:
+        return list(index.by_category.get(category, []))
+
     query = """
     SELECT id, category, name, value, created_at, updated_at
     FROM lior_dropdown_options
@@ -121,6 +222,10 @@ async def get_all_dropdown_options() -> Dict[str, List[DropdownOptionInDB]]:
     """
     Get all dropdown options organized by category
     """
+    index = await _cached_dropdown_options_index()
+    if index is not None:
+        return {category: list(options) for category, options in index.by_category.items()}
+
     query = """
     SELECT id, category, name, value, created_at, updated_at
     FROM lior_dropdown_options
@@ -150,6 +255,10 @@ async def get_all_categories() -> List[str]:
     """
     Get a list of all distinct categories
     """
+    index = await _cached_dropdown_options_index()
+    if index is not None:
+        return list(index.by_category)
+
     query = """
     SELECT DISTINCT category
     FROM lior_dropdown_options
@@ -207,6 +316,7 @@ async def update_dropdown_option(
     conn = await get_connection()
     try:
         row = await conn.fetchrow(query, *values)
+        invalidate_dropdown_options_cache()
         if row:
             return DropdownOptionInDB.model_validate(dict(row))
         return None
@@ -227,84 +337,87 @@ async def delete_dropdown_option(option_id: uuid.UUID) -> bool:
     conn = await get_connection()
     try:
         row = await conn.fetchrow(query, option_id)
+        invalidate_dropdown_options_cache()
         return row is not None
     finally:
         await conn.close()
 
 
-async def check_option_in_use(option_id: uuid.UUID) -> bool:
+# Columns referencing dropdown options, by option category. Categories not
+# listed are never referenced by id: case_status is stored as text on cases,
+# and loan_goals was only used by the removed case_desired_products table.
+OPTION_REFERENCES: Dict[str, List[Tuple[str, str]]] = {
+    "asset_types": [("person_assets", "asset_type_id")],
+    "bank_account_types": [("person_bank_accounts", "account_type_id")],
+    "company_types": [("case_companies", "company_type_id")],
+    "credit_card_types": [("person_credit_cards", "card_type_id")],
+    "document_types": [("documents", "document_type_id")],
+    "document_categories": [("documents", "category_id")],
+    "employment_types": [("person_employment_history", "employment_type_id")],
+    "fin_org_types": [("fin_orgs", "type_id")],
+    "income_sources_types": [("person_income_sources", "income_source_type_id")],
+    "loan_types": [
+        ("cases", "loan_type_id"),
+        ("person_loans", "loan_type_id"),
+    ],
+    "person_marital_statuses": [("case_persons", "marital_status_id")],
+    "person_roles": [
+        ("case_persons", "role_id"),
+        ("case_companies", "role_id"),
+    ],
+    "related_person_relationships_types": [("case_person_relations", "relationship_type_id")],
+}
+
+
+def _references_exist_sql(category: str, option_id_sql: str) -> str:
     """
-    Check if a dropdown option is being used in any related tables
+    EXISTS over a UNION ALL of one probe per referencing column, which stops
+    at the first referencing row found.
     """
-    conn = await get_connection()
-    try:
-        # Get the option first to determine its category
-        option = await get_dropdown_option_by_id(option_id)
-        if not option:
-            return False
-
-        # Define tables to check based on category
-        tables_to_check = []
-
-        if option.category == 'asset_types':
-            tables_to_check.append(("person_assets", "asset_type_id"))
-
-        elif option.category == 'bank_account_types':
-            tables_to_check.append(("person_bank_accounts", "account_type_id"))
-
-        elif option.category == 'company_types':
-            tables_to_check.append(("case_companies", "company_type_id"))
-
-        elif option.category == 'credit_card_types':
-            tables_to_check.append(("person_credit_cards", "card_type_id"))
-
-        elif option.category == 'document_types':
-            tables_to_check.append(("documents", "document_type_id"))
-
-        elif option.category == 'document_categories':
-            tables_to_check.append(("documents", "category_id"))
-
-        elif option.category == 'employment_types':
-            tables_to_check.append(("person_employment_history", "employment_type_id"))
-
-        elif option.category == 'fin_org_types':
-            tables_to_check.append(("fin_orgs", "type_id"))
+    probes = "\n        UNION ALL\n        ".join(
+        f"SELECT 1 FROM {table} WHERE {column} = {option_id_sql}"
+        for table, column in OPTION_REFERENCES.get(category, [])
+    )
+    return f"EXISTS (\n        {probes}\n    )" if probes else "FALSE"
 
-        elif option.category == 'income_sources_types':
-            tables_to_check.append(("person_income_sources", "income_source_type_id"))
 
-        elif option.category == 'loan_goals':
-            tables_to_check.append(("case_desired_products", "loan_goal_id"))
+async def check_option_in_use(option_id: uuid.UUID) -> bool:
+    """
+    Check if a dropdown option is being used in any related tables
+    """
+    # Get the option first to determine its category
+    option = await get_dropdown_option_by_id(option_id)
+    if not option or option.category not in OPTION_REFERENCES:
+        return False
 
-        elif option.category == 'loan_types':
-            tables_to_check.append(("cases", "loan_type_id"))
-            tables_to_check.append(("person_loans", "loan_type_id"))
-            tables_to_check.append(("case_desired_products", "loan_type_id"))
+    query = f"SELECT {_references_exist_sql(option.category, '$1')}"
 
-        elif option.category == 'person_marital_statuses':
-            tables_to_check.append(("case_persons", "marital_status_id"))
+    conn = await get_connection()
+    try:
+        return await conn.fetchval(query, option_id)
+    finally:
+        await conn.close()
 
-        elif option.category == 'person_roles':
-            tables_to_check.append(("case_persons", "role_id"))
-            tables_to_check.append(("case_companies", "role_id"))
 
-        elif option.category == 'related_person_relationships_types':
-            tables_to_check.append(("case_person_relations", "relationship_type_id"))
+async def check_options_in_use(category: str) -> Dict[uuid.UUID, bool]:
+    """
+    Check which dropdown options of a category are being used in related tables
 
-        elif option.category == 'case_status':
-            # case_status is stored as enum in the cases table, not referenced by ID
-            return False
+    Args:
+        category: Dropdown option category
 
-        # Check each table for references to this option
-        for table, column in tables_to_check:
-            count = await conn.fetchval(
-                f"SELECT COUNT(*) FROM {table} WHERE {column} = $1",
-                option_id
-            )
-            if count > 0:
-                return True
+    Returns:
+        Whether each option of the category is in use, by option id
+    """
+    query = f"""
+    SELECT o.id, {_references_exist_sql(category, 'o.id')} AS in_use
+    FROM lior_dropdown_options o
+    WHERE o.category = $1
+    """
 
-        # If no references found in any tables
-        return False
+    conn = await get_connection()
+    try:
+        rows = await conn.fetch(query, category)
+        return {row["id"]: row["in_use"] for row in rows}
     finally:
-        await conn.close()
\ No newline at end of file
+        await conn.close()
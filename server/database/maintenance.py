@@ -0,0 +1,176 @@
+"""
+Background maintenance jobs run by the API process.
+
+Each job runs on its own interval in an asyncio task started from the
+application lifespan. Every uvicorn worker schedules every job, but a run
+first takes a Postgres advisory lock named after the job, so a run is
+skipped while another worker is executing the same job. Cleanup jobs delete
+in batches until nothing is left, keeping each statement short.
+
+Per-job runtime metrics are exposed by get_maintenance_stats().
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from server.database.auth_database import LoginAttempts, TokenBlacklist
+from server.database.case_stats_database import reconcile_case_stats
+from server.database.database import get_connection
+from server.database.users_database import cleanup_expired_lockouts
+from server.features.uploads.document_store import collect_unreferenced_objects
+from server.features.uploads.resumable import cleanup_expired_upload_sessions
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_SCHEDULER = {
+    "enabled": True,
+    # Seconds before the first run of each job, randomised up to this value so
+    # workers started together do not contend for the same locks
+    "initial_delay": 60.0,
+    # Rows deleted per statement by the batched cleanup jobs
+    "batch_size": 1000,
+    # Upper bound on batches per run, so one run cannot monopolise a connection
+    "max_batches": 100,
+}
+
+
+class MaintenanceJob(NamedTuple):
+    name: str
+    # Seconds between runs
+    interval: float
+    # Returns the number of rows affected
+    run: Callable[[], Awaitable[int]]
+
+
+async def _drain(cleanup: Callable[[int], Awaitable[int]]) -> int:
+    """Call a batched cleanup until a batch comes back short."""
+    batch_size = MAINTENANCE_SCHEDULER["batch_size"]
+    total = 0
+    for _ in range(MAINTENANCE_SCHEDULER["max_batches"]):
+        deleted = await cleanup(batch_size)
+        total += deleted
+        if deleted < batch_size:
+            break
+    return total
+
+
+async def _cleanup_token_blacklist() -> int:
+    return await _drain(lambda batch_size: TokenBlacklist.cleanup_expired(batch_size=batch_size))
+
+
+async def _cleanup_login_attempts() -> int:
+    return await _drain(lambda batch_size: LoginAttempts.cleanup_stale(batch_size=batch_size))
+
+
+async def _cleanup_upload_sessions() -> int:
+    return await _drain(cleanup_expired_upload_sessions)
+
+
+async def _reconcile_case_stats() -> int:
+    return len(await reconcile_case_stats(repair=True))
+
+
+MAINTENANCE_JOBS: List[MaintenanceJob] = [
+    MaintenanceJob("token_blacklist_cleanup", 3600.0, _cleanup_token_blacklist),
+    MaintenanceJob("user_lockout_cleanup", 300.0, cleanup_expired_lockouts),
+    MaintenanceJob("login_attempts_cleanup", 3600.0, _cleanup_login_attempts),
+    MaintenanceJob("case_stats_reconcile", 86400.0, _reconcile_case_stats),
+    MaintenanceJob("document_store_gc", 86400.0, collect_unreferenced_objects),
+    MaintenanceJob("upload_sessions_cleanup", 3600.0, _cleanup_upload_sessions),
+]
+
+_tasks: List[asyncio.Task] = []
+_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def get_maintenance_stats() -> Dict[str, Any]:
+    """
+    Run counts, last outcome and timings of each maintenance job in this worker.
+    """
+    return {
+        "enabled": MAINTENANCE_SCHEDULER["enabled"],
+        "running": bool(_tasks),
+        "jobs": {job.name: {"interval": job.interval, **_job_stats(job.name)} for job in MAINTENANCE_JOBS},
+    }
+
+
+def _job_stats(name: str) -> Dict[str, Any]:
+    return _stats.setdefault(name, {
+        "runs": 0,
+        "skipped_locked": 0,
+        "failures": 0,
+        "rows_affected_total": 0,
+        "last_started_at": None,
+        "last_duration_ms": None,
+        "last_rows_affected": None,
+        "last_error": None,
+    })
+
+
+async def run_maintenance_job(job: MaintenanceJob) -> Optional[int]:
+    """
+    Run a job once under its advisory lock.
+
+    Returns:
+        Rows affected, or None if another worker holds the lock or the run failed
+    """
+    stats = _job_stats(job.name)
+    lock_key = f"maintenance:{job.name}"
+
+    async with get_connection() as lock_conn:
+        if not await lock_conn.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", lock_key):
+            stats["skipped_locked"] += 1
+            return None
+        started = time.monotonic()
+        stats["last_started_at"] = datetime.now(timezone.utc)
+        try:
+            affected = await job.run() or 0
+        except Exception as e:
+            stats["failures"] += 1
+            stats["last_error"] = str(e)
+            logger.error(f"Maintenance job {job.name} failed: {str(e)}")
+            return None
+        finally:
+            stats["last_duration_ms"] = round((time.monotonic() - started) * 1000, 3)
+            await lock_conn.execute("SELECT pg_advisory_unlock(hashtext($1))", lock_key)
+
+    stats["runs"] += 1
+    stats["last_rows_affected"] = affected
+    stats["rows_affected_total"] += affected
+    stats["last_error"] = None
+    if affected:
+        logger.info(f"Maintenance job {job.name}: {affected} row(s) in {stats['last_duration_ms']}ms")
+    return affected
+
+
+async def _schedule(job: MaintenanceJob) -> None:
+    await asyncio.sleep(random.uniform(0, MAINTENANCE_SCHEDULER["initial_delay"]))
+    while True:
+        try:
+            await run_maintenance_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Lock connection unavailable; try again next interval
+            logger.error(f"Maintenance job {job.name} could not run: {str(e)}")
+        await asyncio.sleep(job.interval)
+
+
+def start_maintenance_scheduler() -> None:
+    """Schedule every maintenance job. Called from the application lifespan."""
+    if _tasks or not MAINTENANCE_SCHEDULER["enabled"]:
+        return
+    for job in MAINTENANCE_JOBS:
+        _tasks.append(asyncio.create_task(_schedule(job), name=f"maintenance:{job.name}"))
+
+
+async def stop_maintenance_scheduler() -> None:
+    """Cancel the scheduled jobs, waiting for running ones to unwind."""
+    tasks = list(_tasks)
+    _tasks.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,43 @@
+"""
+Database migration adding indexes on the foreign keys and filter columns
+used by the case pages.
+
+case_persons, case_documents and case_companies are looked up by case_id and
+the person_* tables by person_id on nearly every case request; without these
+indexes those lookups are sequential scans over all cases' data.
+case_documents needs no new index: its unique_case_document constraint
+(case_id, document_id) already serves lookups by case_id.
+
+Indexes are built CONCURRENTLY so the tables stay writable while they build.
+CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so this
+migration is marked non-transactional. A concurrent build that fails leaves
+an INVALID index behind; drop it and run the migration again.
+"""
+from typing import List, Tuple
+
+# (index name, table, indexed columns)
+INDEXES: List[Tuple[str, str, str]] = [
+    ("idx_case_persons_case_id", "case_persons", "case_id"),
+    ("idx_case_companies_case_id", "case_companies", "case_id"),
+    ("idx_person_bank_accounts_person_id", "person_bank_accounts", "person_id"),
+    ("idx_person_credit_cards_person_id", "person_credit_cards", "person_id"),
+    ("idx_person_loans_person_id", "person_loans", "person_id"),
+    ("idx_person_assets_person_id", "person_assets", "person_id"),
+    ("idx_person_income_sources_person_id", "person_income_sources", "person_id"),
+    ("idx_person_employment_history_person_id", "person_employment_history", "person_id"),
+    ("idx_processing_states_state_step_name", "processing_states", "state, step_name"),
+    # get_result_by_filename filters on file_name and takes the latest row
+    ("idx_document_processing_results_file_name", "document_processing_results", "file_name, processed_at DESC"),
+]
+
+TRANSACTIONAL = False
+
+UP_QUERIES = [
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}({columns});"
+    for name, table, columns in INDEXES
+]
+
+DOWN_QUERIES = [
+    f"DROP INDEX CONCURRENTLY IF EXISTS {name};"
+    for name, _, _ in INDEXES
+]
@@ -0,0 +1,37 @@
+"""
+Database migration adding the case_stats table and the triggers that keep it
+current.
+
+case_stats holds per-case counts of persons, entities and documents by status.
+The counters are adjusted by row triggers on cases, case_persons,
+case_companies, the person_* entity tables and case_documents, so every write
+path is covered without changes to the database modules. Existing cases are
+backfilled from the case_stats_expected view, which reconcile_case_stats also
+uses to detect drift.
+"""
+from typing import List
+
+from server.database.database_schema import CASE_STATS_QUERIES
+
+UP_QUERIES: List[str] = list(CASE_STATS_QUERIES)
+
+DOWN_QUERIES: List[str] = [
+    "DROP TRIGGER IF EXISTS case_stats_cases ON cases;",
+    "DROP TRIGGER IF EXISTS case_stats_case_persons ON case_persons;",
+    "DROP TRIGGER IF EXISTS case_stats_case_persons_entities ON case_persons;",
+    "DROP TRIGGER IF EXISTS case_stats_case_companies ON case_companies;",
+    "DROP TRIGGER IF EXISTS case_stats_person_bank_accounts ON person_bank_accounts;",
+    "DROP TRIGGER IF EXISTS case_stats_person_credit_cards ON person_credit_cards;",
+    "DROP TRIGGER IF EXISTS case_stats_person_loans ON person_loans;",
+    "DROP TRIGGER IF EXISTS case_stats_person_assets ON person_assets;",
+    "DROP TRIGGER IF EXISTS case_stats_person_income_sources ON person_income_sources;",
+    "DROP TRIGGER IF EXISTS case_stats_case_documents ON case_documents;",
+    "DROP FUNCTION IF EXISTS case_stats_count_document();",
+    "DROP FUNCTION IF EXISTS case_stats_apply_document(case_documents, INT);",
+    "DROP FUNCTION IF EXISTS case_stats_move_person_entities();",
+    "DROP FUNCTION IF EXISTS case_stats_count_entity();",
+    "DROP FUNCTION IF EXISTS case_stats_owner_case(TEXT, UUID);",
+    "DROP FUNCTION IF EXISTS case_stats_track_case();",
+    "DROP VIEW IF EXISTS case_stats_expected;",
+    "DROP TABLE IF EXISTS case_stats;",
+]
@@ -0,0 +1,29 @@
+"""
+Database migration adding the per-case version counter used to cache case
+overviews, and the table backing the optional cache shared between workers.
+
+case_stats.version is bumped by triggers on every table an overview reads,
+so a cached overview is valid exactly while the version it was stored under
+is current.
+"""
+from typing import List
+
+from server.database.database_schema import CASE_VERSION_QUERIES
+
+UP_QUERIES: List[str] = list(CASE_VERSION_QUERIES)
+
+DOWN_QUERIES: List[str] = [
+    "DROP TABLE IF EXISTS case_overview_cache;",
+    "DROP TRIGGER IF EXISTS case_version_required_for ON required_for;",
+    "DROP TRIGGER IF EXISTS case_version_unique_doc_types ON unique_doc_types;",
+    *[
+        f"DROP TRIGGER IF EXISTS case_version_{table} ON {table};"
+        for table in [
+            "cases", "case_persons", "case_companies", "case_documents", "person_bank_accounts",
+            "person_credit_cards", "person_loans", "person_assets", "person_income_sources",
+        ]
+    ],
+    "DROP FUNCTION IF EXISTS case_stats_bump_all_versions();",
+    "DROP FUNCTION IF EXISTS case_stats_bump_version();",
+    "ALTER TABLE case_stats DROP COLUMN IF EXISTS version;",
+]
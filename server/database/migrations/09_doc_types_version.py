@@ -0,0 +1,19 @@
+"""
+Database migration adding doc_types_version, a single-row counter bumped by
+every change to unique_doc_types or required_for.
+
+The required-documents engine caches the requirement matrix in process and
+reloads it only when this version moves.
+"""
+from typing import List
+
+from server.database.database_schema import DOC_TYPES_VERSION_QUERIES
+
+UP_QUERIES: List[str] = list(DOC_TYPES_VERSION_QUERIES)
+
+DOWN_QUERIES: List[str] = [
+    "DROP TRIGGER IF EXISTS doc_types_version_required_for ON required_for;",
+    "DROP TRIGGER IF EXISTS doc_types_version_unique_doc_types ON unique_doc_types;",
+    "DROP FUNCTION IF EXISTS bump_doc_types_version();",
+    "DROP TABLE IF EXISTS doc_types_version;",
+]
@@ -0,0 +1,21 @@
+"""
+Database migration adding case version triggers on the tables that only the
+formatted case export reads, so its cached snapshots and ETags change with
+them: employment history, person relations (through both of their
+persons), person documents and documents.
+Dropdown options are covered by catalog_version (16_catalog_version).
+"""
+from typing import List
+
+from server.database.database_schema import FORMATTED_CASE_VERSION_QUERIES
+
+UP_QUERIES: List[str] = list(FORMATTED_CASE_VERSION_QUERIES)
+
+DOWN_QUERIES: List[str] = [
+    "DROP TRIGGER IF EXISTS case_version_lior_dropdown_options ON lior_dropdown_options;",
+    "DROP TRIGGER IF EXISTS case_version_documents ON documents;",
+    "DROP FUNCTION IF EXISTS case_stats_bump_document_versions();",
+    "DROP TRIGGER IF EXISTS case_version_case_person_documents ON case_person_documents;",
+    "DROP TRIGGER IF EXISTS case_version_case_person_relations ON case_person_relations;",
+    "DROP TRIGGER IF EXISTS case_version_person_employment_history ON person_employment_history;",
+]
@@ -0,0 +1,15 @@
+"""
+Database migration adding a statement trigger that sends a NOTIFY on the
+lior_dropdown_options_changed channel whenever dropdown options are written,
+so API workers can drop their in-process option caches.
+"""
+from typing import List
+
+from server.database.database_schema import DROPDOWN_OPTIONS_NOTIFY_QUERIES
+
+UP_QUERIES: List[str] = list(DROPDOWN_OPTIONS_NOTIFY_QUERIES)
+
+DOWN_QUERIES: List[str] = [
+    "DROP TRIGGER IF EXISTS notify_lior_dropdown_options ON lior_dropdown_options;",
+    "DROP FUNCTION IF EXISTS notify_dropdown_options_changed();",
+]
@@ -0,0 +1,15 @@
+"""
+Database migration adding a row trigger that sends a NOTIFY on the
+users_changed channel, with the user id as payload, whenever a user row is
+updated or deleted, so API workers can evict that user from their caches.
+"""
+from typing import List
+
+from server.database.database_schema import USERS_NOTIFY_QUERIES
+
+UP_QUERIES: List[str] = list(USERS_NOTIFY_QUERIES)
+
+DOWN_QUERIES: List[str] = [
+    "DROP TRIGGER IF EXISTS notify_users ON users;",
+    "DROP FUNCTION IF EXISTS notify_user_changed();",
+]
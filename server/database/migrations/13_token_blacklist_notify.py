@@ -0,0 +1,15 @@
+"""
+Database migration adding a row trigger that sends a NOTIFY on the
+token_revoked channel for every token_blacklist insert, so API workers can
+keep their in-memory sets of revoked refresh tokens current.
+"""
+from typing import List
+
+from server.database.database_schema import TOKEN_BLACKLIST_NOTIFY_QUERIES
+
+UP_QUERIES: List[str] = list(TOKEN_BLACKLIST_NOTIFY_QUERIES)
+
+DOWN_QUERIES: List[str] = [
+    "DROP TRIGGER IF EXISTS notify_token_blacklist ON token_blacklist;",
+    "DROP FUNCTION IF EXISTS notify_token_revoked();",
+]
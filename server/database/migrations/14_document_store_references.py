@@ -0,0 +1,30 @@
+"""
+Database migration indexing the file_path columns that reference objects of
+the content-addressed document store.
+
+An object's references are the case_documents and document_version_history
+rows holding its path; the store counts them when collecting unreferenced
+objects, which would otherwise scan both tables for every object.
+
+Built CONCURRENTLY, so like 06_case_lookup_indexes this migration is
+non-transactional.
+"""
+from typing import List, Tuple
+
+# (index name, table, indexed columns)
+INDEXES: List[Tuple[str, str, str]] = [
+    ("idx_case_documents_file_path", "case_documents", "file_path"),
+    ("idx_document_version_history_file_path", "document_version_history", "file_path"),
+]
+
+TRANSACTIONAL = False
+
+UP_QUERIES = [
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}({columns});"
+    for name, table, columns in INDEXES
+]
+
+DOWN_QUERIES = [
+    f"DROP INDEX CONCURRENTLY IF EXISTS {name};"
+    for name, _, _ in INDEXES
+]
@@ -0,0 +1,13 @@
+"""
+Database migration adding upload_sessions, which tracks resumable uploads
+between their chunks.
+"""
+from typing import List
+
+from server.database.database_schema import UPLOAD_SESSIONS_QUERIES
+
+UP_QUERIES: List[str] = list(UPLOAD_SESSIONS_QUERIES)
+
+DOWN_QUERIES: List[str] = [
+    "DROP TABLE IF EXISTS upload_sessions;",
+]
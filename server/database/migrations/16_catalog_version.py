@@ -0,0 +1,26 @@
+"""
+Database migration replacing the triggers that bumped every case_stats
+version on a document type, requirement or dropdown option change with
+catalog_version, a single-row counter the case caches combine into their key.
+"""
+from typing import List
+
+from server.database.database_schema import CATALOG_VERSION_QUERIES
+
+UP_QUERIES: List[str] = [
+    "DROP TRIGGER IF EXISTS case_version_unique_doc_types ON unique_doc_types;",
+    "DROP TRIGGER IF EXISTS case_version_required_for ON required_for;",
+    "DROP TRIGGER IF EXISTS case_version_lior_dropdown_options ON lior_dropdown_options;",
+    "DROP FUNCTION IF EXISTS case_stats_bump_all_versions();",
+    *CATALOG_VERSION_QUERIES,
+]
+
+DOWN_QUERIES: List[str] = [
+    *[
+        f"DROP TRIGGER IF EXISTS catalog_version_{table} ON {table};"
+        for table in ["unique_doc_types", "required_for", "lior_dropdown_options"]
+    ],
+    "DROP FUNCTION IF EXISTS bump_catalog_version();",
+    "ALTER TABLE case_overview_cache DROP COLUMN IF EXISTS catalog_version;",
+    "DROP TABLE IF EXISTS catalog_version;",
+]
@@ -0,0 +1,16 @@
+"""
+Database migration adding a trigger that sends a NOTIFY on the
+doc_types_changed channel whenever doc_types_version moves, so API workers
+can drop their in-process document type registries instead of checking the
+version on every read.
+"""
+from typing import List
+
+from server.database.database_schema import DOC_TYPES_NOTIFY_QUERIES
+
+UP_QUERIES: List[str] = list(DOC_TYPES_NOTIFY_QUERIES)
+
+DOWN_QUERIES: List[str] = [
+    "DROP TRIGGER IF EXISTS notify_doc_types_version ON doc_types_version;",
+    "DROP FUNCTION IF EXISTS notify_doc_types_changed();",
+]
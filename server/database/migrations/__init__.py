@@ -6,6 +6,8 @@ import os
 import importlib
 from typing import List, Dict, Any
 
+import asyncpg
+
 # Import all migration modules
 def get_migration_modules() -> List[Dict[str, Any]]:
     """
@@ -37,3 +39,28 @@ def get_migration_modules() -> List[Dict[str, Any]]:
             print(f"Error importing migration module {module_name}: {str(e)}")
     
     return migrations
+
+
+async def apply_migrations(conn) -> None:
+    """
+    Run the UP_QUERIES of every migration module in order.
+
+    Migrations are written to be idempotent, so they are safe to re-run.
+    Modules run inside a transaction unless they set TRANSACTIONAL = False
+    (required for CREATE INDEX CONCURRENTLY); statements of those modules run
+    one at a time and a statement on a table that does not exist yet is skipped.
+    """
+    for migration in get_migration_modules():
+        module = migration['module']
+        queries = getattr(module, 'UP_QUERIES', [])
+        if getattr(module, 'TRANSACTIONAL', True):
+            async with conn.transaction():
+                for query in queries:
+                    await conn.execute(query)
+        else:
+            for query in queries:
+                try:
+                    await conn.execute(query)
+                except asyncpg.UndefinedTableError as e:
+                    print(f"Skipping statement in migration {migration['name']}: {str(e)}")
+        print(f"Applied migration {migration['name']}")
@@ -0,0 +1,113 @@
+"""
+Process-wide LISTEN connection for Postgres notifications.
+
+Modules that keep in-process copies of database state register a handler for
+the channel their triggers NOTIFY on. One dedicated connection (outside the
+pool) listens on every registered channel for the lifetime of the API
+process. If it drops, every handler is called as if a notification had
+arrived, since notifications sent meanwhile are lost, and the connection is
+re-established in the background.
+
+Outside the API process no listener runs; is_listening() is then False and
+callers should read from the database instead of trusting their copies.
+"""
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+
+from server.database.database import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATIONS_CONFIG = {
+    # Seconds to wait before reconnecting a dropped listener connection
+    "reconnect_interval": 5.0,
+}
+
+# Handlers by channel; each is called with the notification payload
+_handlers: Dict[str, List[Callable[[str], None]]] = {}
+
+_listener_task: Optional[asyncio.Task] = None
+_listening = False
+
+
+def register_notification_handler(channel: str, handler: Callable[[str], None]) -> None:
+    """
+    Call handler with the payload of every NOTIFY on channel.
+    Register at import time, before start_notification_listener runs.
+    """
+    _handlers.setdefault(channel, []).append(handler)
+
+
+def is_listening() -> bool:
+    """Whether notifications are currently being received."""
+    return _listening
+
+
+async def start_notification_listener() -> None:
+    """
+    Start listening on every registered channel.
+    Called once from the application lifespan; returns once the first
+    connection attempt has been made.
+    """
+    global _listener_task
+    if _listener_task is not None:
+        return
+    connected = asyncio.Event()
+    _listener_task = asyncio.create_task(_listen(connected))
+    await connected.wait()
+
+
+async def stop_notification_listener() -> None:
+    """Stop listening and close the listener connection."""
+    global _listener_task
+    if _listener_task is None:
+        return
+    task, _listener_task = _listener_task, None
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def _dispatch(channel: str, payload: str) -> None:
+    for handler in _handlers.get(channel, []):
+        try:
+            handler(payload)
+        except Exception as e:
+            logger.error(f"Notification handler for {channel} failed: {str(e)}")
+
+
+async def _listen(connected: asyncio.Event) -> None:
+    """Keep a listener connection open, reconnecting when it drops."""
+    global _listening
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(**DB_CONFIG)
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: closed.set())
+            for channel in _handlers:
+                await conn.add_listener(channel, lambda _conn, _pid, channel, payload: _dispatch(channel, payload))
+            _listening = True
+            logger.info(f"Listening for notifications on: {', '.join(_handlers) or '(no channels)'}")
+            connected.set()
+            await closed.wait()
+            logger.warning("Notification listener connection lost")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Notification listener failed: {str(e)}")
+        finally:
+            was_listening, _listening = _listening, False
+            if was_listening:
+                # Anything sent while disconnected is lost: treat it as changed
+                for channel in _handlers:
+                    _dispatch(channel, "")
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+            connected.set()
+        await asyncio.sleep(NOTIFICATIONS_CONFIG["reconnect_interval"])
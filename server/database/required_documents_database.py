@@ -0,0 +1,179 @@
+"""
+Required-documents evaluation engine.
+
+The requirement matrix (every unique_doc_types row that has at least one
+required_for entry, grouped by target_object) is derived from the document
+type registry and rebuilt only when doc_types_version moves. A case is evaluated in a single
+pass over its documents: each entity is matched against the doc types
+required for its target_object, giving per-entity missing documents and the
+aggregate counts used by the overview endpoints.
+"""
+import uuid
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from server.database.database import get_connection
+from server.database.unique_docs_database import get_doc_type_registry
+
+
+class RequiredDocType(BaseModel):
+    """A document type required for entities of its target_object"""
+    id: uuid.UUID
+    display_name: str
+    target_object: str
+    required_for: List[str] = Field(default_factory=list)
+
+
+class RequirementMatrix(BaseModel):
+    """Required document types by target_object, at a doc_types_version"""
+    version: int
+    by_target: Dict[str, List[RequiredDocType]] = Field(default_factory=dict)
+
+    def required_for_target(self, target_object: str) -> List[RequiredDocType]:
+        return self.by_target.get(target_object, [])
+
+
+class EntityRequirementStatus(BaseModel):
+    """Required documents an entity is missing"""
+    entity_type: str
+    entity_id: uuid.UUID
+    missing: List[RequiredDocType] = Field(default_factory=list)
+
+    @property
+    def is_complete(self) -> bool:
+        return not self.missing
+
+
+class CaseRequirementReport(BaseModel):
+    """Result of evaluating every entity of a case against the matrix"""
+    entities: List[EntityRequirementStatus] = Field(default_factory=list)
+    # Total (entity, doc type) pairs without a linked document
+    missing_required_documents: int = 0
+    # Entities missing at least one required document
+    incomplete_entities: int = 0
+
+
+# Every entity of the case as (target_object type, id)
+CASE_ENTITY_REFS_QUERY = """
+WITH case_person_ids AS (
+    SELECT id FROM case_persons WHERE case_id = $1
+)
+SELECT 'person' AS entity_type, id AS entity_id FROM case_person_ids
+UNION ALL
+SELECT 'company', id FROM case_companies WHERE case_id = $1
+UNION ALL
+SELECT 'bank_account', id FROM person_bank_accounts WHERE person_id IN (SELECT id FROM case_person_ids)
+UNION ALL
+SELECT 'credit_card', id FROM person_credit_cards WHERE person_id IN (SELECT id FROM case_person_ids)
+UNION ALL
+SELECT 'loan', id FROM person_loans WHERE person_id IN (SELECT id FROM case_person_ids)
+UNION ALL
+SELECT 'asset', id FROM person_assets WHERE person_id IN (SELECT id FROM case_person_ids)
+UNION ALL
+SELECT 'income', id FROM person_income_sources WHERE person_id IN (SELECT id FROM case_person_ids)
+"""
+
+# Only documents that are typed and linked can satisfy a requirement
+CASE_LINKED_DOCUMENTS_QUERY = """
+SELECT doc_type_id, target_object_type, target_object_id
+FROM case_documents
+WHERE case_id = $1
+  AND doc_type_id IS NOT NULL
+  AND target_object_type IS NOT NULL
+  AND target_object_id IS NOT NULL
+"""
+
+_matrix: Optional[RequirementMatrix] = None
+
+
+async def get_requirement_matrix() -> RequirementMatrix:
+    """
+    Get the requirement matrix, reloading it only if doc_types_version moved.
+
+    Returns:
+        RequirementMatrix: Required document types by target_object
+    """
+    global _matrix
+
+    registry = await get_doc_type_registry()
+    matrix = _matrix
+    if matrix is not None and matrix.version == registry.version:
+        return matrix
+
+    by_target: Dict[str, List[RequiredDocType]] = {}
+    for target_object, doc_types in sorted(registry.by_target_object.items()):
+        required = [
+            RequiredDocType(
+                id=doc_type.id,
+                display_name=doc_type.display_name,
+                target_object=doc_type.target_object,
+                required_for=list(doc_type.required_for),
+            )
+            for doc_type in doc_types
+            if doc_type.required_for
+        ]
+        if required:
+            by_target[target_object] = required
+
+    matrix = RequirementMatrix(version=registry.version, by_target=by_target)
+    if registry.version >= 0:
+        _matrix = matrix
+    return matrix
+
+
+def evaluate_requirements(
+    matrix: RequirementMatrix,
+    entities: Iterable[Tuple[str, uuid.UUID]],
+    documents: Iterable[Tuple[Optional[uuid.UUID], Optional[str], Optional[uuid.UUID]]],
+) -> CaseRequirementReport:
+    """
+    Match entities against the matrix in one pass over the documents.
+
+    Args:
+        matrix: Requirement matrix
+        entities: (target_object type, entity id) of every entity to evaluate
+        documents: (doc_type_id, target_object_type, target_object_id) of the case's documents
+
+    Returns:
+        CaseRequirementReport: Per-entity missing documents and aggregate counts
+    """
+    present: Set[Tuple[str, uuid.UUID, uuid.UUID]] = {
+        (target_type, target_id, doc_type_id)
+        for doc_type_id, target_type, target_id in documents
+        if doc_type_id is not None and target_type is not None and target_id is not None
+    }
+
+    report = CaseRequirementReport()
+    for entity_type, entity_id in entities:
+        missing = [
+            doc_type for doc_type in matrix.required_for_target(entity_type)
+            if (entity_type, entity_id, doc_type.id) not in present
+        ]
+        report.entities.append(EntityRequirementStatus(entity_type=entity_type, entity_id=entity_id, missing=missing))
+        report.missing_required_documents += len(missing)
+        if missing:
+            report.incomplete_entities += 1
+    return report
+
+
+async def evaluate_case_requirements(case_id: uuid.UUID) -> CaseRequirementReport:
+    """
+    Evaluate which entity of a case is missing which required document type.
+
+    Args:
+        case_id: UUID of the case
+
+    Returns:
+        CaseRequirementReport: Per-entity missing documents and aggregate counts
+    """
+    matrix = await get_requirement_matrix()
+    async with get_connection() as conn:
+        entity_rows = await conn.fetch(CASE_ENTITY_REFS_QUERY, case_id)
+        document_rows = await conn.fetch(CASE_LINKED_DOCUMENTS_QUERY, case_id)
+
+    return evaluate_requirements(
+        matrix,
+        ((row["entity_type"], row["entity_id"]) for row in entity_rows),
+        ((row["doc_type_id"], row["target_object_type"], row["target_object_id"]) for row in document_rows),
+    )
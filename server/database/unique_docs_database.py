@@ -1,5 +1,12 @@
 """
 Database operations for unique document types management.
+
+Reads are served from an in-process registry holding every doc type with its
+required_for values, indexed by id, category and target_object. It is loaded
+with a single query. Triggers bump doc_types_version on every write to
+unique_doc_types or required_for and NOTIFY every worker of the new version,
+which drops the registry; the next read reloads it. Without a listener
+(scripts, migrations) each read checks doc_types_version instead.
 """
 import json
 import csv
@@ -11,6 +18,9 @@ from enum import Enum, auto
 from pydantic import BaseModel, Field, ConfigDict
 
 from server.database.database import get_connection
+from server.database.notifications import is_listening, register_notification_handler
+
+DOC_TYPES_CHANNEL = "doc_types_changed"
 
 
 # -------------------------------------------------
@@ -100,6 +110,105 @@ class UniqueDocTypeInDB(UniqueDocTypeBase):
     updated_at: datetime
 
 
+# -------------------------------------------------
+# Registry
+# -------------------------------------------------
+class DocTypeRegistry(BaseModel):
+    """Every unique document type at a doc_types_version, ordered by display_name"""
+    version: int
+    doc_types: List[UniqueDocTypeInDB] = Field(default_factory=list)
+    by_id: Dict[UUID, UniqueDocTypeInDB] = Field(default_factory=dict)
+    by_category: Dict[str, List[UniqueDocTypeInDB]] = Field(default_factory=dict)
+    by_target_object: Dict[str, List[UniqueDocTypeInDB]] = Field(default_factory=dict)
+
+    @classmethod
+    def from_doc_types(cls, version: int, doc_types: List[UniqueDocTypeInDB]) -> "DocTypeRegistry":
+        registry = cls(version=version, doc_types=doc_types)
+        for doc_type in doc_types:
+            registry.by_id[doc_type.id] = doc_type
+            registry.by_category.setdefault(doc_type.category, []).append(doc_type)
+            registry.by_target_object.setdefault(doc_type.target_object, []).append(doc_type)
+        return registry
+
+
+DOC_TYPES_QUERY = """
+SELECT dt.id, dt.display_name, dt.category, dt.issuer, dt.target_object,
+       dt.document_type, dt.is_recurring, dt.frequency,
+       dt.created_at, dt.updated_at,
+       COALESCE(
+           array_agg(rf.required_for ORDER BY rf.required_for) FILTER (WHERE rf.required_for IS NOT NULL),
+           '{}'
+       ) AS required_for
+FROM unique_doc_types dt
+LEFT JOIN required_for rf ON rf.doc_type_id = dt.id
+GROUP BY dt.id
+ORDER BY dt.display_name
+"""
+
+# The doc_types_version the reading transaction sees; has_writes tells whether
+# it has written anything, in which case it may see its own uncommitted doc
+# types and what it loads must not be cached
+DOC_TYPES_VERSION_QUERY = """
+SELECT (SELECT version FROM doc_types_version) AS version,
+       txid_current_if_assigned() IS NOT NULL AS has_writes
+"""
+
+_registry: Optional[DocTypeRegistry] = None
+# Bumped by every invalidation, so a load that raced one is not kept
+_registry_generation = 0
+
+
+def invalidate_doc_type_registry(payload: str = "") -> None:
+    """
+    Drop this worker's document type registry.
+    Called for every NOTIFY on DOC_TYPES_CHANNEL.
+    """
+    global _registry, _registry_generation
+    _registry = None
+    _registry_generation += 1
+
+
+register_notification_handler(DOC_TYPES_CHANNEL, invalidate_doc_type_registry)
+
+
+async def get_doc_type_registry() -> DocTypeRegistry:
+    """
+    Get the document type registry, from this worker's cache while the
+    notification listener keeps it current. Otherwise doc_types_version is
+    checked, on the caller's connection, and the registry reloaded if it moved.
+
+    The registry and its models are shared and must not be mutated.
+
+    Returns:
+        DocTypeRegistry: Every unique document type with its indexes
+    """
+    global _registry
+
+    registry = _registry
+    if registry is not None and is_listening():
+        return registry
+
+    generation = _registry_generation
+    async with get_connection() as conn:
+        state = await conn.fetchrow(DOC_TYPES_VERSION_QUERY)
+        version = state["version"]
+        if registry is not None and version is not None and registry.version == version:
+            return registry
+
+        rows = await conn.fetch(DOC_TYPES_QUERY)
+
+    # Version -1 marks a registry that may not match any committed version,
+    # so that nothing derived from it is cached either
+    cacheable = version is not None and not state["has_writes"]
+    registry = DocTypeRegistry.from_doc_types(
+        version if cacheable else -1,
+        [UniqueDocTypeInDB.model_validate(dict(row)) for row in rows]
+    )
+    if cacheable and generation == _registry_generation:
+        _registry = registry
+    return registry
+
+
 # -------------------------------------------------
 # CRUD Operations
 # -------------------------------------------------
@@ -156,7 +265,9 @@ async def create_unique_doc_type(doc_type: UniqueDocTypeCreate) -> UniqueDocType
             # Prepare the response with required_for list
             doc_dict['required_for'] = [rf for rf in doc_type.required_for]
 
-            return UniqueDocTypeInDB.model_validate(doc_dict)
+        # Other workers are notified by the trigger; do not wait for our own copy
+        invalidate_doc_type_registry()
+        return UniqueDocTypeInDB.model_validate(doc_dict)
     finally:
         await conn.close()
 
@@ -165,6 +276,12 @@ async def get_unique_doc_type(doc_type_id: UUID) -> Optional[UniqueDocTypeInDB]:
     """
     Get a specific unique document type by ID.
     """
+    registry = await get_doc_type_registry()
+    doc_type = registry.by_id.get(doc_type_id)
+    if doc_type is not None:
+        return doc_type
+
+    # Not committed yet (created in the caller's unit of work) or not found
     conn = await get_connection()
     try:
         # Get the main document type record
@@ -308,9 +425,8 @@ async def update_unique_doc_type(
                     """
                     required_for_rows = await conn.fetch(required_for_query, doc_type_id)
                     doc_dict['required_for'] = [row['required_for'] for row in required_for_rows]
-
-                return UniqueDocTypeInDB.model_validate(doc_dict)
             else:
+                doc_dict = None
                 # If no fields to update in the main table, but required_for is updated
                 if doc_type_update.required_for is not None:
                     # Delete existing relationships
@@ -330,8 +446,11 @@ async def update_unique_doc_type(
                             rf
                         )
 
-                # Return the updated document type
-                return await get_unique_doc_type(doc_type_id)
+        invalidate_doc_type_registry()
+        if doc_dict is not None:
+            return UniqueDocTypeInDB.model_validate(doc_dict)
+        # Return the updated document type
+        return await get_unique_doc_type(doc_type_id)
     finally:
         await conn.close()
 
@@ -376,6 +495,7 @@ async def delete_unique_doc_type(doc_type_id: UUID) -> bool:
         # Delete the document type (required_for will be deleted by CASCADE)
         delete_query = "DELETE FROM unique_doc_types WHERE id = $1"
         await conn.execute(delete_query, doc_type_id)
+        invalidate_doc_type_registry()
 
         return True
     finally:
@@ -386,119 +506,24 @@ async def list_unique_doc_types() -> List[UniqueDocTypeInDB]:
     """
     Get all unique document types.
     """
-    conn = await get_connection()
-    try:
-        # Get all document types
-        query = """
-        SELECT id, display_name, category, issuer, target_object,
-               document_type, is_recurring, frequency,
-               created_at, updated_at
-        FROM unique_doc_types
-        ORDER BY display_name
-        """
-        records = await conn.fetch(query)
-
-        result = []
-
-        for record in records:
-            doc_dict = dict(record)
-
-            # Get required_for values
-            required_for_query = """
-            SELECT required_for
-            FROM required_for
-            WHERE doc_type_id = $1
-            """
-            required_for_rows = await conn.fetch(required_for_query, doc_dict['id'])
-
-            # Add required_for to the result
-            doc_dict['required_for'] = [row['required_for'] for row in required_for_rows]
-
-            result.append(UniqueDocTypeInDB.model_validate(doc_dict))
-
-        return result
-    finally:
-        await conn.close()
+    registry = await get_doc_type_registry()
+    return list(registry.doc_types)
 
 
 async def filter_by_category(category: str) -> List[UniqueDocTypeInDB]:
     """
     Filter unique document types by category.
     """
-    conn = await get_connection()
-    try:
-        # Get document types by category
-        query = """
-        SELECT id, display_name, category, issuer, target_object,
-               document_type, is_recurring, frequency,
-               created_at, updated_at
-        FROM unique_doc_types
-        WHERE category = $1
-        ORDER BY display_name
-        """
-        records = await conn.fetch(query, category)
-
-        result = []
-
-        for record in records:
-            doc_dict = dict(record)
-
-            # Get required_for values
-            required_for_query = """
-            SELECT required_for
-            FROM required_for
-            WHERE doc_type_id = $1
-            """
-            required_for_rows = await conn.fetch(required_for_query, doc_dict['id'])
-
-            # Add required_for to the result
-            doc_dict['required_for'] = [row['required_for'] for row in required_for_rows]
-
-            result.append(UniqueDocTypeInDB.model_validate(doc_dict))
-
-        return result
-    finally:
-        await conn.close()
+    registry = await get_doc_type_registry()
+    return list(registry.by_category.get(category, []))
 
 
 async def filter_by_target_object(target_object: str) -> List[UniqueDocTypeInDB]:
     """
     Filter unique document types by target object.
     """
-    conn = await get_connection()
-    try:
-        # Get document types by target object
-        query = """
-        SELECT id, display_name, category, issuer, target_object,
-               document_type, is_recurring, frequency,
-               created_at, updated_at
-        FROM unique_doc_types
-        WHERE target_object = $1
-        ORDER BY display_name
-        """
-        records = await conn.fetch(query, target_object)
-
-        result = []
-
-        for record in records:
-            doc_dict = dict(record)
-
-            # Get required_for values
-            required_for_query = """
-            SELECT required_for
-            FROM required_for
-            WHERE doc_type_id = $1
-            """
-            required_for_rows = await conn.fetch(required_for_query, doc_dict['id'])
-
-            # Add required_for to the result
-            doc_dict['required_for'] = [row['required_for'] for row in required_for_rows]
-
-            result.append(UniqueDocTypeInDB.model_validate(doc_dict))
-
-        return result
-    finally:
-        await conn.close()
+    registry = await get_doc_type_registry()
+    return list(registry.by_target_object.get(target_object, []))
 
 
 async def import_doc_types_from_csv(csv_content: str) -> Dict[str, Any]:
@@ -0,0 +1,161 @@
+"""
+Database operations for resumable upload sessions.
+
+A session tracks one file being uploaded in chunks: where it belongs (a case,
+and optionally a document of that case), its declared size and checksum, and
+how many bytes have been received so far. The received bytes themselves live
+on disk (see server.features.uploads.resumable).
+"""
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from server.database.database import get_connection
+
+
+# ------------------------------------------------
+# Pydantic Models
+# ------------------------------------------------
+class UploadSessionCreate(BaseModel):
+    filename: str
+    total_size: int = Field(..., gt=0)
+    # Hex SHA-256 of the whole file, checked when the upload is completed
+    sha256: Optional[str] = Field(None, pattern=r"^[0-9a-fA-F]{64}$")
+    # Document of the case the file is uploaded for; a bulk (unidentified) upload if omitted
+    document_id: Optional[UUID] = None
+
+
+class UploadSessionInDB(BaseModel):
+    id: UUID
+    case_id: UUID
+    document_id: Optional[UUID] = None
+    filename: str
+    total_size: int
+    sha256: Optional[str] = None
+    received_size: int
+    created_by: Optional[UUID] = None
+    created_at: datetime
+    updated_at: datetime
+    expires_at: datetime
+
+
+UPLOAD_SESSION_COLUMNS = """
+id, case_id, document_id, filename, total_size, sha256, received_size,
+created_by, created_at, updated_at, expires_at
+"""
+
+
+# ------------------------------------------------
+# CRUD Operations
+# ------------------------------------------------
+async def create_upload_session(
+        case_id: UUID,
+        session_in: UploadSessionCreate,
+        ttl_seconds: float,
+        created_by: Optional[UUID] = None
+) -> UploadSessionInDB:
+    """
+    Create an upload session expiring ttl_seconds after its last chunk.
+    """
+    async with get_connection() as conn:
+        record = await conn.fetchrow(
+            f"""
+            INSERT INTO upload_sessions (
+                case_id, document_id, filename, total_size, sha256, created_by, expires_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, NOW() + make_interval(secs => $7))
+            RETURNING {UPLOAD_SESSION_COLUMNS}
+            """,
+            case_id,
+            session_in.document_id,
+            session_in.filename,
+            session_in.total_size,
+            session_in.sha256.lower() if session_in.sha256 else None,
+            created_by,
+            ttl_seconds
+        )
+        return UploadSessionInDB(**dict(record))
+
+
+async def get_upload_session(session_id: UUID) -> Optional[UploadSessionInDB]:
+    """
+    Get an upload session by ID, or None if it does not exist or has expired.
+    """
+    async with get_connection() as conn:
+        record = await conn.fetchrow(
+            f"""
+            SELECT {UPLOAD_SESSION_COLUMNS}
+            FROM upload_sessions
+            WHERE id = $1 AND expires_at > NOW()
+            """,
+            session_id
+        )
+        return UploadSessionInDB(**dict(record)) if record else None
+
+
+async def advance_upload_session(
+        session_id: UUID,
+        offset: int,
+        received_size: int,
+        ttl_seconds: float
+) -> Optional[UploadSessionInDB]:
+    """
+    Record the bytes received up to received_size, provided the session was
+    still at offset, and push back its expiry.
+
+    Returns:
+        The updated session, or None if it expired or moved past offset meanwhile
+    """
+    async with get_connection() as conn:
+        record = await conn.fetchrow(
+            f"""
+            UPDATE upload_sessions
+            SET received_size = $3,
+                updated_at = NOW(),
+                expires_at = NOW() + make_interval(secs => $4)
+            WHERE id = $1 AND received_size = $2 AND expires_at > NOW()
+            RETURNING {UPLOAD_SESSION_COLUMNS}
+            """,
+            session_id,
+            offset,
+            received_size,
+            ttl_seconds
+        )
+        return UploadSessionInDB(**dict(record)) if record else None
+
+
+async def delete_upload_session(session_id: UUID) -> bool:
+    """
+    Delete an upload session by ID.
+    Returns True if the session was deleted, False if not found.
+    """
+    async with get_connection() as conn:
+        result = await conn.execute("DELETE FROM upload_sessions WHERE id = $1", session_id)
+        return result == "DELETE 1"
+
+
+async def delete_expired_upload_sessions(batch_size: int) -> List[UUID]:
+    """
+    Delete up to batch_size expired upload sessions.
+
+    Returns:
+        IDs of the deleted sessions
+    """
+    async with get_connection() as conn:
+        rows = await conn.fetch(
+            """
+            DELETE FROM upload_sessions
+            WHERE id IN (
+                SELECT id FROM upload_sessions
+                WHERE expires_at <= NOW()
+                ORDER BY expires_at
+                LIMIT $1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id
+            """,
+            batch_size
+        )
+        return [row["id"] for row in rows]
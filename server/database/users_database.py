@@ -1,17 +1,18 @@
 import asyncpg
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pydantic import BaseModel, Field, validator, constr
 from typing import Optional, Dict, List, Tuple, Literal
 import pytz
 import re
 import uuid
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 import json
 
 from server.database.database import get_connection
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from server.database.notifications import register_notification_handler
+from server.features.users.passwords import hash_password, verify_password, dummy_verify
 
 # Using string literals instead of enums
 # This provides flexibility while still having some type safety
@@ -55,6 +56,10 @@ class UserProfileUpdate(BaseModel):
     avatar: Optional[str] = None
 
 
+class UserStatusUpdate(BaseModel):
+    status: UserStatus
+
+
 class PasswordChange(BaseModel):
     current_password: str
     new_password: str
@@ -150,46 +155,136 @@ class PaginatedUsers(BaseModel):
 
 
 async def create_user(user: UserCreate) -> UserInDB:
-    hashed_password = pwd_context.hash(user.password)
-    conn = await get_connection()
-    async with conn.transaction():
-        try:
-            row = await conn.fetchrow("""
-                    INSERT INTO users (email, first_name, last_name, password_hash)
-                    VALUES ($1, $2, $3, $4)
-                    RETURNING *
-                    """,
-                                      user.email.lower(),
-                                      user.first_name,
-                                      user.last_name,
-                                      hashed_password
-                                      )
-            row = dict(row)
-            return UserInDB.from_database(row)
-        except asyncpg.UniqueViolationError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+    hashed_password = await hash_password(user.password)
+    async with get_connection() as conn:
+        async with conn.transaction():
+            try:
+                row = await conn.fetchrow("""
+                        INSERT INTO users (email, first_name, last_name, password_hash)
+                        VALUES ($1, $2, $3, $4)
+                        RETURNING *
+                        """,
+                                          user.email.lower(),
+                                          user.first_name,
+                                          user.last_name,
+                                          hashed_password
+                                          )
+                row = dict(row)
+                return UserInDB.from_database(row)
+            except asyncpg.UniqueViolationError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already registered"
+                )
+
+
+# Users resolved for authenticated requests. Entries are evicted by the write
+# functions below and, in every worker, by the users_changed notification;
+# the TTL bounds staleness from writes neither path sees.
+USER_CACHE = {
+    "max_entries": 1024,
+    "ttl_seconds": 60.0,
+}
+
+USERS_CHANNEL = "users_changed"
+
+
+class _UserCache:
+    """Size-bounded LRU of users whose entries expire after ttl_seconds"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[uuid.UUID, Tuple[float, UserInDB]]" = OrderedDict()
+        # Bumped by every eviction, so a load that raced one is not kept
+        self.generation = 0
+
+    def get(self, user_id: uuid.UUID) -> Optional[UserInDB]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[1]
+
+    def set(self, user_id: uuid.UUID, user: UserInDB) -> None:
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def evict(self, user_id: uuid.UUID) -> None:
+        self._entries.pop(user_id, None)
+        self.generation += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.generation += 1
+
+
+_user_cache = _UserCache(USER_CACHE["max_entries"], USER_CACHE["ttl_seconds"])
+
+
+def invalidate_cached_user(user_id: uuid.UUID) -> None:
+    """
+    Evict a user from this worker's cache.
+    """
+    _user_cache.evict(user_id)
+
+
+def _on_user_changed(payload: str) -> None:
+    # An empty payload means notifications may have been missed
+    if payload:
+        invalidate_cached_user(uuid.UUID(payload))
+    else:
+        _user_cache.clear()
+
+
+register_notification_handler(USERS_CHANNEL, _on_user_changed)
+
+
+async def get_cached_user(user_id: uuid.UUID) -> Optional[UserInDB]:
+    """
+    Get an active (not deleted) user, from this worker's cache when possible.
+
+    The returned model may be shared with other callers and must not be mutated.
+
+    Args:
+        user_id: UUID of the user
+
+    Returns:
+        UserInDB, or None if the user does not exist or is deleted
+    """
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    generation = _user_cache.generation
+    user = await get_user(user_id)
+    if user is not None and generation == _user_cache.generation:
+        _user_cache.set(user_id, user)
+    return user
 
 
 async def get_user(user_id: uuid.UUID) -> Optional[UserInDB]:
-    conn = await get_connection()
-    async with conn.transaction():
-        row = await conn.fetchrow(
-            "SELECT * FROM users WHERE id = $1 AND deleted_at IS NULL",
-            user_id
-        )
-        return UserInDB.from_database(dict(row)) if row else None
+    async with get_connection() as conn:
+        async with conn.transaction():
+            row = await conn.fetchrow(
+                "SELECT * FROM users WHERE id = $1 AND deleted_at IS NULL",
+                user_id
+            )
+            return UserInDB.from_database(dict(row)) if row else None
 
 
 async def get_user_by_email(email: str) -> Optional[UserInDB]:
-    conn = await get_connection()
-    row = await conn.fetchrow(
-        "SELECT * FROM users WHERE email = $1 AND deleted_at IS NULL",
-        email.lower()
-    )
-    return UserInDB.from_database(dict(row)) if row else None
+    async with get_connection() as conn:
+        row = await conn.fetchrow(
+            "SELECT * FROM users WHERE email = $1 AND deleted_at IS NULL",
+            email.lower()
+        )
+        return UserInDB.from_database(dict(row)) if row else None
 
 
 async def update_user_profile(user_id: uuid.UUID, update_data: UserUpdate) -> UserPublic:
@@ -216,95 +311,106 @@ async def update_user_profile(user_id: uuid.UUID, update_data: UserUpdate) -> Us
     """
     params.append(user_id)
 
-    conn = await get_connection()
-    async with conn.transaction():
-        try:
-            row = await conn.fetchrow(query, *params)
-            if not row:
+    async with get_connection() as conn:
+        async with conn.transaction():
+            try:
+                row = await conn.fetchrow(query, *params)
+                invalidate_cached_user(user_id)
+                if not row:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="User not found"
+                    )
+                return UserPublic.from_database(dict(row))
+            except asyncpg.UniqueViolationError:
                 raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already in use"
                 )
-            return UserPublic.from_database(dict(row))
-        except asyncpg.UniqueViolationError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already in use"
-            )
 
 
 async def update_failed_login(user_id: uuid.UUID, reset: bool = False):
-    conn = await get_connection()
-    async with conn.transaction():
-        if reset:
-            await conn.execute("""
-                    UPDATE users
-                    SET failed_login_attempts = 0,
-                        lockout_until = NULL
-                    WHERE id = $1 AND deleted_at IS NULL
-                """, user_id)
-        else:
-            await conn.execute("""
-                    UPDATE users
-                    SET failed_login_attempts = failed_login_attempts + 1,
-                        last_failed_login = NOW(),
-                        lockout_until = CASE 
-                            WHEN failed_login_attempts >= 4 THEN NOW() + interval '15 minutes'
-                            ELSE lockout_until
-                        END
-                    WHERE id = $1 AND deleted_at IS NULL
-                """, user_id)
+    async with get_connection() as conn:
+        async with conn.transaction():
+            if reset:
+                await conn.execute("""
+                        UPDATE users
+                        SET failed_login_attempts = 0,
+                            lockout_until = NULL
+                        WHERE id = $1 AND deleted_at IS NULL
+                    """, user_id)
+            else:
+                await conn.execute("""
+                        UPDATE users
+                        SET failed_login_attempts = failed_login_attempts + 1,
+                            last_failed_login = NOW(),
+                            lockout_until = CASE 
+                                WHEN failed_login_attempts >= 4 THEN NOW() + interval '15 minutes'
+                                ELSE lockout_until
+                            END
+                        WHERE id = $1 AND deleted_at IS NULL
+                    """, user_id)
 
 
 async def update_last_login(user_id: uuid.UUID):
-    conn = await get_connection()
-    async with conn.transaction():
-        await conn.execute(
-            "UPDATE users SET last_login = NOW() WHERE id = $1 AND deleted_at IS NULL",
-            user_id
-        )
+    async with get_connection() as conn:
+        async with conn.transaction():
+            await conn.execute(
+                "UPDATE users SET last_login = NOW() WHERE id = $1 AND deleted_at IS NULL",
+                user_id
+            )
 
 
 async def is_account_locked(user_id: uuid.UUID) -> bool:
-    conn = await get_connection()
-    async with conn.transaction():
-        lockout = await conn.fetchval("""
-            SELECT lockout_until > NOW()
-            FROM users
-            WHERE id = $1 AND deleted_at IS NULL
-        """, user_id)
-        return bool(lockout)
+    async with get_connection() as conn:
+        async with conn.transaction():
+            lockout = await conn.fetchval("""
+                SELECT lockout_until > NOW()
+                FROM users
+                WHERE id = $1 AND deleted_at IS NULL
+            """, user_id)
+            return bool(lockout)
 
 
 async def change_password(user_id: uuid.UUID, password_change: PasswordChange) -> None:
-    conn = await get_connection()
-    async with conn.transaction():
-        async with conn.transaction():
-            user = await get_user(user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
+    # bcrypt runs before a connection is taken, so none is held while it works
+    user = await get_user(user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
 
-            if not pwd_context.verify(password_change.current_password, user.password_hash):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Incorrect current password"
-                )
+    if not await verify_password(password_change.current_password, user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect current password"
+        )
 
-            if password_change.current_password == password_change.new_password:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="New password must be different from current password"
-                )
+    if password_change.current_password == password_change.new_password:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="New password must be different from current password"
+        )
 
-            new_hash = pwd_context.hash(password_change.new_password)
-            await conn.execute(
-                "UPDATE users SET password_hash = $1, updated_at = NOW() WHERE id = $2 AND deleted_at IS NULL",
-                new_hash,
-                user_id
-            )
+    new_hash = await hash_password(password_change.new_password)
+    async with get_connection() as conn:
+        # Only over the hash that was verified, so a concurrent change is not overwritten
+        result = await conn.execute(
+            """
+            UPDATE users SET password_hash = $1, updated_at = NOW()
+            WHERE id = $2 AND password_hash = $3 AND deleted_at IS NULL
+            """,
+            new_hash,
+            user_id,
+            user.password_hash
+        )
+    invalidate_cached_user(user_id)
+    if result != "UPDATE 1":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Password was changed meanwhile"
+        )
 
 
 async def list_users_paginated(
@@ -333,41 +439,38 @@ async def list_users_paginated(
     if conditions:
         base_query += " AND " + " AND ".join(conditions)
 
-    conn = await get_connection()
-    async with conn.transaction():
-        total = await conn.fetchval(f"SELECT COUNT(*) {base_query}", *params)
-
-        query = f"SELECT * {base_query} ORDER BY created_at DESC "
-        query += f"OFFSET ${len(params) + 1} LIMIT ${len(params) + 2}"
-
-        rows = await conn.fetch(query, *params, (page - 1) * limit, limit)
-        return PaginatedUsers(
-            items=[UserPublic.from_database(dict(row)) for row in rows],
-            total=total,
-            page=page,
-            pages=(total + limit - 1) // limit
-        )
+    async with get_connection() as conn:
+        async with conn.transaction():
+            total = await conn.fetchval(f"SELECT COUNT(*) {base_query}", *params)
 
+            query = f"SELECT * {base_query} ORDER BY created_at DESC "
+            query += f"OFFSET ${len(params) + 1} LIMIT ${len(params) + 2}"
 
-async def cleanup_expired_lockouts():
-    conn = await get_connection()
-    async with conn.transaction():
-        await conn.execute("""
-                UPDATE users 
-                SET lockout_until = NULL,
-                    failed_login_attempts = 0
-                WHERE lockout_until < NOW() AND deleted_at IS NULL
-            """)
+            rows = await conn.fetch(query, *params, (page - 1) * limit, limit)
+            return PaginatedUsers(
+                items=[UserPublic.from_database(dict(row)) for row in rows],
+                total=total,
+                page=page,
+                pages=(total + limit - 1) // limit
+            )
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def cleanup_expired_lockouts() -> int:
+    async with get_connection() as conn:
+        async with conn.transaction():
+            result = await conn.execute("""
+                    UPDATE users 
+                    SET lockout_until = NULL,
+                        failed_login_attempts = 0
+                    WHERE lockout_until < NOW() AND deleted_at IS NULL
+                """)
+            return int(result.split()[-1])
 
 
 async def authenticate_user(email: str, password: str) -> UserInDB:
     user = await get_user_by_email(email)
     if not user:
-        pwd_context.dummy_verify()
+        await dummy_verify()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -379,7 +482,7 @@ async def authenticate_user(email: str, password: str) -> UserInDB:
             detail="Account is locked"
         )
 
-    if not verify_password(password, user.password_hash):
+    if not await verify_password(password, user.password_hash):
         await update_failed_login(user.id)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -398,6 +501,7 @@ async def delete_user(user_id: uuid.UUID) -> None:
             result = await conn.execute("""
                    delete from users where id =$1
                    """, user_id)
+            invalidate_cached_user(user_id)
 
             if result == "UPDATE 0":
                 raise HTTPException(
@@ -409,48 +513,49 @@ async def delete_user(user_id: uuid.UUID) -> None:
 
 
 async def update_user_preferences(user_id: uuid.UUID, preferences_update: UserPreferences) -> UserPublic:
-    conn = await get_connection()
-    async with conn.transaction():
-        row = await conn.fetchrow(
-            "SELECT preferences FROM users WHERE id = $1 AND deleted_at IS NULL",
-            user_id
-        )
-        if not row:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
+    async with get_connection() as conn:
+        async with conn.transaction():
+            row = await conn.fetchrow(
+                "SELECT preferences FROM users WHERE id = $1 AND deleted_at IS NULL",
+                user_id
             )
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
 
-        current_preferences = row['preferences'] or {}
-        update_data = preferences_update.dict(exclude_unset=True)
-        updated_preferences = _merge_preferences(current_preferences, update_data)
+            current_preferences = row['preferences'] or {}
+            update_data = preferences_update.dict(exclude_unset=True)
+            updated_preferences = _merge_preferences(current_preferences, update_data)
 
-        try:
-            validated_preferences = UserPreferences(**updated_preferences).dict()
-        except ValueError as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e)
-            )
+            try:
+                validated_preferences = UserPreferences(**updated_preferences).dict()
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
 
-        result = await conn.fetchrow("""
-               UPDATE users 
-               SET preferences = $1, 
-                   updated_at = NOW() 
-               WHERE id = $2 AND deleted_at IS NULL
-               RETURNING *
-               """,
-                                     json.dumps(validated_preferences),
-                                     user_id
-                                     )
-
-        if not result:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found or deleted"
-            )
+            result = await conn.fetchrow("""
+                   UPDATE users 
+                   SET preferences = $1, 
+                       updated_at = NOW() 
+                   WHERE id = $2 AND deleted_at IS NULL
+                   RETURNING *
+                   """,
+                                         json.dumps(validated_preferences),
+                                         user_id
+                                         )
+            invalidate_cached_user(user_id)
+
+            if not result:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found or deleted"
+                )
 
-        return UserPublic(**result)
+            return UserPublic(**result)
 
 
 async def update_user_role(user_id: uuid.UUID, new_role: str) -> UserPublic:
@@ -467,27 +572,66 @@ async def update_user_role(user_id: uuid.UUID, new_role: str) -> UserPublic:
     Raises:
         HTTPException: If user is not found or other database errors occur
     """
-    conn = await get_connection()
-    async with conn.transaction():
-        row = await conn.fetchrow("""
-                UPDATE users 
-                SET role = $1,
-                    updated_at = NOW()
-                WHERE id = $2 
-                    AND deleted_at IS NULL
-                RETURNING *
-                """,
-                                  new_role,  # No longer need to access .value
-                                  user_id
-                                  )
-
-        if not row:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
+    async with get_connection() as conn:
+        async with conn.transaction():
+            row = await conn.fetchrow("""
+                    UPDATE users 
+                    SET role = $1,
+                        updated_at = NOW()
+                    WHERE id = $2 
+                        AND deleted_at IS NULL
+                    RETURNING *
+                    """,
+                                      new_role,  # No longer need to access .value
+                                      user_id
+                                      )
+            invalidate_cached_user(user_id)
+
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+
+            return UserPublic.from_database(dict(row))
+
+
+async def update_user_status(user_id: uuid.UUID, new_status: str) -> UserPublic:
+    """
+    Update a user's status (active, inactive or suspended).
+
+    Args:
+        user_id (uuid.UUID): The ID of the user to update
+        new_status (str): The new status to assign to the user
+
+    Returns:
+        UserPublic: The updated user object
+
+    Raises:
+        HTTPException: If user is not found or other database errors occur
+    """
+    async with get_connection() as conn:
+        async with conn.transaction():
+            row = await conn.fetchrow("""
+                    UPDATE users 
+                    SET status = $1,
+                        updated_at = NOW()
+                    WHERE id = $2 
+                        AND deleted_at IS NULL
+                    RETURNING *
+                    """,
+                                      new_status,
+                                      user_id
+                                      )
+            invalidate_cached_user(user_id)
+
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
 
-        return UserPublic.from_database(dict(row))
+            return UserPublic.from_database(dict(row))
 
 
 def _merge_preferences(original: Dict, updates: Dict) -> Dict:
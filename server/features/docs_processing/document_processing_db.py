@@ -329,6 +329,8 @@ async def init_db() -> None:
         extracted_text TEXT,
         processed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
     );
+    CREATE INDEX IF NOT EXISTS idx_document_processing_results_file_name
+        ON document_processing_results(file_name, processed_at DESC);
     """
     
     conn = await get_connection()
@@ -0,0 +1,299 @@
+"""
+Content-addressed storage for uploaded document files.
+
+Each file is stored once, named after the SHA-256 of its content, under
+two levels of shard directories:
+    {root}/ab/cd/abcd...ef.pdf
+The same bytes uploaded again (to this case or any other) resolve to the same
+path, so the file is written once. Work keyed by the file, such as the
+document_processing_results of a file name, is then shared by every copy.
+
+There is no reference-count column: the references to an object are the
+case_documents and document_version_history rows whose file_path is the
+object's path. Objects nothing refers to are removed by
+collect_unreferenced_objects(), run as a maintenance job, once they are older
+than a grace period covering uploads whose rows are not written yet.
+Rendered previews of an object live beside it, in {sha256}.previews/.
+"""
+import asyncio
+import glob
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import List, NamedTuple, Optional, Sequence, Union
+
+from fastapi import UploadFile
+
+from server.database.database import get_connection
+from server.features.uploads.streaming_writer import (
+    DOCUMENT_FILE_TYPES,
+    FILE_SIGNATURES,
+    UploadRejected,
+    inspect_file,
+    write_upload,
+)
+
+DOCUMENT_STORE = {
+    "root": "./mortgage_system/uploaded_files/objects",
+    # Unreferenced objects younger than this are kept: their upload may still
+    # be on its way to a case_documents row
+    "gc_grace_seconds": 3600.0,
+    # Objects checked per reference query during collection
+    "gc_batch_size": 500,
+    # Uploads of one request written at the same time by store_uploads
+    "max_concurrent_writes": 8,
+}
+
+UNREFERENCED_PATHS_QUERY = """
+SELECT p.path
+FROM unnest($1::text[]) AS p(path)
+WHERE NOT EXISTS (SELECT 1 FROM case_documents cd WHERE cd.file_path = p.path)
+  AND NOT EXISTS (SELECT 1 FROM document_version_history dvh WHERE dvh.file_path = p.path)
+"""
+
+
+class StoredObject(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    file_type: str
+    # Name the file was uploaded under
+    filename: str
+    # Whether identical content was already stored
+    deduplicated: bool
+
+
+PREVIEWS_SUFFIX = ".previews"
+
+# Object file names: the content hash and the extension of its type
+OBJECT_NAME_PATTERN = re.compile(r"^([0-9a-f]{64})\.[a-z]+$")
+
+
+def object_path(sha256: str, file_type: str) -> str:
+    """Path of the object holding content with this hash and type"""
+    ext = FILE_SIGNATURES[file_type][1][0]
+    return os.path.join(DOCUMENT_STORE["root"], sha256[:2], sha256[2:4], f"{sha256}{ext}")
+
+
+def object_sha256(path: str) -> Optional[str]:
+    """Content hash of a stored object, from its path; None for files outside the store"""
+    directory, name = os.path.split(path)
+    match = OBJECT_NAME_PATTERN.match(name)
+    if match is None or os.path.dirname(os.path.dirname(directory)) != DOCUMENT_STORE["root"]:
+        return None
+    return match.group(1)
+
+
+def previews_dir(sha256: str) -> str:
+    """Directory holding the rendered previews of content with this hash"""
+    return os.path.join(DOCUMENT_STORE["root"], sha256[:2], sha256[2:4], f"{sha256}{PREVIEWS_SUFFIX}")
+
+
+async def store_upload(
+        file: UploadFile,
+        allowed_types: Sequence[str] = DOCUMENT_FILE_TYPES,
+        max_bytes: Optional[int] = None
+) -> StoredObject:
+    """
+    Stream an uploaded file into the store.
+
+    The upload is written to a temporary file while its hash is computed,
+    then either moved to its object path or, if that object exists already,
+    discarded.
+
+    Raises:
+        UploadRejected: Missing filename, disallowed type or extension, or too large
+    """
+    loop = asyncio.get_running_loop()
+    incoming_dir = os.path.join(DOCUMENT_STORE["root"], "incoming")
+    await loop.run_in_executor(None, lambda: os.makedirs(incoming_dir, exist_ok=True))
+    ext = os.path.splitext((file.filename or "").lower())[1]
+    stored = await write_upload(
+        file, os.path.join(incoming_dir, f"{uuid.uuid4().hex}{ext}"), allowed_types, max_bytes
+    )
+
+    destination = object_path(stored.sha256, stored.file_type)
+    deduplicated = await loop.run_in_executor(None, _place_object, stored.path, destination)
+    return StoredObject(
+        path=destination,
+        size=stored.size,
+        sha256=stored.sha256,
+        file_type=stored.file_type,
+        filename=os.path.basename(file.filename),
+        deduplicated=deduplicated,
+    )
+
+
+async def store_uploads(
+        files: List[UploadFile],
+        allowed_types: Sequence[str] = DOCUMENT_FILE_TYPES,
+        max_bytes: Optional[int] = None
+) -> List[Union[StoredObject, Exception]]:
+    """
+    Store several uploads concurrently, at most
+    DOCUMENT_STORE["max_concurrent_writes"] at a time.
+
+    Returns:
+        For each file in order, its StoredObject or the exception that
+        rejected it (UploadRejected for invalid uploads)
+    """
+    semaphore = asyncio.Semaphore(DOCUMENT_STORE["max_concurrent_writes"])
+
+    async def store(file: UploadFile) -> StoredObject:
+        async with semaphore:
+            return await store_upload(file, allowed_types, max_bytes)
+
+    return await asyncio.gather(*(store(file) for file in files), return_exceptions=True)
+
+
+async def store_file(
+        path: str,
+        filename: str,
+        expected_sha256: Optional[str] = None,
+        allowed_types: Sequence[str] = DOCUMENT_FILE_TYPES,
+        max_bytes: Optional[int] = None
+) -> StoredObject:
+    """
+    Move a file assembled on disk (such as a finished resumable upload) into
+    the store, after the checks applied to streamed uploads.
+
+    Args:
+        path: The file; it is moved into the store, or removed if its content is stored already
+        filename: Name the file was uploaded under
+        expected_sha256: Hex digest the content must have, if known
+
+    Raises:
+        UploadRejected: The file fails the upload checks or does not match expected_sha256;
+            it is left in place
+    """
+    loop = asyncio.get_running_loop()
+    inspected = await loop.run_in_executor(None, inspect_file, path, filename, allowed_types, max_bytes)
+    if expected_sha256 and inspected.sha256 != expected_sha256.lower():
+        raise UploadRejected(f"Content of file {filename} does not match its SHA-256 checksum")
+
+    destination = object_path(inspected.sha256, inspected.file_type)
+    deduplicated = await loop.run_in_executor(None, _place_object, path, destination)
+    return StoredObject(
+        path=destination,
+        size=inspected.size,
+        sha256=inspected.sha256,
+        file_type=inspected.file_type,
+        filename=os.path.basename(filename),
+        deduplicated=deduplicated,
+    )
+
+
+def _place_object(incoming: str, destination: str) -> bool:
+    """Move incoming to destination unless it is already stored; True if it was."""
+    try:
+        # Restart the grace period, so collection does not remove the object
+        # before the new reference is written (see _remove_objects)
+        os.utime(destination)
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.replace(incoming, destination)
+        return False
+    os.remove(incoming)
+    return True
+
+
+def _collectable_objects() -> List[str]:
+    """Object paths older than the grace period"""
+    root = DOCUMENT_STORE["root"]
+    cutoff = time.time() - DOCUMENT_STORE["gc_grace_seconds"]
+    paths = []
+    for directory, subdirs, files in os.walk(root):
+        if directory == root:
+            # Only the shard directories hold objects
+            subdirs[:] = [d for d in subdirs if d != "incoming"]
+            continue
+        # Previews are removed with their object (see _remove_orphaned_previews)
+        subdirs[:] = [d for d in subdirs if not d.endswith(PREVIEWS_SUFFIX)]
+        for name in files:
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    paths.append(path)
+            except FileNotFoundError:
+                pass
+    return paths
+
+
+def _remove_orphaned_previews() -> int:
+    """Remove preview directories older than the grace period whose object is gone"""
+    cutoff = time.time() - DOCUMENT_STORE["gc_grace_seconds"]
+    removed = 0
+    for directory in glob.glob(os.path.join(glob.escape(DOCUMENT_STORE["root"]), "*", "*", f"*{PREVIEWS_SUFFIX}")):
+        sha256 = os.path.basename(directory)[:-len(PREVIEWS_SUFFIX)]
+        if any(os.path.exists(object_path(sha256, file_type)) for file_type in FILE_SIGNATURES):
+            continue
+        try:
+            if os.path.getmtime(directory) < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _incoming_files() -> List[str]:
+    incoming_dir = os.path.join(DOCUMENT_STORE["root"], "incoming")
+    if not os.path.isdir(incoming_dir):
+        return []
+    return [os.path.join(incoming_dir, name) for name in os.listdir(incoming_dir)]
+
+
+def _remove_objects(paths: List[str]) -> int:
+    """
+    Remove the files still older than the grace period.
+
+    A file is first renamed aside and its age checked again on the renamed
+    file: an upload reusing the object touches it before the rename (and the
+    file is put back) or finds it gone after the rename (and stores its own
+    copy), so an object is never removed from under a new reference.
+    """
+    removed = 0
+    cutoff = time.time() - DOCUMENT_STORE["gc_grace_seconds"]
+    for path in paths:
+        collected = f"{path}.{uuid.uuid4().hex}.collected"
+        try:
+            if os.path.getmtime(path) >= cutoff:
+                continue
+            os.rename(path, collected)
+        except FileNotFoundError:
+            continue
+        if os.path.getmtime(collected) >= cutoff:
+            try:
+                os.link(collected, path)
+            except FileExistsError:
+                # Stored again meanwhile, from the same content
+                pass
+        else:
+            removed += 1
+        os.remove(collected)
+    return removed
+
+
+async def collect_unreferenced_objects() -> int:
+    """
+    Remove stored objects no case document or document version refers to.
+    Abandoned temporary uploads older than the grace period, and previews
+    whose object is gone, are removed too.
+
+    Returns:
+        Number of files removed
+    """
+    loop = asyncio.get_running_loop()
+    candidates = await loop.run_in_executor(None, _collectable_objects)
+    batch_size = DOCUMENT_STORE["gc_batch_size"]
+    removed = 0
+    for start in range(0, len(candidates), batch_size):
+        async with get_connection() as conn:
+            rows = await conn.fetch(UNREFERENCED_PATHS_QUERY, candidates[start:start + batch_size])
+        removed += await loop.run_in_executor(None, _remove_objects, [row["path"] for row in rows])
+
+    removed += await loop.run_in_executor(None, lambda: _remove_objects(_incoming_files()))
+    removed += await loop.run_in_executor(None, _remove_orphaned_previews)
+    return removed
@@ -0,0 +1,232 @@
+"""
+Thumbnails and low-resolution page previews of uploaded documents.
+
+Previews are rendered once per content hash and kept beside the stored object
+(document_store.previews_dir), so identical files share them and a preview
+never changes once written: it can be served with long cache lifetimes.
+Rendering runs in a dedicated thread pool. PDF pages are rasterised with
+pdf2image (poppler runs as a subprocess) and images are scaled with Pillow,
+which releases the GIL while resizing. Thumbnails are rendered at upload and
+page previews on first request. Concurrent requests for the same preview wait
+for a single rendering.
+
+Files stored before the document store existed are hashed (once per file
+version) to find their previews.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+
+from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from server.features.uploads.document_store import object_sha256, previews_dir
+from server.features.uploads.streaming_writer import UPLOAD_LIMITS, detect_file_type
+
+PREVIEWS = {
+    # Threads rendering previews
+    "max_workers": 2,
+    # Bounding box of first-page thumbnails, in pixels
+    "thumbnail_size": (320, 320),
+    # Bounding box of page previews, in pixels
+    "page_size": (1024, 1024),
+    # Resolution PDF pages are rasterised at before scaling
+    "pdf_dpi": 72,
+    "jpeg_quality": 70,
+}
+
+# Seconds clients may cache a preview; its URL changes with the content
+PREVIEW_CACHE_MAX_AGE = 365 * 24 * 3600
+
+ResultT = TypeVar("ResultT")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_rendering: Dict[str, asyncio.Future] = {}
+# Manifests by content hash; content never changes, so neither do they
+_manifests: Dict[str, "PreviewManifest"] = {}
+_MANIFESTS_MAX_ENTRIES = 4096
+# Content hashes of files outside the store, by (path, mtime, size)
+_file_hashes: Dict[Tuple[str, float, int], str] = {}
+_FILE_HASHES_MAX_ENTRIES = 4096
+
+
+class PreviewManifest(NamedTuple):
+    sha256: str
+    file_type: str
+    page_count: int
+
+
+def shutdown_preview_workers() -> None:
+    """Stop the rendering threads. Called from the application lifespan."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+async def _run(func: Callable[..., ResultT], *args: Any) -> ResultT:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PREVIEWS["max_workers"], thread_name_prefix="previews")
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+async def content_sha256(file_path: str) -> str:
+    """Content hash of a document file, from its store path or by hashing it"""
+    sha256 = object_sha256(file_path)
+    if sha256 is not None:
+        return sha256
+    # Plain I/O: kept off the rendering threads so it does not queue behind renders
+    return await asyncio.get_running_loop().run_in_executor(None, _hash_file, file_path)
+
+
+async def get_manifest(file_path: str) -> PreviewManifest:
+    """
+    Page count and type of a document file, read once and kept with its previews.
+
+    Raises:
+        FileNotFoundError: The file is missing
+        ValueError: The file is not a PDF or image
+    """
+    sha256 = await content_sha256(file_path)
+    manifest = _manifests.get(sha256)
+    if manifest is None:
+        manifest_path = os.path.join(previews_dir(sha256), "manifest.json")
+        manifest = await _render_once(manifest_path, _write_manifest, file_path, sha256, manifest_path)
+        if len(_manifests) >= _MANIFESTS_MAX_ENTRIES:
+            _manifests.clear()
+        _manifests[sha256] = manifest
+    return manifest
+
+
+async def get_thumbnail(file_path: str) -> str:
+    """Path of the first-page thumbnail of a document file, rendering it if needed"""
+    manifest = await get_manifest(file_path)
+    target = os.path.join(previews_dir(manifest.sha256), "thumbnail.jpg")
+    if os.path.exists(target):
+        return target
+    return await _render_once(
+        target, _render_preview, file_path, manifest.file_type, 1, PREVIEWS["thumbnail_size"], target
+    )
+
+
+async def get_page_preview(file_path: str, page: int) -> Optional[str]:
+    """
+    Path of the preview of a page (1-based) of a document file, rendering it if
+    needed; None if the file has no such page.
+    """
+    manifest = await get_manifest(file_path)
+    if not 1 <= page <= manifest.page_count:
+        return None
+    target = os.path.join(previews_dir(manifest.sha256), f"page-{page}.jpg")
+    if os.path.exists(target):
+        return target
+    return await _render_once(
+        target, _render_preview, file_path, manifest.file_type, page, PREVIEWS["page_size"], target
+    )
+
+
+async def warm_thumbnails(file_paths: List[str]) -> None:
+    """Render the thumbnails of newly uploaded files (background task)."""
+    for file_path in dict.fromkeys(file_paths):
+        try:
+            await get_thumbnail(file_path)
+        except Exception:
+            # Rendered, or the error reported, on request instead
+            pass
+
+
+async def _render_once(target: str, render: Callable[..., ResultT], *args: Any) -> ResultT:
+    """Run render in the pool, one rendering per target at a time."""
+    pending = _rendering.get(target)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    _rendering[target] = future
+    try:
+        result = await _run(render, *args)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        # Waiters re-raise it; mark it retrieved so it is not logged as unhandled
+        future.exception()
+        raise
+    finally:
+        del _rendering[target]
+
+
+def _hash_file(file_path: str) -> str:
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_mtime, stat.st_size)
+    sha256 = _file_hashes.get(key)
+    if sha256 is None:
+        hasher = hashlib.sha256()
+        with open(file_path, "rb") as source:
+            while chunk := source.read(UPLOAD_LIMITS["chunk_size"]):
+                hasher.update(chunk)
+        sha256 = hasher.hexdigest()
+        if len(_file_hashes) >= _FILE_HASHES_MAX_ENTRIES:
+            _file_hashes.clear()
+        _file_hashes[key] = sha256
+    return sha256
+
+
+def _write_manifest(file_path: str, sha256: str, manifest_path: str) -> PreviewManifest:
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as source:
+            return PreviewManifest(**json.load(source))
+
+    with open(file_path, "rb") as source:
+        file_type = detect_file_type(source.read(16))
+    if file_type is None:
+        raise ValueError(f"No previews for {os.path.basename(file_path)}: not a PDF or image")
+    if file_type == "pdf":
+        page_count = int(pdfinfo_from_path(file_path)["Pages"])
+    else:
+        with Image.open(file_path) as image:
+            page_count = getattr(image, "n_frames", 1)
+
+    manifest = PreviewManifest(sha256=sha256, file_type=file_type, page_count=page_count)
+    _write_atomically(manifest_path, lambda out: out.write(json.dumps(manifest._asdict()).encode()))
+    return manifest
+
+
+def _render_preview(file_path: str, file_type: str, page: int, size: Tuple[int, int], target: str) -> str:
+    if os.path.exists(target):
+        return target
+
+    if file_type == "pdf":
+        # A single number scales the longer side to it, keeping the page's
+        # aspect ratio; a (width, height) pair would stretch it to that box
+        image = convert_from_path(
+            file_path, dpi=PREVIEWS["pdf_dpi"], first_page=page, last_page=page, size=max(size)
+        )[0]
+    else:
+        image = Image.open(file_path)
+        # Multi-page TIFFs and animated GIFs hold one page per frame
+        image.seek(page - 1)
+        image.draft("RGB", size)
+
+    with image:
+        preview = image.convert("RGB")
+    preview.thumbnail(size)
+    _write_atomically(target, lambda out: preview.save(out, "JPEG", quality=PREVIEWS["jpeg_quality"], optimize=True))
+    return target
+
+
+def _write_atomically(target: str, write: Callable[[Any], Any]) -> None:
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    partial = f"{target}.{uuid.uuid4().hex}.part"
+    try:
+        with open(partial, "wb") as out:
+            write(out)
+        os.replace(partial, target)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
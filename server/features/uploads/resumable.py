@@ -0,0 +1,340 @@
+"""
+Resumable chunked uploads.
+
+A client starts a session declaring the file's name, size and (optionally)
+SHA-256, then sends the file in chunks, each at the offset the server has
+received up to and with its own SHA-256. A dropped connection only loses the
+chunk in flight: the client asks for the session's received_size and carries
+on from there. Once every byte has arrived the session is completed: the
+whole file is checked like a streamed upload (type, size, checksum) and moved
+into the document store.
+
+Received bytes are appended to one file per session under
+RESUMABLE_UPLOADS["directory"]. A chunk is first written to a staging file
+while it is hashed, and only appended once verified, under an advisory lock
+on the session, so concurrent or repeated chunks cannot interleave.
+Completing claims the file by renaming it, so the whole-file checks run
+without the lock; the session is deleted only once the file is attached to
+its case. Sessions idle past their expiry are removed by a maintenance job.
+"""
+import asyncio
+import glob
+import hashlib
+import os
+import shutil
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from server.database.database import unit_of_work
+from server.database.upload_sessions_database import (
+    UploadSessionCreate,
+    UploadSessionInDB,
+    advance_upload_session,
+    create_upload_session,
+    delete_expired_upload_sessions,
+    delete_upload_session,
+    get_upload_session,
+)
+from server.features.uploads.document_store import StoredObject, store_file
+from server.features.uploads.streaming_writer import (
+    UPLOAD_LIMITS,
+    UploadRejected,
+    check_content,
+    check_filename,
+    check_size,
+)
+
+RESUMABLE_UPLOADS = {
+    "directory": "./mortgage_system/uploaded_files/sessions",
+    # Largest chunk accepted in one request
+    "max_chunk_bytes": 8 * 1024 * 1024,
+    # Seconds a session stays open after its last chunk
+    "session_ttl_seconds": 86400.0,
+}
+
+
+T = TypeVar("T")
+
+
+def session_file(session_id: UUID) -> str:
+    """Path of the file holding the bytes received for a session"""
+    return os.path.join(RESUMABLE_UPLOADS["directory"], f"{session_id}.part")
+
+
+def _completing_file(session_id: UUID) -> str:
+    """Path of the session file while a completion has claimed it"""
+    return f"{session_file(session_id)}.completing"
+
+
+async def start_upload_session(
+        case_id: UUID,
+        session_in: UploadSessionCreate,
+        created_by: Optional[UUID] = None
+) -> UploadSessionInDB:
+    """
+    Open an upload session for a file of the declared name and size.
+
+    Raises:
+        UploadRejected: Disallowed file type or declared size over the limit
+    """
+    check_filename(session_in.filename)
+    check_size(session_in.total_size, session_in.filename)
+
+    session = await create_upload_session(
+        case_id, session_in, RESUMABLE_UPLOADS["session_ttl_seconds"], created_by
+    )
+    await asyncio.get_running_loop().run_in_executor(None, _create_session_file, session.id)
+    return session
+
+
+async def receive_chunk(
+        session: UploadSessionInDB,
+        offset: int,
+        body: AsyncIterator[bytes],
+        chunk_sha256: str
+) -> UploadSessionInDB:
+    """
+    Append one chunk, streamed from body, at offset.
+
+    Args:
+        session: The session, as last read
+        offset: Position of the chunk; must be the session's received_size
+        body: The chunk's bytes
+        chunk_sha256: Hex SHA-256 the chunk must have
+
+    Returns:
+        The session with its new received_size
+
+    Raises:
+        UploadRejected: 409 if offset is not where the session stands or another
+            chunk is being appended; 413 if the chunk is too large or runs past
+            the declared size; 400 if it is empty, fails its checksum or (first
+            chunk) is not of the file's type; 404 if the session expired
+    """
+    if offset != session.received_size:
+        raise UploadRejected(
+            f"Upload {session.id} continues at offset {session.received_size}, not {offset}", 409
+        )
+
+    loop = asyncio.get_running_loop()
+    staging = f"{session_file(session.id)}.{uuid.uuid4().hex}.chunk"
+    try:
+        size, digest, head = await _stage_chunk(
+            body,
+            staging,
+            min(RESUMABLE_UPLOADS["max_chunk_bytes"], session.total_size - offset),
+            session
+        )
+        if digest != chunk_sha256.lower():
+            raise UploadRejected(f"Chunk at offset {offset} of upload {session.id} does not match its SHA-256 checksum")
+        if offset == 0:
+            check_content(head, session.filename)
+
+        async with _session_lock(session.id):
+            current = await get_upload_session(session.id)
+            if current is None:
+                raise UploadRejected(f"Upload {session.id} not found or expired", 404)
+            if current.received_size != offset:
+                raise UploadRejected(
+                    f"Upload {session.id} continues at offset {current.received_size}, not {offset}", 409
+                )
+            try:
+                await loop.run_in_executor(None, _append_chunk, session_file(session.id), staging, offset)
+            except FileNotFoundError:
+                # Removed with its expired session
+                raise UploadRejected(f"Upload {session.id} not found or expired", 404)
+            updated = await advance_upload_session(
+                session.id, offset, offset + size, RESUMABLE_UPLOADS["session_ttl_seconds"]
+            )
+            if updated is None:
+                raise UploadRejected(f"Upload {session.id} not found or expired", 404)
+            return updated
+    finally:
+        await loop.run_in_executor(None, _remove, staging)
+
+
+async def complete_upload_session(
+        session: UploadSessionInDB,
+        attach: Callable[[StoredObject], Awaitable[T]]
+) -> Tuple[StoredObject, T]:
+    """
+    Check the fully received file, move it into the document store and
+    attach it with attach(stored), e.g. by writing its case document.
+
+    The session is closed once the file is attached, and also when the file
+    fails its checks, since bytes already received cannot be sent again. If
+    attach raises, the session stays open and completing can be retried.
+
+    Returns:
+        The stored file and what attach returned
+
+    Raises:
+        UploadRejected: 409 if bytes are still missing, a chunk is being appended
+            or the upload is already being completed; 404 if the session is gone;
+            400/413 if the file fails the upload checks or its checksum
+    """
+    loop = asyncio.get_running_loop()
+    completing = _completing_file(session.id)
+    async with _session_lock(session.id):
+        current = await get_upload_session(session.id)
+        if current is None:
+            raise UploadRejected(f"Upload {session.id} not found or expired", 404)
+        if current.received_size != current.total_size:
+            raise UploadRejected(
+                f"Upload {session.id} has received {current.received_size} of {current.total_size} bytes", 409
+            )
+        try:
+            await loop.run_in_executor(None, os.rename, session_file(session.id), completing)
+        except FileNotFoundError:
+            raise UploadRejected(f"Upload {session.id} is already being completed", 409)
+
+    # store_file moves its input into the store; it gets a link, so the
+    # received bytes survive until the file is attached
+    incoming = f"{session_file(session.id)}.{uuid.uuid4().hex}.store"
+    try:
+        await loop.run_in_executor(None, os.link, completing, incoming)
+        stored = await store_file(incoming, current.filename, expected_sha256=current.sha256)
+    except UploadRejected:
+        await discard_upload_session(session.id)
+        raise
+    except FileNotFoundError:
+        # Discarded meanwhile
+        raise UploadRejected(f"Upload {session.id} not found or expired", 404)
+    except BaseException:
+        await loop.run_in_executor(None, _reopen_session_file, session.id)
+        raise
+    finally:
+        await loop.run_in_executor(None, _remove, incoming)
+
+    try:
+        attached = await attach(stored)
+    except BaseException:
+        await loop.run_in_executor(None, _reopen_session_file, session.id)
+        raise
+    # Without the lock: the file is attached, so a request holding it (such
+    # as a retried completion) must not turn this into a 409. The claim keeps
+    # chunks and other completions away from the files.
+    await delete_upload_session(session.id)
+    await loop.run_in_executor(None, _remove_session_files, session.id)
+    return stored, attached
+
+
+async def discard_upload_session(session_id: UUID) -> bool:
+    """
+    Delete a session and the bytes received for it
+
+    Raises:
+        UploadRejected: 409 if a chunk is being appended
+    """
+    async with _session_lock(session_id):
+        deleted = await delete_upload_session(session_id)
+    # Once the deletion is committed no chunk can reach the files
+    await asyncio.get_running_loop().run_in_executor(None, _remove_session_files, session_id)
+    return deleted
+
+
+async def cleanup_expired_upload_sessions(batch_size: int) -> int:
+    """
+    Delete up to batch_size expired sessions and their files.
+
+    Returns:
+        Number of sessions deleted
+    """
+    session_ids = await delete_expired_upload_sessions(batch_size)
+    loop = asyncio.get_running_loop()
+    for session_id in session_ids:
+        await loop.run_in_executor(None, _remove_session_files, session_id)
+    return len(session_ids)
+
+
+@asynccontextmanager
+async def _session_lock(session_id: UUID) -> AsyncIterator[None]:
+    """
+    Run the block in a unit of work holding an advisory lock on a session;
+    409 if it is taken. Session reads and updates made in the block run on
+    the lock's connection, and the lock is released when it commits.
+    """
+    key = f"upload_session:{session_id}"
+    async with unit_of_work() as conn:
+        if not await conn.fetchval("SELECT pg_try_advisory_xact_lock(hashtext($1))", key):
+            raise UploadRejected(f"Another chunk of upload {session_id} is being processed", 409)
+        yield
+
+
+async def _stage_chunk(
+        body: AsyncIterator[bytes],
+        staging: str,
+        max_bytes: int,
+        session: UploadSessionInDB
+):
+    """Write body to staging, returning its size, hex SHA-256 and first bytes."""
+    loop = asyncio.get_running_loop()
+    hasher = hashlib.sha256()
+    size = 0
+    head = b""
+    buffer = bytearray()
+    out = await loop.run_in_executor(None, open, staging, "wb")
+    try:
+        async for piece in body:
+            size += len(piece)
+            if size > max_bytes:
+                raise UploadRejected(
+                    f"Chunk exceeds the {max_bytes} bytes upload {session.id} can take at this offset", 413
+                )
+            if len(head) < 16:
+                head += piece[:16 - len(head)]
+            buffer += piece
+            if len(buffer) >= UPLOAD_LIMITS["chunk_size"]:
+                await loop.run_in_executor(None, _write_hashed, out, hasher, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await loop.run_in_executor(None, _write_hashed, out, hasher, bytes(buffer))
+    finally:
+        await loop.run_in_executor(None, out.close)
+    if size == 0:
+        raise UploadRejected(f"Empty chunk for upload {session.id}")
+    return size, hasher.hexdigest(), head
+
+
+def _write_hashed(out, hasher, data: bytes) -> None:
+    hasher.update(data)
+    out.write(data)
+
+
+def _create_session_file(session_id: UUID) -> None:
+    os.makedirs(RESUMABLE_UPLOADS["directory"], exist_ok=True)
+    open(session_file(session_id), "wb").close()
+
+
+def _append_chunk(path: str, staging: str, offset: int) -> None:
+    with open(path, "r+b") as out, open(staging, "rb") as source:
+        # Drop anything past offset left by an append that failed midway
+        out.truncate(offset)
+        out.seek(offset)
+        shutil.copyfileobj(source, out, UPLOAD_LIMITS["chunk_size"])
+        out.flush()
+        # The chunk must be on disk before received_size moves past it
+        os.fsync(out.fileno())
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _reopen_session_file(session_id: UUID) -> None:
+    """Give up a completion's claim on the session file"""
+    try:
+        os.rename(_completing_file(session_id), session_file(session_id))
+    except FileNotFoundError:
+        pass
+
+
+def _remove_session_files(session_id: UUID) -> None:
+    # The received bytes, staged chunks and files of a completion
+    for path in [session_file(session_id), *glob.glob(f"{glob.escape(session_file(session_id))}.*")]:
+        _remove(path)
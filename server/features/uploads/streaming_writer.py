@@ -0,0 +1,197 @@
+"""
+Streaming writer for uploaded document files.
+
+An upload is copied to disk in fixed-size chunks, so memory per upload stays
+constant whatever the file size. Disk writes and hashing run in a worker
+thread, off the event loop. While streaming, the writer:
+- checks the first bytes against the signatures of the allowed file types,
+- enforces the size limit as soon as it is crossed,
+- computes the SHA-256 of the content.
+
+The data is written to a temporary ".part" file that is renamed into place
+only once the whole upload has been accepted.
+"""
+import asyncio
+import hashlib
+import os
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import UploadFile, status
+
+UPLOAD_LIMITS = {
+    "max_bytes": 25 * 1024 * 1024,
+    "chunk_size": 1024 * 1024,
+}
+
+# Magic bytes of each accepted file type, and the extensions it may carry
+FILE_SIGNATURES: Dict[str, Tuple[Tuple[bytes, ...], Tuple[str, ...]]] = {
+    "pdf": ((b"%PDF-",), (".pdf",)),
+    "jpeg": ((b"\xff\xd8\xff",), (".jpg", ".jpeg")),
+    "png": ((b"\x89PNG\r\n\x1a\n",), (".png",)),
+    "gif": ((b"GIF87a", b"GIF89a"), (".gif",)),
+    "bmp": ((b"BM",), (".bmp",)),
+    "tiff": ((b"II*\x00", b"MM\x00*"), (".tiff", ".tif")),
+}
+
+DOCUMENT_FILE_TYPES = tuple(FILE_SIGNATURES)
+
+
+class UploadRejected(Exception):
+    """The upload was refused; status_code is the HTTP status to answer with"""
+
+    def __init__(self, detail: str, status_code: int = status.HTTP_400_BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class StoredUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    file_type: str
+
+
+def detect_file_type(head: bytes, allowed_types: Sequence[str] = DOCUMENT_FILE_TYPES) -> Optional[str]:
+    """File type whose signature the leading bytes match, among allowed_types"""
+    for file_type in allowed_types:
+        signatures, _ = FILE_SIGNATURES[file_type]
+        if head.startswith(signatures):
+            return file_type
+    return None
+
+
+def check_filename(filename: Optional[str], allowed_types: Sequence[str] = DOCUMENT_FILE_TYPES) -> str:
+    """
+    Check the filename carries an extension of one of allowed_types.
+
+    Returns:
+        str: The lower-cased extension
+
+    Raises:
+        UploadRejected: Missing filename or disallowed extension
+    """
+    if not filename:
+        raise UploadRejected("Missing filename for uploaded file")
+    ext = os.path.splitext(filename.lower())[1]
+    allowed_extensions = {allowed for file_type in allowed_types for allowed in FILE_SIGNATURES[file_type][1]}
+    if ext not in allowed_extensions:
+        raise UploadRejected(f"Invalid file type for file {filename}. Only PDF and image files are allowed.")
+    return ext
+
+
+def check_content(head: bytes, filename: str, allowed_types: Sequence[str] = DOCUMENT_FILE_TYPES) -> str:
+    """
+    Check the leading bytes of a file match the type its extension claims.
+
+    Returns:
+        str: The detected file type
+
+    Raises:
+        UploadRejected: The content is not of the claimed type
+    """
+    ext = os.path.splitext(filename.lower())[1]
+    file_type = detect_file_type(head, allowed_types)
+    if file_type is None or ext not in FILE_SIGNATURES[file_type][1]:
+        raise UploadRejected(f"Content of file {filename} does not match its file type")
+    return file_type
+
+
+def check_size(size: int, filename: str, max_bytes: Optional[int] = None) -> None:
+    """Raise UploadRejected (413) if size exceeds max_bytes"""
+    max_bytes = UPLOAD_LIMITS["max_bytes"] if max_bytes is None else max_bytes
+    if size > max_bytes:
+        raise UploadRejected(
+            f"File {filename} exceeds the maximum allowed size of {max_bytes / (1024 * 1024):g}MB",
+            413
+        )
+
+
+def inspect_file(
+        path: str,
+        filename: str,
+        allowed_types: Sequence[str] = DOCUMENT_FILE_TYPES,
+        max_bytes: Optional[int] = None
+) -> StoredUpload:
+    """
+    Apply the upload checks to a file already on disk, reading it in chunks.
+    Blocking; run it in an executor.
+
+    Raises:
+        UploadRejected: Disallowed type or extension, empty, or too large
+    """
+    check_filename(filename, allowed_types)
+    check_size(os.path.getsize(path), filename, max_bytes)
+    hasher = hashlib.sha256()
+    size = 0
+    file_type = None
+    with open(path, "rb") as source:
+        while chunk := source.read(UPLOAD_LIMITS["chunk_size"]):
+            if file_type is None:
+                file_type = check_content(chunk, filename, allowed_types)
+            size += len(chunk)
+            hasher.update(chunk)
+    if file_type is None:
+        raise UploadRejected(f"File {filename} is empty")
+    return StoredUpload(path=path, size=size, sha256=hasher.hexdigest(), file_type=file_type)
+
+
+async def write_upload(
+        file: UploadFile,
+        destination: str,
+        allowed_types: Sequence[str] = DOCUMENT_FILE_TYPES,
+        max_bytes: Optional[int] = None
+) -> StoredUpload:
+    """
+    Stream an uploaded file to destination, whose directory must exist.
+    An existing file at destination is replaced once the upload is accepted.
+
+    Raises:
+        UploadRejected: Missing filename, disallowed type or extension, or too large
+    """
+    filename = file.filename
+    check_filename(filename, allowed_types)
+    max_bytes = UPLOAD_LIMITS["max_bytes"] if max_bytes is None else max_bytes
+    chunk_size = UPLOAD_LIMITS["chunk_size"]
+    loop = asyncio.get_running_loop()
+    partial = destination + ".part"
+
+    hasher = hashlib.sha256()
+    size = 0
+    file_type = None
+    out = await loop.run_in_executor(None, open, partial, "wb")
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            if file_type is None:
+                file_type = check_content(chunk, filename, allowed_types)
+            size += len(chunk)
+            check_size(size, filename, max_bytes)
+            await loop.run_in_executor(None, _write_chunk, out, hasher, chunk)
+
+        if file_type is None:
+            raise UploadRejected(f"File {filename} is empty")
+
+        await loop.run_in_executor(None, out.close)
+        await loop.run_in_executor(None, os.replace, partial, destination)
+    except BaseException:
+        await loop.run_in_executor(None, _discard, out, partial)
+        raise
+
+    return StoredUpload(path=destination, size=size, sha256=hasher.hexdigest(), file_type=file_type)
+
+
+def _write_chunk(out, hasher, chunk: bytes) -> None:
+    # hashlib releases the GIL on large buffers, so concurrent uploads hash in parallel
+    hasher.update(chunk)
+    out.write(chunk)
+
+
+def _discard(out, partial: str) -> None:
+    out.close()
+    try:
+        os.remove(partial)
+    except FileNotFoundError:
+        pass
@@ -2,10 +2,10 @@ from jose import JWTError, jwt, ExpiredSignatureError
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from typing import Annotated, Tuple
 import uuid
-from server.database.users_database import UserInDB, get_user, UserStatus, get_user_by_email
+from server.database.users_database import UserInDB, get_cached_user, UserStatus, get_user_by_email
+from server.features.users.passwords import verify_password
 
 SECRET_KEY = '123123' # for dev
 
@@ -13,14 +13,9 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 90
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
 def create_access_token(user_id: uuid.UUID) -> str:
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {"sub": str(user_id), "exp": expire, "type": "access"}
@@ -53,7 +48,9 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> Use
         if not user_id or token_type != "access":
             raise credentials_exception
 
-        user = await get_user(uuid.UUID(user_id))
+        # Expiry and signature were checked by jwt.decode; only the user
+        # record comes from the cache
+        user = await get_cached_user(uuid.UUID(user_id))
         if not user:
             raise credentials_exception
 
@@ -81,7 +78,7 @@ async def get_current_active_user(
 
 async def authenticate_user(email: str, password: str) -> UserInDB:
     user = await get_user_by_email(email)
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
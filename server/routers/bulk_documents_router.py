@@ -2,20 +2,22 @@
 Router for bulk document upload and management.
 This implements the bulk document upload functionality mentioned in the PRD.
 """
-import os
+import asyncio
 import uuid
 import logging
-import shutil
 from typing import List, Dict, Any, Optional
 from fastapi import (
     APIRouter, 
+    BackgroundTasks,
     Depends, 
     HTTPException, 
+    Path,
     status, 
     UploadFile, 
     File, 
     Form
 )
+from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 
 from server.database.bulk_documents_database import (
@@ -32,6 +34,20 @@ from server.database.cases_database import (
     get_case,
     CaseDocumentInDB
 )
+from server.database.case_documents_database import (
+    CaseDocumentInDB as CaseDocumentRecord,
+    get_case_document
+)
+from server.features.uploads.document_store import store_uploads
+from server.features.uploads.previews import (
+    PREVIEW_CACHE_MAX_AGE,
+    content_sha256,
+    get_manifest,
+    get_page_preview,
+    get_thumbnail,
+    warm_thumbnails
+)
+from server.features.uploads.streaming_writer import UploadRejected
 from server.features.users.security import get_current_active_user, oauth2_scheme
 from server.database.users_database import UserPublic
 from server.database.unique_docs_database import (
@@ -58,6 +74,22 @@ class EntityCreationRequest(BaseModel):
     entity_data: Dict[str, Any]
     
 
+class UnidentifiedDocument(CaseDocumentRecord):
+    """An unidentified document, with where to fetch its previews"""
+    # Hash of the file's content; part of the preview URLs, which change with it
+    content_sha256: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    previews_url: Optional[str] = None
+
+
+class DocumentPreviews(BaseModel):
+    """Page count and preview URLs of a document's file"""
+    content_sha256: str
+    page_count: int
+    thumbnail_url: str
+    page_urls: List[str]
+
+
 class DocumentClassificationWithNewEntity(BaseModel):
     """Request to classify a document with a new entity"""
     document_id: uuid.UUID
@@ -78,6 +110,7 @@ class DocumentClassificationWithNewEntity(BaseModel):
 )
 async def bulk_upload_documents(
     case_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     current_user: UserPublic = Depends(get_current_active_user)
 ) -> BulkUploadResult:
@@ -97,59 +130,20 @@ async def bulk_upload_documents(
                 detail=f"Case with ID {case_id} not found"
             )
             
-        # Create directory structure for file storage
-        base_dir = f"./mortgage_system/uploaded_files/{case_id}"
-        os.makedirs(base_dir, exist_ok=True)
-        
-        # Process all uploaded files
+        # Stream all files into the document store concurrently, with type,
+        # size and content checks
         file_paths = []
+        filenames = []
         errors = []
-        
-        for file in files:
-            try:
-                # Ensure the file extension is valid (PDF or image)
-                filename = file.filename
-                if not filename:
-                    errors.append(f"Missing filename for uploaded file")
-                    continue
-                    
-                ext = os.path.splitext(filename.lower())[1]
-                valid_extensions = ['.pdf', '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif']
-                
-                if ext not in valid_extensions:
-                    errors.append(f"Invalid file type for file {filename}. Only PDF and image files are allowed.")
-                    continue
-                
-                # Ensure file is not larger than 25MB
-                file_size = 0
-                content = await file.read()
-                file_size = len(content)
-                
-                if file_size > 25 * 1024 * 1024:  # 25MB in bytes
-                    errors.append(f"File {filename} exceeds the maximum allowed size of 25MB")
-                    continue
-                
-                # Reset file position for saving
-                await file.seek(0)
-                
-                # Save file to disk
-                destination_path = os.path.join(base_dir, filename)
-                
-                # Handle filename collisions
-                if os.path.exists(destination_path):
-                    base_name, ext = os.path.splitext(filename)
-                    timestamp = uuid.uuid4().hex[:8]
-                    filename = f"{base_name}_{timestamp}{ext}"
-                    destination_path = os.path.join(base_dir, filename)
-                
-                # Save the file
-                with open(destination_path, "wb") as buffer:
-                    shutil.copyfileobj(file.file, buffer)
-                
-                file_paths.append(destination_path)
-                
-            except Exception as e:
-                errors.append(f"Error processing file {file.filename}: {str(e)}")
+
+        for file, stored in zip(files, await store_uploads(files)):
+            if isinstance(stored, UploadRejected):
+                errors.append(stored.detail)
+            elif isinstance(stored, Exception):
+                errors.append(f"Error processing file {file.filename}: {str(stored)}")
+            else:
+                file_paths.append(stored.path)
+                filenames.append(stored.filename)
         
         # If no files were successfully processed, return error
         if not file_paths:
@@ -159,11 +153,14 @@ async def bulk_upload_documents(
             )
         
         # Create bulk document records
-        result = await create_bulk_documents(case_id, file_paths)
+        result = await create_bulk_documents(case_id, file_paths, filenames)
         
         # Add any file processing errors
         result.errors.extend(errors)
         result.success = len(errors) == 0 and result.success
+
+        # Thumbnails for the unidentified documents screen
+        background_tasks.add_task(warm_thumbnails, [doc.file_path for doc in result.documents])
         
         return result
         
@@ -180,16 +177,18 @@ async def bulk_upload_documents(
 
 @router.get(
     "/{case_id}/unidentified",
-    response_model=List[CaseDocumentInDB]
+    response_model=List[UnidentifiedDocument]
 )
 async def get_unidentified_documents_endpoint(
     case_id: uuid.UUID,
     current_user: UserPublic = Depends(get_current_active_user)
-) -> List[CaseDocumentInDB]:
+) -> List[UnidentifiedDocument]:
     """
     Get all unidentified documents for a specific case.
     
     These are documents that have been uploaded but not yet classified with a document type.
+    Each comes with the URLs of its thumbnail and page previews, so reviewers
+    can see it without downloading the file.
     """
     try:
         # Check if the case exists
@@ -200,7 +199,24 @@ async def get_unidentified_documents_endpoint(
                 detail=f"Case with ID {case_id} not found"
             )
             
-        return await get_unidentified_documents(case_id)
+        documents = await get_unidentified_documents(case_id)
+        hashes = await asyncio.gather(
+            *(content_sha256(doc.file_path) for doc in documents if doc.file_path),
+            return_exceptions=True
+        )
+        hashes_by_id = dict(zip([doc.id for doc in documents if doc.file_path], hashes))
+
+        result = []
+        for doc in documents:
+            unidentified = UnidentifiedDocument(**doc.model_dump())
+            sha256 = hashes_by_id.get(doc.id)
+            if isinstance(sha256, str):
+                previews_url = _previews_url(case_id, doc.id, sha256)
+                unidentified.content_sha256 = sha256
+                unidentified.previews_url = previews_url
+                unidentified.thumbnail_url = f"{previews_url}/thumbnail.jpg"
+            result.append(unidentified)
+        return result
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -213,6 +229,116 @@ async def get_unidentified_documents_endpoint(
         )
 
 
+def _previews_url(case_id: uuid.UUID, document_id: uuid.UUID, sha256: str) -> str:
+    return f"{router.prefix}/{case_id}/documents/{document_id}/previews/{sha256}"
+
+
+async def _get_document_file(case_id: uuid.UUID, document_id: uuid.UUID, sha256: str) -> str:
+    """
+    File path of a case document, provided its content still has the hash the
+    preview URL was built for.
+    """
+    doc = await get_case_document(document_id)
+    if not doc or doc.case_id != case_id or not doc.file_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document with ID {document_id} not found in case {case_id}"
+        )
+    try:
+        current_sha256 = await content_sha256(doc.file_path)
+    except FileNotFoundError:
+        current_sha256 = None
+    if current_sha256 != sha256:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {document_id} no longer has content {sha256}"
+        )
+    return doc.file_path
+
+
+def _preview_response(path: str) -> FileResponse:
+    # The URL carries the content hash, so the preview at a URL never changes
+    return FileResponse(
+        path,
+        media_type="image/jpeg",
+        headers={"Cache-Control": f"private, max-age={PREVIEW_CACHE_MAX_AGE}, immutable"}
+    )
+
+
+@router.get(
+    "/{case_id}/documents/{document_id}/previews/{sha256}",
+    response_model=DocumentPreviews
+)
+async def get_document_previews_endpoint(
+    case_id: uuid.UUID,
+    document_id: uuid.UUID,
+    sha256: str = Path(..., pattern=r"^[0-9a-f]{64}$"),
+    current_user: UserPublic = Depends(get_current_active_user)
+) -> DocumentPreviews:
+    """
+    Get the page count of a document's file and the URLs of its previews.
+    """
+    file_path = await _get_document_file(case_id, document_id, sha256)
+    try:
+        manifest = await get_manifest(file_path)
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    previews_url = _previews_url(case_id, document_id, sha256)
+    return DocumentPreviews(
+        content_sha256=sha256,
+        page_count=manifest.page_count,
+        thumbnail_url=f"{previews_url}/thumbnail.jpg",
+        page_urls=[f"{previews_url}/pages/{page}.jpg" for page in range(1, manifest.page_count + 1)]
+    )
+
+
+@router.get(
+    "/{case_id}/documents/{document_id}/previews/{sha256}/thumbnail.jpg",
+    response_class=FileResponse
+)
+async def get_document_thumbnail_endpoint(
+    case_id: uuid.UUID,
+    document_id: uuid.UUID,
+    sha256: str = Path(..., pattern=r"^[0-9a-f]{64}$"),
+    current_user: UserPublic = Depends(get_current_active_user)
+) -> FileResponse:
+    """
+    Get a small JPEG thumbnail of the first page of a document's file.
+    """
+    file_path = await _get_document_file(case_id, document_id, sha256)
+    try:
+        return _preview_response(await get_thumbnail(file_path))
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get(
+    "/{case_id}/documents/{document_id}/previews/{sha256}/pages/{page}.jpg",
+    response_class=FileResponse
+)
+async def get_document_page_preview_endpoint(
+    case_id: uuid.UUID,
+    document_id: uuid.UUID,
+    page: int,
+    sha256: str = Path(..., pattern=r"^[0-9a-f]{64}$"),
+    current_user: UserPublic = Depends(get_current_active_user)
+) -> FileResponse:
+    """
+    Get a low-resolution JPEG preview of one page (1-based) of a document's file.
+    """
+    file_path = await _get_document_file(case_id, document_id, sha256)
+    try:
+        preview = await get_page_preview(file_path, page)
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if preview is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {document_id} has no page {page}"
+        )
+    return _preview_response(preview)
+
+
 @router.get(
     "/{case_id}/unlinked",
     response_model=List[CaseDocumentInDB]
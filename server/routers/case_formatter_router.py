@@ -1,13 +1,20 @@
 """
 Router for formatted case data
 """
+import json
 import uuid
 import logging
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import Dict, Any
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any, Optional
 
-from server.database.case_formatter_database import get_formatted_case
-from server.database.cases_database import get_case
+from server.database.case_formatter_database import (
+    get_formatted_case_etag,
+    get_formatted_case_snapshot,
+    iter_formatted_cases
+)
 from server.features.users.security import get_current_active_user, oauth2_scheme
 from server.database.users_database import UserPublic
 
@@ -18,6 +25,18 @@ router = APIRouter(
 )
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag, as RFC 9110 requires"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
 @router.get(
     "/api/v1/cases/{case_id}/complete",
     response_model=Dict[str, Any],
@@ -25,25 +44,72 @@ router = APIRouter(
 )
 async def get_complete_case(
         case_id: uuid.UUID,
+        if_none_match: Optional[str] = Header(default=None),
         current_user: UserPublic = Depends(get_current_active_user)
 ):
     """
     Get a complete case with all related data formatted to match the sample JSON structure
-    """
-    # Verify the case exists
-    case = await get_case(case_id)
-    if not case:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Case with ID {case_id} not found"
-        )
 
+    The response carries a strong ETag built from the case's versions; a
+    request whose If-None-Match matches gets 304 Not Modified after reading
+    only the case's statistics row, without loading or formatting the case.
+    """
     try:
-        formatted_case = await get_formatted_case(case_id)
-        return formatted_case
+        etag = await get_formatted_case_etag(case_id)
+        # Clients must revalidate, but may reuse the body while the ETag matches
+        headers = {"Cache-Control": "private, no-cache"}
+        if etag is not None:
+            headers["ETag"] = etag
+            if _etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        # Read after the ETag: the body is at least as new as the versions it names
+        snapshot = await get_formatted_case_snapshot(case_id)
     except Exception as e:
         logger.error(f"Error retrieving formatted case: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving formatted case: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Case with ID {case_id} not found"
+        )
+
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/api/v1/cases/export",
+    tags=["case-formatter"]
+)
+async def export_complete_cases(
+        status_filter: Optional[str] = Query(default=None, alias="status"),
+        last_active_from: Optional[datetime] = None,
+        last_active_to: Optional[datetime] = None,
+        batch_size: int = Query(default=100, ge=1, le=1000),
+        current_user: UserPublic = Depends(get_current_active_user)
+):
+    """
+    Export complete cases as newline-delimited JSON, one formatted case per line
+
+    Cases are streamed from a server-side cursor in batches of batch_size, so
+    the export runs in bounded memory however many cases match.
+    """
+    async def ndjson_lines() -> AsyncIterator[str]:
+        try:
+            async for formatted_case in iter_formatted_cases(
+                    status=status_filter,
+                    last_active_from=last_active_from,
+                    last_active_to=last_active_to,
+                    batch_size=batch_size
+            ):
+                yield json.dumps(jsonable_encoder(formatted_case), ensure_ascii=False) + "\n"
+        except Exception as e:
+            # Headers are already sent; the truncated body is the only signal
+            logger.error(f"Error exporting formatted cases: {str(e)}")
+            raise
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
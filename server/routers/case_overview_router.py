@@ -4,6 +4,7 @@ This implements the case composition overview mentioned in the PRD.
 """
 import uuid
 import logging
+from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from server.database.case_overview_database import (
@@ -12,9 +13,9 @@ from server.database.case_overview_database import (
     get_case_overview,
     get_detailed_case_overview
 )
+from server.database.case_stats_database import CaseStats, list_case_stats
 from server.features.users.security import get_current_active_user, oauth2_scheme
 from server.database.users_database import UserPublic
-from server.database.cases_database import get_case
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -26,6 +27,26 @@ router = APIRouter(
 )
 
 
+@router.get(
+    "/stats",
+    response_model=List[CaseStats]
+)
+async def list_case_stats_endpoint(
+    current_user: UserPublic = Depends(get_current_active_user)
+) -> List[CaseStats]:
+    """
+    Get the entity and document counts of every case, for case lists and dashboards.
+    """
+    try:
+        return await list_case_stats()
+    except Exception as e:
+        logger.error(f"Error listing case stats: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unexpected error occurred: {str(e)}"
+        )
+
+
 @router.get(
     "/{case_id}",
     response_model=CaseOverview
@@ -41,19 +62,12 @@ async def get_case_overview_endpoint(
     and documents needing attention.
     """
     try:
-        # Check if the case exists
-        case = await get_case(case_id)
-        if not case:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Case with ID {case_id} not found"
-            )
-            
+        # The overview query reads the case row too, so no separate existence check
         overview = await get_case_overview(case_id)
         if not overview:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Case overview not available for case with ID {case_id}"
+                detail=f"Case with ID {case_id} not found"
             )
             
         return overview
@@ -84,19 +98,12 @@ async def get_detailed_case_overview_endpoint(
     their documents, and document status.
     """
     try:
-        # Check if the case exists
-        case = await get_case(case_id)
-        if not case:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Case with ID {case_id} not found"
-            )
-            
+        # The basic overview inside reads the case row, so no separate existence check
         detailed_overview = await get_detailed_case_overview(case_id)
         if not detailed_overview:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Detailed case overview not available for case with ID {case_id}"
+                detail=f"Case with ID {case_id} not found"
             )
             
         return detailed_overview
@@ -8,6 +8,8 @@ from fastapi import Depends
 from server.database.documents_database import DocumentInCreate
 from server.features.docs_processing.detect_doc_type import classify_document
 from server.features.docs_processing.document_processing_db import get_labels
+from server.features.uploads.document_store import store_upload
+from server.features.uploads.streaming_writer import UploadRejected
 
 from fastapi import (
     APIRouter,
@@ -404,16 +406,8 @@ async def create_document_with_upload(
 
     # Upload the file
     try:
-        # Define a local upload path
-        base_dir = "./mortgage_system/uploaded_files"
-        upload_dir = os.path.join(base_dir, str(case_id))
-        os.makedirs(upload_dir, exist_ok=True)
-
-        # Save the file to disk
-        file_path = os.path.join(upload_dir, file.filename)
-        content = await file.read()
-        with open(file_path, "wb") as out_file:
-            out_file.write(content)
+        # Stream the file into the document store
+        file_path = (await store_upload(file)).path
 
         # Update the case document with the file path
         doc_update = CaseDocumentUpdate(file_path=file_path, processing_status="pending")
@@ -434,6 +428,8 @@ async def create_document_with_upload(
         )
 
         return updated_doc
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         # Clean up on failure
         raise HTTPException(
@@ -523,9 +519,9 @@ async def upload_case_document_file(
         background_tasks: BackgroundTasks = BackgroundTasks()
 ):
     """
-    Upload the actual file for a case document. The file will be stored on the
-    filesystem in a path like:
-        /mortgage_system/uploaded_files/{case_id}/{file.filename}
+    Upload the actual file for a case document. The file is kept in the
+    content-addressed document store, at a path like:
+        /mortgage_system/uploaded_files/objects/ab/cd/{sha256}.pdf
 
     Then we update the `file_path` in the `case_documents` table.
     """
@@ -540,7 +536,30 @@ async def upload_case_document_file(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found in the documents table")
 
-    # 3. Check that the case_document link exists
+    # 3. Stream the file into the document store, checking its type and size
+    try:
+        file_path = (await store_upload(file)).path
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"File upload failed: {e}")
+
+    # 4. Link the file to the case document and classify it
+    return await attach_case_document_file(case_id, document_id, file_path, background_tasks)
+
+
+async def attach_case_document_file(
+        case_id: UUID,
+        document_id: UUID,
+        file_path: str,
+        background_tasks: BackgroundTasks
+) -> CaseDocumentInDB:
+    """
+    Store file_path on the case's link to the document, creating the link if
+    needed, and queue classification of the file.
+    The case and document must exist.
+    """
+    # 1. Check that the case_document link exists
     doc_link = await get_case_document(case_id, document_id)
     if not doc_link:
         # If the link doesn't exist, create it
@@ -558,27 +577,13 @@ async def upload_case_document_file(
                 detail=f"Failed to create case-document link: {str(e)}"
             )
 
-    # 4. Define a local upload path
-    base_dir = "./mortgage_system/uploaded_files"
-    upload_dir = os.path.join(base_dir, str(case_id))
-    os.makedirs(upload_dir, exist_ok=True)
-
-    # 5. Save the file to disk
-    file_path = os.path.join(upload_dir, file.filename)
-    try:
-        content = await file.read()
-        with open(file_path, "wb") as out_file:
-            out_file.write(content)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"File upload failed: {e}")
-
-    # 6. Update the DB record so `file_path` is stored
+    # 2. Update the DB record so `file_path` is stored
     doc_update = CaseDocumentUpdate(file_path=file_path, processing_status="pending")
     updated_doc = await update_case_document(case_id, document_id, doc_update)
     if not updated_doc:
         raise HTTPException(status_code=404, detail="Could not update file path")
 
-    # 7. Run document classification in the background
+    # 3. Run document classification in the background
     background_tasks.add_task(classify_document_background, file_path, case_id, document_id)
 
     # Return the updated record to the client
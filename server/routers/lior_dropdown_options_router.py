@@ -19,7 +19,8 @@ from server.database.lior_dropdown_options_database import (
     get_all_categories,
     update_dropdown_option,
     delete_dropdown_option,
-    check_option_in_use
+    check_option_in_use,
+    check_options_in_use
 )
 from server.features.users.security import get_current_active_user, oauth2_scheme
 from server.database.users_database import UserPublic, UserRole
@@ -93,6 +94,29 @@ async def get_options_by_category(
         )
 
 
+@router.get("/api/v1/dropdown-options/{category}/usage", response_model=List[Dict[str, Any]])
+async def get_options_usage_by_category(
+        category: str,
+        current_user: UserPublic = Depends(get_current_active_user)
+):
+    """
+    Get all dropdown options for a specific category with whether each is in use
+    """
+    try:
+        options = await get_dropdown_options_by_category(category)
+        in_use = await check_options_in_use(category)
+        return [
+            {"id": str(opt.id), "name": opt.name, "value": opt.value, "in_use": in_use.get(opt.id, False)}
+            for opt in options
+        ]
+    except Exception as e:
+        logger.error(f"Error checking option usage for category {category}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error checking option usage for category {category}: {str(e)}"
+        )
+
+
 @router.post("/api/v1/dropdown-options", response_model=Dict[str, Any], status_code=status.HTTP_201_CREATED)
 async def create_option(
         payload: DropdownOptionCreate,
@@ -0,0 +1,213 @@
+"""
+Router for resumable chunked uploads.
+
+Flow:
+1. POST /uploads/cases/{case_id} opens a session for a file of a declared size
+2. PUT /uploads/{session_id}?offset=N sends the next chunk, with its SHA-256
+   in the X-Chunk-SHA256 header; after a dropped connection, GET the session
+   and continue from its received_size
+3. POST /uploads/{session_id}/complete checks the whole file, stores it and
+   links it to the case like a regular upload (a bulk upload, or the file of
+   the session's document)
+"""
+import uuid
+import logging
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, status
+from pydantic import BaseModel
+
+from server.database.bulk_documents_database import create_bulk_documents
+from server.database.cases_database import get_case
+from server.database.documents_database import get_document
+from server.database.upload_sessions_database import UploadSessionCreate, UploadSessionInDB, get_upload_session
+from server.features.uploads.document_store import StoredObject
+from server.features.uploads.previews import warm_thumbnails
+from server.features.uploads.resumable import (
+    complete_upload_session,
+    discard_upload_session,
+    receive_chunk,
+    start_upload_session,
+)
+from server.features.uploads.streaming_writer import UploadRejected
+from server.features.users.security import get_current_active_user, oauth2_scheme
+from server.database.users_database import UserPublic
+from server.routers.cases_router import attach_case_document_file
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/uploads",
+    tags=["uploads"],
+    dependencies=[Depends(oauth2_scheme)]
+)
+
+
+class UploadCompleted(BaseModel):
+    """A completed upload and the case document it was attached to"""
+    session_id: uuid.UUID
+    case_id: uuid.UUID
+    case_document_id: uuid.UUID
+    document_id: Optional[uuid.UUID] = None
+    filename: str
+    file_path: str
+    size: int
+    sha256: str
+    # Whether identical content was already stored
+    deduplicated: bool
+
+
+async def _get_session_or_404(session_id: uuid.UUID, current_user: UserPublic) -> UploadSessionInDB:
+    session = await get_upload_session(session_id)
+    # Another user's session is answered as if it did not exist
+    if not session or session.created_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload session {session_id} not found or expired"
+        )
+    return session
+
+
+@router.post(
+    "/cases/{case_id}",
+    response_model=UploadSessionInDB,
+    status_code=status.HTTP_201_CREATED
+)
+async def start_upload_endpoint(
+    case_id: uuid.UUID,
+    session_in: UploadSessionCreate,
+    current_user: UserPublic = Depends(get_current_active_user)
+) -> UploadSessionInDB:
+    """
+    Open a resumable upload of one file for a case.
+    """
+    if not await get_case(case_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Case with ID {case_id} not found"
+        )
+    if session_in.document_id and not await get_document(session_in.document_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found in the documents table"
+        )
+    try:
+        return await start_upload_session(case_id, session_in, current_user.id)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@router.get(
+    "/{session_id}",
+    response_model=UploadSessionInDB
+)
+async def get_upload_endpoint(
+    session_id: uuid.UUID,
+    current_user: UserPublic = Depends(get_current_active_user)
+) -> UploadSessionInDB:
+    """
+    Get an upload session; its received_size is the offset of the next chunk.
+    """
+    return await _get_session_or_404(session_id, current_user)
+
+
+@router.put(
+    "/{session_id}",
+    response_model=UploadSessionInDB
+)
+async def upload_chunk_endpoint(
+    session_id: uuid.UUID,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    chunk_sha256: str = Header(..., alias="X-Chunk-SHA256", pattern=r"^[0-9a-fA-F]{64}$"),
+    current_user: UserPublic = Depends(get_current_active_user)
+) -> UploadSessionInDB:
+    """
+    Append the request body to the upload at offset.
+
+    A 409 means offset is not where the upload stands (for example, a chunk
+    resent after its response was lost); GET the session for its received_size.
+    """
+    session = await _get_session_or_404(session_id, current_user)
+    try:
+        return await receive_chunk(session, offset, request.stream(), chunk_sha256)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@router.post(
+    "/{session_id}/complete",
+    response_model=UploadCompleted
+)
+async def complete_upload_endpoint(
+    session_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+    current_user: UserPublic = Depends(get_current_active_user)
+) -> UploadCompleted:
+    """
+    Finish an upload once every chunk has been received.
+
+    The file is checked (type, size, the SHA-256 declared when the upload
+    started) and stored. Without a document_id it becomes an unidentified
+    case document, as with a bulk upload; with one, it becomes that document's
+    file and is queued for classification. A file failing its checks closes
+    the session; if the case document cannot be written, the session stays
+    open and completing can be retried.
+    """
+    session = await _get_session_or_404(session_id, current_user)
+
+    async def attach(stored: StoredObject) -> uuid.UUID:
+        if session.document_id:
+            case_document = await attach_case_document_file(
+                session.case_id, session.document_id, stored.path, background_tasks
+            )
+            return case_document.id
+        result = await create_bulk_documents(session.case_id, [stored.path], [stored.filename])
+        if not result.documents:
+            logger.error(f"Could not create case document for upload {session_id}: {result.errors}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Could not create case document: {'; '.join(result.errors)}"
+            )
+        background_tasks.add_task(warm_thumbnails, [stored.path])
+        return result.documents[0].id
+
+    try:
+        stored, case_document_id = await complete_upload_session(session, attach)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    return UploadCompleted(
+        session_id=session_id,
+        case_id=session.case_id,
+        case_document_id=case_document_id,
+        document_id=session.document_id,
+        filename=stored.filename,
+        file_path=stored.path,
+        size=stored.size,
+        sha256=stored.sha256,
+        deduplicated=stored.deduplicated
+    )
+
+
+@router.delete(
+    "/{session_id}",
+    status_code=status.HTTP_204_NO_CONTENT
+)
+async def cancel_upload_endpoint(
+    session_id: uuid.UUID,
+    current_user: UserPublic = Depends(get_current_active_user)
+):
+    """
+    Abandon an upload and discard the bytes received so far.
+    """
+    await _get_session_or_404(session_id, current_user)
+    try:
+        if not await discard_upload_session(session_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Upload session {session_id} not found"
+            )
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return None
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from typing import Optional, List
 import uuid
 from server.database.users_database import (
-    UserCreate, UserPublic, UserUpdate, UserProfileUpdate,
+    UserCreate, UserPublic, UserUpdate, UserProfileUpdate, UserStatusUpdate,
     PasswordChange, NotificationPreferences, UserPreferences,
     update_user_profile, get_user,
     change_password,
-    UserRole, UserStatus, list_users_paginated, delete_user, update_user_preferences, update_user_role, UserLanguage, NotificationTypes, PaginatedUsers
+    UserRole, UserStatus, list_users_paginated, delete_user, update_user_preferences, update_user_role, update_user_status, UserLanguage, NotificationTypes, PaginatedUsers
 )
 from server.features.users.security import get_current_active_user, oauth2_scheme
 from server.features.users.image_service import ImageService
@@ -92,6 +92,18 @@ async def delete_user_account(
     return None
 
 
+@router.put("/{user_id}/status", response_model=UserPublic)
+async def update_user_account_status(
+        user_id: uuid.UUID,
+        status_data: UserStatusUpdate,
+        current_user: UserPublic = Depends(get_current_active_user)
+):
+    """Activate, deactivate or suspend a user account (Admin only)"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    return await update_user_status(user_id, status_data.status)
+
+
 @router.put("/{user_id}/profile", response_model=UserPublic)
 async def update_user_profile_details(
         user_id: uuid.UUID,
@@ -4,12 +4,11 @@ import asyncpg
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 
 from server.database.person_roles_database import PersonRoleInCreate
-from server.database.cases_database import create_case, CaseInCreate, CaseStatus
+from server.database.cases_database import create_case, CaseInCreate
 from server.database.finorg_database import create_fin_org_type, FinOrgTypeCreate
-from server.routers.loan_types_router import LoanTypeDb, LoanTypeInCreate
 from server.api import app
 from server.database.database import drop_all_tables, create_schema_if_not_exists, get_connection
 from server.database.users_database import create_user, UserCreate, update_user_role, UserRole, delete_user, get_user_by_email
@@ -47,7 +46,7 @@ def client():
 @pytest_asyncio.fixture(scope="module")
 async def async_client():
     """Fixture for asynchronous TestClient using httpx."""
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
 
 
@@ -156,6 +155,8 @@ async def created_loan_type():
     """
     Creates a test load type for use in testing.
     """
+    from server.routers.loan_types_router import LoanTypeDb, LoanTypeInCreate
+
     try:
         return await LoanTypeDb.create_loan_type(LoanTypeInCreate(
             name="Mortgage",
@@ -170,6 +171,8 @@ async def created_case(created_loan_type):
     """
     Creates a new case for testing and returns the resulting CaseInDB.
     """
+    from server.database.cases_database import CaseStatus
+
     return await create_case(CaseInCreate(
         name="Test Case",
         status=CaseStatus.active,
@@ -0,0 +1,60 @@
+import uuid
+
+import pytest
+
+from server.database.case_overview_cache import get_case_version
+from server.database.cases_database import CaseInCreate, CasePersonCreate, create_case, create_case_person
+from server.database.person_relationships_database import (
+    RelationshipInCreate,
+    RelationshipInUpdate,
+    create_relationship,
+    delete_relationship,
+    update_relationship,
+)
+
+
+async def _person(case_id: uuid.UUID, first_name: str, id_number: str):
+    return await create_case_person(CasePersonCreate(
+        case_id=case_id, first_name=first_name, last_name="Levi", id_number=id_number,
+        role_id=uuid.uuid4(), gender="female", birth_date="1985-05-01",
+    ))
+
+
+@pytest.mark.asyncio
+async def test_person_relations_bump_case_version():
+    case = await create_case(CaseInCreate(name="Relations", status="active", case_purpose="Testing",
+                                          loan_type_id=uuid.uuid4()))
+    dana = await _person(case.id, "Dana", "300000001")
+    noa = await _person(case.id, "Noa", "300000002")
+
+    before = await get_case_version(case.id)
+    await create_relationship(RelationshipInCreate(
+        from_person_id=dana.id, to_person_id=noa.id, relationship_type_id=uuid.uuid4()
+    ))
+    created = await get_case_version(case.id)
+    assert created != before
+
+    await update_relationship(dana.id, noa.id, RelationshipInUpdate(relationship_type_id=uuid.uuid4()))
+    updated = await get_case_version(case.id)
+    assert updated != created
+
+    await delete_relationship(dana.id, noa.id)
+    assert await get_case_version(case.id) != updated
+
+
+@pytest.mark.asyncio
+async def test_relation_bumps_both_persons_cases():
+    first = await create_case(CaseInCreate(name="First", status="active", case_purpose="Testing",
+                                           loan_type_id=uuid.uuid4()))
+    second = await create_case(CaseInCreate(name="Second", status="active", case_purpose="Testing",
+                                            loan_type_id=uuid.uuid4()))
+    dana = await _person(first.id, "Dana", "300000003")
+    noa = await _person(second.id, "Noa", "300000004")
+    first_before, second_before = await get_case_version(first.id), await get_case_version(second.id)
+
+    await create_relationship(RelationshipInCreate(
+        from_person_id=dana.id, to_person_id=noa.id, relationship_type_id=uuid.uuid4()
+    ))
+
+    assert await get_case_version(first.id) != first_before
+    assert await get_case_version(second.id) != second_before
@@ -0,0 +1,99 @@
+import io
+import os
+import time
+import uuid
+
+import pytest
+from fastapi import UploadFile
+
+from server.database.cases_database import CaseInCreate, create_case
+from server.database.database import get_connection
+from server.features.uploads import document_store
+from server.features.uploads.document_store import collect_unreferenced_objects, store_upload
+
+PDF_CONTENT = b"%PDF-1.4\n" + b"x" * 4096
+
+
+@pytest.fixture(autouse=True)
+def store_root(tmp_path, monkeypatch):
+    root = str(tmp_path / "objects")
+    monkeypatch.setitem(document_store.DOCUMENT_STORE, "root", root)
+    return root
+
+
+def _upload(content: bytes, filename: str = "doc.pdf") -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+def _age(path: str) -> None:
+    """Make a file older than the grace period"""
+    old = time.time() - document_store.DOCUMENT_STORE["gc_grace_seconds"] - 60
+    os.utime(path, (old, old))
+
+
+async def _reference(path: str) -> None:
+    case = await create_case(CaseInCreate(name="Store", status="active", case_purpose="Testing",
+                                          loan_type_id=uuid.uuid4()))
+    async with get_connection() as conn:
+        await conn.execute(
+            "INSERT INTO case_documents (case_id, status, file_path) VALUES ($1, 'received', $2)",
+            case.id, path
+        )
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_object(store_root):
+    first = await store_upload(_upload(PDF_CONTENT, "a.pdf"))
+    second = await store_upload(_upload(PDF_CONTENT, "b.pdf"))
+
+    assert not first.deduplicated
+    assert second.deduplicated
+    assert second.path == first.path
+    assert second.filename == "b.pdf"
+    # The second copy was discarded
+    assert os.listdir(os.path.join(store_root, "incoming")) == []
+
+
+@pytest.mark.asyncio
+async def test_dedup_restarts_grace_period():
+    stored = await store_upload(_upload(PDF_CONTENT))
+    _age(stored.path)
+
+    await store_upload(_upload(PDF_CONTENT))
+
+    assert await collect_unreferenced_objects() == 0
+    assert os.path.exists(stored.path)
+
+
+@pytest.mark.asyncio
+async def test_collection_keeps_young_and_referenced_objects():
+    young = await store_upload(_upload(PDF_CONTENT + b"young"))
+    referenced = await store_upload(_upload(PDF_CONTENT + b"referenced"))
+    orphan = await store_upload(_upload(PDF_CONTENT + b"orphan"))
+    _age(referenced.path)
+    _age(orphan.path)
+    await _reference(referenced.path)
+
+    assert await collect_unreferenced_objects() == 1
+
+    assert os.path.exists(young.path)
+    assert os.path.exists(referenced.path)
+    assert not os.path.exists(orphan.path)
+
+
+@pytest.mark.asyncio
+async def test_object_reused_during_collection_is_kept(monkeypatch):
+    stored = await store_upload(_upload(PDF_CONTENT))
+    _age(stored.path)
+    rename = os.rename
+
+    def reuse_then_rename(source, destination):
+        # An upload deduplicates against the object between the age check and the removal
+        os.utime(source)
+        rename(source, destination)
+
+    monkeypatch.setattr(document_store.os, "rename", reuse_then_rename)
+
+    assert await collect_unreferenced_objects() == 0
+    assert os.path.exists(stored.path)
+    assert os.listdir(os.path.dirname(stored.path)) == [os.path.basename(stored.path)]
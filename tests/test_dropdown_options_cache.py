@@ -0,0 +1,73 @@
+import asyncio
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from server.database.database import get_connection
+from server.database.lior_dropdown_options_database import (
+    DropdownOptionCreate,
+    create_dropdown_option,
+    get_dropdown_option_by_id,
+    get_dropdown_options_by_category,
+    get_dropdown_options_index,
+)
+from server.database.notifications import is_listening, start_notification_listener, stop_notification_listener
+
+
+@pytest_asyncio.fixture
+async def listener():
+    await start_notification_listener()
+    assert is_listening()
+    yield
+    await stop_notification_listener()
+
+
+async def _eventually(predicate, timeout: float = 5.0) -> bool:
+    """Poll an async predicate until it holds, giving the NOTIFY time to arrive"""
+    for _ in range(int(timeout / 0.05)):
+        if await predicate():
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+async def _insert_option_directly(category: str) -> uuid.UUID:
+    """Write outside the module, so only the trigger's NOTIFY can invalidate the cache"""
+    async with get_connection() as conn:
+        return await conn.fetchval(
+            "INSERT INTO lior_dropdown_options (category, name, value) VALUES ($1, $2, $3) RETURNING id",
+            category, "Direct", uuid.uuid4().hex
+        )
+
+
+@pytest.mark.asyncio
+async def test_index_is_reused_while_listening(listener):
+    first = await get_dropdown_options_index()
+    assert await get_dropdown_options_index() is first
+
+
+@pytest.mark.asyncio
+async def test_notify_invalidates_the_index(listener):
+    category = "test_" + uuid.uuid4().hex[:8]
+    await create_dropdown_option(DropdownOptionCreate(category=category, name="Via module", value="a"))
+    assert len(await get_dropdown_options_by_category(category)) == 1
+
+    option_id = await _insert_option_directly(category)
+
+    async def sees_new_option():
+        return await get_dropdown_option_by_id(option_id) is not None
+
+    assert await _eventually(sees_new_option)
+    assert len(await get_dropdown_options_by_category(category)) == 2
+
+
+@pytest.mark.asyncio
+async def test_reads_query_the_database_without_listener():
+    assert not is_listening()
+    category = "test_" + uuid.uuid4().hex[:8]
+
+    option_id = await _insert_option_directly(category)
+
+    # No notification can arrive, so nothing may be served from a stale copy
+    assert await get_dropdown_option_by_id(option_id) is not None
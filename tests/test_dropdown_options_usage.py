@@ -0,0 +1,49 @@
+import uuid
+
+import pytest
+
+from server.database.bank_accounts_database import BankAccountInCreate, create_bank_account
+from server.database.cases_database import CaseInCreate, CasePersonCreate, create_case, create_case_person
+from server.database.lior_dropdown_options_database import (
+    DropdownOptionCreate,
+    check_option_in_use,
+    check_options_in_use,
+    create_dropdown_option,
+)
+
+
+@pytest.mark.asyncio
+async def test_option_usage_is_checked_across_referencing_tables():
+    used = await create_dropdown_option(DropdownOptionCreate(
+        category="bank_account_types", name="Used", value="used_" + uuid.uuid4().hex[:8]))
+    unused = await create_dropdown_option(DropdownOptionCreate(
+        category="bank_account_types", name="Unused", value="unused_" + uuid.uuid4().hex[:8]))
+    loan_type = await create_dropdown_option(DropdownOptionCreate(
+        category="loan_types", name="Mortgage", value="mortgage_" + uuid.uuid4().hex[:8]))
+
+    case = await create_case(CaseInCreate(name="Usage", status="active", case_purpose="Testing",
+                                          loan_type_id=loan_type.id))
+    person = await create_case_person(CasePersonCreate(
+        case_id=case.id, first_name="Dana", last_name="Levi", id_number="300000001",
+        role_id=uuid.uuid4(), gender="female", birth_date="1985-05-01",
+    ))
+    await create_bank_account(BankAccountInCreate(
+        person_id=person.id, account_type_id=used.id, bank_name="Leumi", account_number="12345"))
+
+    assert await check_option_in_use(used.id)
+    assert not await check_option_in_use(unused.id)
+    # loan_types is referenced from cases as well as person_loans
+    assert await check_option_in_use(loan_type.id)
+
+    usage = await check_options_in_use("bank_account_types")
+    assert usage[used.id] is True
+    assert usage[unused.id] is False
+
+
+@pytest.mark.asyncio
+async def test_unreferenced_category_is_never_in_use():
+    option = await create_dropdown_option(DropdownOptionCreate(
+        category="case_status", name="Open", value="open_" + uuid.uuid4().hex[:8]))
+
+    assert not await check_option_in_use(option.id)
+    assert (await check_options_in_use("case_status"))[option.id] is False
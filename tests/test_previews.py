@@ -0,0 +1,51 @@
+import shutil
+
+import pytest
+from PIL import Image
+
+from server.features.uploads import document_store, previews
+from server.features.uploads.previews import get_page_preview, get_thumbnail
+
+requires_poppler = pytest.mark.skipif(shutil.which("pdftoppm") is None, reason="poppler is not installed")
+
+
+@pytest.fixture(autouse=True)
+def store_root(tmp_path, monkeypatch):
+    monkeypatch.setitem(document_store.DOCUMENT_STORE, "root", str(tmp_path / "objects"))
+    monkeypatch.setattr(previews, "_manifests", {})
+
+
+def _landscape(path, file_type: str) -> str:
+    """A page twice as wide as it is tall"""
+    Image.new("RGB", (600, 300), "white").save(path, file_type)
+    return str(path)
+
+
+def _ratio(path: str) -> float:
+    with Image.open(path) as image:
+        return image.width / image.height
+
+
+@requires_poppler
+@pytest.mark.asyncio
+async def test_pdf_previews_keep_page_aspect_ratio(tmp_path):
+    pdf = _landscape(tmp_path / "landscape.pdf", "PDF")
+
+    thumbnail = await get_thumbnail(pdf)
+    page = await get_page_preview(pdf, 1)
+
+    with Image.open(thumbnail) as image:
+        assert max(image.size) == max(previews.PREVIEWS["thumbnail_size"])
+    assert _ratio(thumbnail) == pytest.approx(2.0, rel=0.02)
+    assert _ratio(page) == pytest.approx(2.0, rel=0.02)
+
+
+@pytest.mark.asyncio
+async def test_image_previews_keep_aspect_ratio(tmp_path):
+    png = _landscape(tmp_path / "landscape.png", "PNG")
+
+    thumbnail = await get_thumbnail(png)
+
+    with Image.open(thumbnail) as image:
+        assert image.size == (320, 160)
+    assert await get_page_preview(png, 2) is None
@@ -0,0 +1,108 @@
+import uuid
+
+import pytest
+
+from server.database.database import get_connection
+from server.database.cases_database import CaseInCreate, CasePersonCreate, create_case, create_case_person
+from server.database.required_documents_database import (
+    RequiredDocType,
+    RequirementMatrix,
+    evaluate_case_requirements,
+    evaluate_requirements,
+    get_requirement_matrix,
+)
+from server.database.unique_docs_database import (
+    UniqueDocTypeCreate,
+    UniqueDocTypeUpdate,
+    create_unique_doc_type,
+    update_unique_doc_type,
+)
+
+
+def _doc_type(target_object: str) -> RequiredDocType:
+    return RequiredDocType(id=uuid.uuid4(), display_name=f"{target_object} doc",
+                           target_object=target_object, required_for=["employees"])
+
+
+async def _create_doc_type(target_object: str) -> uuid.UUID:
+    doc_type = await create_unique_doc_type(UniqueDocTypeCreate(
+        display_name="Required " + uuid.uuid4().hex[:8],
+        category="identification",
+        target_object=target_object,
+        document_type="one_time",
+        is_recurring=False,
+        required_for=["employees"],
+    ))
+    return doc_type.id
+
+
+def test_evaluate_requirements_reports_missing_documents_per_entity():
+    id_card, payslip = _doc_type("person"), _doc_type("person")
+    statement = _doc_type("bank_account")
+    matrix = RequirementMatrix(version=1, by_target={"person": [id_card, payslip], "bank_account": [statement]})
+    person, other_person, account = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    report = evaluate_requirements(
+        matrix,
+        [("person", person), ("person", other_person), ("bank_account", account), ("company", uuid.uuid4())],
+        [
+            (id_card.id, "person", person),
+            (payslip.id, "person", person),
+            # Linked to the wrong entity: does not count for other_person
+            (statement.id, "person", other_person),
+            (statement.id, "bank_account", account),
+            # Untyped or unlinked documents never satisfy a requirement
+            (None, "person", other_person),
+            (id_card.id, None, None),
+        ],
+    )
+
+    missing = {(status.entity_type, status.entity_id): [d.id for d in status.missing] for status in report.entities}
+    assert missing[("person", person)] == []
+    assert missing[("person", other_person)] == [id_card.id, payslip.id]
+    assert missing[("bank_account", account)] == []
+    assert report.missing_required_documents == 2
+    assert report.incomplete_entities == 1
+
+
+@pytest.mark.asyncio
+async def test_matrix_follows_doc_type_changes():
+    doc_type_id = await _create_doc_type("loan")
+    matrix = await get_requirement_matrix()
+    assert doc_type_id in [d.id for d in matrix.required_for_target("loan")]
+    assert await get_requirement_matrix() is matrix
+
+    await update_unique_doc_type(doc_type_id, UniqueDocTypeUpdate(target_object="asset"))
+
+    reloaded = await get_requirement_matrix()
+    assert reloaded.version > matrix.version
+    assert doc_type_id not in [d.id for d in reloaded.required_for_target("loan")]
+    assert doc_type_id in [d.id for d in reloaded.required_for_target("asset")]
+
+
+@pytest.mark.asyncio
+async def test_case_requirements_count_linked_documents():
+    doc_type_id = await _create_doc_type("person")
+    case = await create_case(CaseInCreate(name="Requirements", status="active", case_purpose="Testing",
+                                          loan_type_id=uuid.uuid4()))
+    person = await create_case_person(CasePersonCreate(
+        case_id=case.id, first_name="Dana", last_name="Levi", id_number="300000001",
+        role_id=uuid.uuid4(), gender="female", birth_date="1985-05-01",
+    ))
+
+    report = await evaluate_case_requirements(case.id)
+    status = next(s for s in report.entities if s.entity_id == person.id)
+    assert doc_type_id in [d.id for d in status.missing]
+
+    async with get_connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO case_documents (case_id, status, doc_type_id, target_object_type, target_object_id)
+            VALUES ($1, 'received', $2, 'person', $3)
+            """,
+            case.id, doc_type_id, person.id
+        )
+
+    report = await evaluate_case_requirements(case.id)
+    status = next(s for s in report.entities if s.entity_id == person.id)
+    assert doc_type_id not in [d.id for d in status.missing]
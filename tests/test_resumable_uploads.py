@@ -0,0 +1,131 @@
+import hashlib
+import os
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from server.database.cases_database import CaseInCreate, create_case
+from server.database.database import get_connection
+from server.database.upload_sessions_database import UploadSessionCreate, get_upload_session
+from server.features.uploads import document_store, resumable
+from server.features.uploads.resumable import (
+    complete_upload_session,
+    receive_chunk,
+    session_file,
+    start_upload_session,
+)
+from server.features.uploads.streaming_writer import UploadRejected
+
+PDF_CONTENT = b"%PDF-1.4\n" + os.urandom(4096)
+
+
+@pytest.fixture(autouse=True)
+def upload_dirs(tmp_path, monkeypatch):
+    monkeypatch.setitem(resumable.RESUMABLE_UPLOADS, "directory", str(tmp_path / "sessions"))
+    monkeypatch.setitem(document_store.DOCUMENT_STORE, "root", str(tmp_path / "objects"))
+
+
+@pytest_asyncio.fixture
+async def session():
+    case = await create_case(CaseInCreate(name="Resumable", status="active", case_purpose="Testing",
+                                          loan_type_id=uuid.uuid4()))
+    return await start_upload_session(case.id, UploadSessionCreate(
+        filename="statement.pdf",
+        total_size=len(PDF_CONTENT),
+        sha256=hashlib.sha256(PDF_CONTENT).hexdigest(),
+    ), uuid.uuid4())
+
+
+async def _body(data: bytes):
+    yield data
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def _send(session, offset: int, data: bytes):
+    return await receive_chunk(session, offset, _body(data), _sha256(data))
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_appended_in_order(session):
+    updated = await _send(session, 0, PDF_CONTENT[:1000])
+    updated = await _send(updated, 1000, PDF_CONTENT[1000:])
+
+    assert updated.received_size == len(PDF_CONTENT)
+    with open(session_file(session.id), "rb") as f:
+        assert f.read() == PDF_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_chunk_at_wrong_offset_conflicts(session):
+    updated = await _send(session, 0, PDF_CONTENT[:1000])
+
+    # A resent chunk whose response was lost, checked against the stored session
+    with pytest.raises(UploadRejected) as excinfo:
+        await _send(session, 0, PDF_CONTENT[:1000])
+    assert excinfo.value.status_code == 409
+
+    # A chunk skipping ahead
+    with pytest.raises(UploadRejected) as excinfo:
+        await _send(updated, 2000, PDF_CONTENT[2000:3000])
+    assert excinfo.value.status_code == 409
+
+    assert (await get_upload_session(session.id)).received_size == 1000
+
+
+@pytest.mark.asyncio
+async def test_chunk_failing_checksum_is_rejected(session):
+    with pytest.raises(UploadRejected) as excinfo:
+        await receive_chunk(session, 0, _body(PDF_CONTENT[:1000]), _sha256(b"something else"))
+
+    assert excinfo.value.status_code == 400
+    assert (await get_upload_session(session.id)).received_size == 0
+    assert os.path.getsize(session_file(session.id)) == 0
+
+
+@pytest.mark.asyncio
+async def test_session_is_kept_until_file_is_attached(session):
+    updated = await _send(session, 0, PDF_CONTENT)
+
+    async def failing_attach(stored):
+        raise RuntimeError("case document not written")
+
+    with pytest.raises(RuntimeError):
+        await complete_upload_session(updated, failing_attach)
+    assert await get_upload_session(session.id) is not None
+
+    # Completing again succeeds from the bytes already received
+    attached = []
+
+    async def attach(stored):
+        attached.append(stored.path)
+        return "case document"
+
+    stored, result = await complete_upload_session(updated, attach)
+    assert result == "case document"
+    assert attached == [stored.path]
+    assert stored.sha256 == _sha256(PDF_CONTENT)
+    assert await get_upload_session(session.id) is None
+    assert not os.listdir(os.path.dirname(session_file(session.id)))
+
+
+@pytest.mark.asyncio
+async def test_attached_upload_is_closed_while_session_is_locked(session):
+    updated = await _send(session, 0, PDF_CONTENT)
+    key = f"upload_session:{session.id}"
+
+    async with get_connection() as other:
+        async def attach(stored):
+            # Another request, such as a retried completion, takes the lock
+            assert await other.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", key)
+            return "case document"
+
+        stored, result = await complete_upload_session(updated, attach)
+        await other.execute("SELECT pg_advisory_unlock(hashtext($1))", key)
+
+    assert result == "case document"
+    assert await get_upload_session(session.id) is None
+    assert not os.listdir(os.path.dirname(session_file(session.id)))
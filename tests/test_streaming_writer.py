@@ -0,0 +1,72 @@
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+
+from server.features.uploads.streaming_writer import UploadRejected, write_upload
+
+PDF_CONTENT = b"%PDF-1.4\n" + b"x" * 4096
+
+
+def _upload(content: bytes, filename: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+@pytest.mark.asyncio
+async def test_write_upload_stores_accepted_file(tmp_path):
+    destination = str(tmp_path / "doc.pdf")
+
+    stored = await write_upload(_upload(PDF_CONTENT, "doc.pdf"), destination)
+
+    assert stored.path == destination
+    assert stored.size == len(PDF_CONTENT)
+    assert stored.sha256 == hashlib.sha256(PDF_CONTENT).hexdigest()
+    assert stored.file_type == "pdf"
+    with open(destination, "rb") as f:
+        assert f.read() == PDF_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_write_upload_rejects_content_not_matching_extension(tmp_path):
+    destination = str(tmp_path / "doc.pdf")
+
+    # PNG magic bytes under a .pdf name
+    with pytest.raises(UploadRejected) as excinfo:
+        await write_upload(_upload(b"\x89PNG\r\n\x1a\n" + b"x" * 64, "doc.pdf"), destination)
+
+    assert excinfo.value.status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_write_upload_rejects_unknown_content(tmp_path):
+    with pytest.raises(UploadRejected) as excinfo:
+        await write_upload(_upload(b"MZ\x90\x00 not a document", "doc.pdf"), str(tmp_path / "doc.pdf"))
+
+    assert excinfo.value.status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_write_upload_rejects_oversized_file(tmp_path):
+    destination = str(tmp_path / "doc.pdf")
+
+    with pytest.raises(UploadRejected) as excinfo:
+        await write_upload(_upload(PDF_CONTENT, "doc.pdf"), destination, max_bytes=1024)
+
+    assert excinfo.value.status_code == 413
+    # The partial file is removed and nothing is left at the destination
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_rejected_upload_keeps_existing_file(tmp_path):
+    destination = tmp_path / "doc.pdf"
+    destination.write_bytes(PDF_CONTENT)
+
+    with pytest.raises(UploadRejected):
+        await write_upload(_upload(b"\x89PNG\r\n\x1a\n", "doc.pdf"), str(destination))
+
+    assert destination.read_bytes() == PDF_CONTENT
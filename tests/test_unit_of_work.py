@@ -0,0 +1,121 @@
+import uuid
+
+import pytest
+
+from server.database.database import get_connection, unit_of_work
+from server.database.cases_database import CaseInCreate, create_case, get_case
+from server.database.case_wizard_database import (
+    BankAccountDeclaration,
+    CaseDeclarationSurvey,
+    CreditCardDeclaration,
+    LoanDeclaration,
+    PersonDeclaration,
+    create_case_with_wizard,
+)
+
+
+def _survey(**overrides) -> CaseDeclarationSurvey:
+    """A survey with two persons; dropdown ids are not foreign keys, so random ones do."""
+    fields = dict(
+        case_name="Wizard " + uuid.uuid4().hex[:8],
+        case_purpose="Testing",
+        loan_type_id=uuid.uuid4(),
+        persons=[
+            PersonDeclaration(first_name="Dana", last_name="Levi", id_number="300000001",
+                              role_id=uuid.uuid4(), gender="female", birth_date="1985-05-01"),
+            PersonDeclaration(first_name="Yoni", last_name="Levi", id_number="300000002",
+                              role_id=uuid.uuid4(), gender="male", birth_date="1984-03-02",
+                              relationship_to_primary=uuid.uuid4()),
+        ],
+    )
+    fields.update(overrides)
+    return CaseDeclarationSurvey(**fields)
+
+
+def _case_in(name: str) -> CaseInCreate:
+    return CaseInCreate(name=name, status="active", case_purpose="Testing", loan_type_id=uuid.uuid4())
+
+
+async def _count_cases(name: str) -> int:
+    async with get_connection() as conn:
+        return await conn.fetchval("SELECT COUNT(*) FROM cases WHERE name = $1", name)
+
+
+@pytest.mark.asyncio
+async def test_nested_helpers_share_the_unit_of_work_connection():
+    async with unit_of_work() as conn:
+        async with get_connection() as inner:
+            assert await inner.fetchval("SELECT txid_current()") == await conn.fetchval("SELECT txid_current()")
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rolls_back_on_failure():
+    name = "Rolled back " + uuid.uuid4().hex[:8]
+    with pytest.raises(RuntimeError):
+        async with unit_of_work():
+            case = await create_case(_case_in(name))
+            # Visible inside the unit of work, not to other connections
+            assert await get_case(case.id) is not None
+            async with get_connection(isolated=True) as other:
+                assert await other.fetchval("SELECT COUNT(*) FROM cases WHERE id = $1", case.id) == 0
+            raise RuntimeError("fail after the insert")
+
+    assert await _count_cases(name) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_savepoint_does_not_abort_the_unit_of_work():
+    kept = "Kept " + uuid.uuid4().hex[:8]
+    async with unit_of_work() as conn:
+        await create_case(_case_in(kept))
+        with pytest.raises(Exception):
+            async with conn.transaction():
+                await create_case(_case_in("Undone"))
+                await conn.execute("SELECT 1 / 0")
+        # The transaction is still usable after the savepoint rolled back
+        assert await conn.fetchval("SELECT 1") == 1
+
+    assert await _count_cases(kept) == 1
+
+
+@pytest.mark.asyncio
+async def test_wizard_rolls_back_everything_when_a_person_fails():
+    survey = _survey()
+    # id_number shorter than the 5 characters the table requires
+    survey.persons[1].id_number = "123"
+
+    result = await create_case_with_wizard(survey)
+
+    assert not result.success
+    assert result.case is None
+    assert await _count_cases(survey.case_name) == 0
+
+
+@pytest.mark.asyncio
+async def test_wizard_isolates_a_failing_entity_in_its_savepoint():
+    survey = _survey(
+        bank_accounts=[BankAccountDeclaration(bank_name="Leumi", account_type_id=uuid.uuid4(),
+                                              account_number="12345", owner_person_index=0)],
+        # Out of the INTEGER column's range: fails in the database
+        credit_cards=[CreditCardDeclaration(issuer="Visa", card_type_id=uuid.uuid4(),
+                                            last_four=10 ** 12, owner_person_index=0)],
+        loans=[LoanDeclaration(loan_type_id=uuid.uuid4(), lender="Mizrahi", owner_person_index=1)],
+    )
+
+    result = await create_case_with_wizard(survey)
+
+    assert not result.success
+    assert len(result.errors) == 1 and "credit card" in result.errors[0]
+    assert result.case is not None
+    # Entities before and after the failed one were committed with the case
+    assert len(result.created_entities["bank_accounts"]) == 1
+    assert len(result.created_entities["loans"]) == 1
+    async with get_connection() as conn:
+        assert await conn.fetchval(
+            """
+            SELECT COUNT(*) FROM person_loans pl
+            JOIN case_persons cp ON cp.id = pl.person_id
+            WHERE cp.case_id = $1
+            """,
+            result.case.id
+        ) == 1
@@ -0,0 +1,96 @@
+import asyncio
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from server.database.database import get_connection
+from server.database.notifications import is_listening, start_notification_listener, stop_notification_listener
+from server.database.users_database import (
+    UserCreate,
+    create_user,
+    get_cached_user,
+    update_failed_login,
+    update_user_status,
+)
+
+
+@pytest_asyncio.fixture
+async def listener():
+    await start_notification_listener()
+    assert is_listening()
+    yield
+    await stop_notification_listener()
+
+
+@pytest_asyncio.fixture
+async def user():
+    return await create_user(UserCreate(
+        password="123456qQ!",
+        first_name="Cache",
+        last_name="Test",
+        email=f"cache_{uuid.uuid4().hex[:8]}@example.com"
+    ))
+
+
+async def _eventually(predicate, timeout: float = 5.0) -> bool:
+    """Poll an async predicate until it holds, giving the NOTIFY time to arrive"""
+    for _ in range(int(timeout / 0.05)):
+        if await predicate():
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+@pytest.mark.asyncio
+async def test_cached_user_is_reused(user):
+    first = await get_cached_user(user.id)
+    assert first is not None
+    assert await get_cached_user(user.id) is first
+
+
+@pytest.mark.asyncio
+async def test_status_update_evicts_cached_user(user):
+    assert (await get_cached_user(user.id)).status == "active"
+
+    await update_user_status(user.id, "suspended")
+
+    assert (await get_cached_user(user.id)).status == "suspended"
+
+
+@pytest.mark.asyncio
+async def test_notify_evicts_cached_user(listener, user):
+    assert (await get_cached_user(user.id)).status == "active"
+
+    # Write outside the module, so only the trigger's NOTIFY can evict the user
+    async with get_connection() as conn:
+        await conn.execute("UPDATE users SET deleted_at = NOW() WHERE id = $1", user.id)
+
+    async def user_is_gone():
+        return await get_cached_user(user.id) is None
+
+    assert await _eventually(user_is_gone)
+
+
+@pytest.mark.asyncio
+async def test_login_bookkeeping_keeps_cached_user(listener, user):
+    marker = await create_user(UserCreate(
+        password="123456qQ!",
+        first_name="Marker",
+        last_name="Test",
+        email=f"marker_{uuid.uuid4().hex[:8]}@example.com"
+    ))
+    first = await get_cached_user(user.id)
+    await get_cached_user(marker.id)
+
+    await update_failed_login(user.id)
+    # NOTIFYs arrive in commit order: once the marker's arrived, one for the
+    # failed login would have too
+    async with get_connection() as conn:
+        await conn.execute("UPDATE users SET department = 'Audit' WHERE id = $1", marker.id)
+
+    async def sees_marker():
+        return (await get_cached_user(marker.id)).department == "Audit"
+
+    assert await _eventually(sees_marker)
+    assert await get_cached_user(user.id) is first
@@ -123,3 +123,20 @@ class TestUserRouter:
         response = await async_client.delete(f"/api/v1/users/{fake_user_id}", headers=headers)
         assert response.status_code == 403
 
+
+    async def test_update_user_status_as_admin(self, async_client: AsyncClient, admin_token, regular_user):
+        """Test admin suspending a user."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = await async_client.put(
+            f"/api/v1/users/{regular_user.id}/status", json={"status": "suspended"}, headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["status"] == "suspended"
+
+    async def test_update_user_status_as_regular_user(self, async_client: AsyncClient, user_token, regular_user):
+        """Test that regular users cannot change account status."""
+        headers = {"Authorization": f"Bearer {user_token}"}
+        response = await async_client.put(
+            f"/api/v1/users/{regular_user.id}/status", json={"status": "active"}, headers=headers
+        )
+        assert response.status_code == 403